@@ -12,7 +12,9 @@ import json
 from pydantic import BaseModel
 from agno.tools import tool
 
-from common.common import ChatbotInterface, ClimateDataService
+from common.common import ChatbotInterface, CityResolver, ClimateDataService
+from common.common.intents import CLIMATE_INTENTS
+from common.common.conversation import ConversationHistory, history_context
 from common.common.logging_config import get_logger
 from test_agno.config import Config
 
@@ -23,10 +25,11 @@ class ClimateAgent:
     def __init__(self):
         """Initialize the climate agent with configuration and services."""
         self.config = Config()
-        self.chatbot = ChatbotInterface(response_delay=0.5, log_level="INFO")
+        self.chatbot = ChatbotInterface(log_level="INFO")
         self.logger = get_logger("climate_agent")
         
         self.climate_service = ClimateDataService()
+        self.city_resolver = CityResolver(self.climate_service.get_all_cities())
         self.openai_client = self._setup_openai_client()
         self.agents = self._setup_agents()
 
@@ -119,16 +122,17 @@ class ClimateAgent:
             "advisor": advisor_agent
         }
 
-    def get_climate_info(self, city_name: str) -> Dict:
+    def get_climate_info(self, city_name: str, context: str = "") -> Dict:
         """Get comprehensive climate information for a city.
 
         Args:
             city_name: Name of the city to analyze
+            context: Rendered earlier turns of the conversation, given to the advisor
 
         Returns:
             Dictionary containing climate research, analysis, and advice
         """
-        self.logger.info(f"Starting climate analysis for {city_name}")
+        self.logger.info("Starting climate analysis for %s", city_name)
         
         research_prompt = f"Research comprehensive climate information for {city_name}. Provide a detailed climate research report."
         research_result = self.agents["researcher"].run(research_prompt)
@@ -136,7 +140,7 @@ class ClimateAgent:
         analysis_prompt = f"Analyze the following climate research data for {city_name} and provide insights:\n\n{research_result}"
         analysis_result = self.agents["analyst"].run(analysis_prompt)
         
-        advice_prompt = f"Based on the climate research and analysis for {city_name}, provide user-friendly advice and recommendations:\n\nResearch: {research_result}\n\nAnalysis: {analysis_result}"
+        advice_prompt = f"{context}Based on the climate research and analysis for {city_name}, provide user-friendly advice and recommendations:\n\nResearch: {research_result}\n\nAnalysis: {analysis_result}"
         advice_result = self.agents["advisor"].run(advice_prompt)
         
         # Extract content from RunResponse objects if they are RunResponse instances
@@ -164,10 +168,33 @@ class ClimateAgent:
         }
         
         self.climate_service.insert_city_climate(climate_data)
-        self.logger.info(f"Completed climate analysis for {city_name}")
+        self.city_resolver.add(city_name)
+        self.logger.info("Completed climate analysis for %s", city_name)
         
         return climate_data
 
+    def respond(self, user_input: str, history: Optional[ConversationHistory] = None) -> str:
+        """Answer a single climate query.
+
+        Follow-up questions without a city name continue with the city the
+        user last asked about.
+
+        Args:
+            user_input: User's input message
+            history: Earlier turns of the conversation, included in the prompt
+
+        Returns:
+            Response text
+        """
+        if CLIMATE_INTENTS.intent(user_input) == "climate":
+            city_name = self._extract_city_name(user_input, history)
+            if city_name:
+                self.chatbot.send_message(f"Researching climate information for {city_name}...")
+                climate_info = self.get_climate_info(city_name, history_context(history))
+                return f"Here's what I found about {city_name}'s climate:\n{climate_info['advice']}"
+            return "Please specify a city name for climate information."
+        return "I can help you with climate information for any city. Just ask about a specific city's climate!"
+
     def start_interactive_mode(self) -> None:
         """Start interactive mode for climate queries."""
         self.logger.info("Starting Climate Agent in interactive mode")
@@ -181,33 +208,38 @@ class ClimateAgent:
                     self.chatbot.receive_response("Goodbye! Climate Agent stopping.")
                     break
                 
-                if "climate" in user_input.lower() or "weather" in user_input.lower():
-                    city_name = self._extract_city_name(user_input)
-                    if city_name:
-                        self.chatbot.send_message(f"Researching climate information for {city_name}...")
-                        climate_info = self.get_climate_info(city_name)
-                        self.chatbot.receive_response(f"Here's what I found about {city_name}'s climate:\n{climate_info['advice']}")
-                    else:
-                        self.chatbot.receive_response("Please specify a city name for climate information.")
-                else:
-                    self.chatbot.receive_response("I can help you with climate information for any city. Just ask about a specific city's climate!")
+                response = self.respond(user_input, self.chatbot.history)
+                self.chatbot.record_user_message(user_input)
+                self.chatbot.receive_response(response)
                     
             except KeyboardInterrupt:
                 self.chatbot.receive_response("Climate Agent interrupted. Goodbye!")
                 break
             except Exception as e:
-                self.logger.error(f"Error in interactive mode: {str(e)}")
+                self.logger.error("Error in interactive mode: %s", e)
                 self.chatbot.receive_response(f"Sorry, I encountered an error: {str(e)}")
 
-    def _extract_city_name(self, user_input: str) -> Optional[str]:
+    def _extract_city_name(self, user_input: str,
+                           history: Optional[ConversationHistory] = None) -> Optional[str]:
         """Extract city name from user input.
 
         Args:
             user_input: User's input text
+            history: Earlier turns searched for a known city when the input names none
 
         Returns:
             Extracted city name or None if not found
         """
+        cities = self.city_resolver.find_in_text(user_input)
+        if cities:
+            return cities[0]
+
+        for turn in reversed(history.turns if history is not None else []):
+            if turn.role == "user":
+                cities = self.city_resolver.find_in_text(turn.text)
+                if cities:
+                    return cities[0]
+
         words = user_input.split()
         for i, word in enumerate(words):
             if word.lower() in ["climate", "weather", "of", "in", "for"]:
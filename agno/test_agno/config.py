@@ -41,7 +41,7 @@ class Config:
             OpenAI model name
         """
         model = os.getenv("OPENAI_MODEL", "gpt-4.1-nano")
-        self.logger.debug(f"Using OpenAI model: {model}")
+        self.logger.debug("Using OpenAI model: %s", model)
         return model
 
     def _get_openai_temperature(self) -> float:
@@ -53,10 +53,10 @@ class Config:
         temperature = os.getenv("OPENAI_TEMPERATURE", "0.0")
         try:
             temp_value = float(temperature)
-            self.logger.debug(f"Using temperature: {temp_value}")
+            self.logger.debug("Using temperature: %s", temp_value)
             return temp_value
         except ValueError:
-            self.logger.warning(f"Invalid temperature value: {temperature}, using default 0.0")
+            self.logger.warning("Invalid temperature value: %s, using default 0.0", temperature)
             return 0.0
 
     def validate(self) -> bool:
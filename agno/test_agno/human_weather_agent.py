@@ -1,7 +1,7 @@
 """Human-like weather agent with MongoDB temperature tools using Agno."""
 
 import os
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 
 from agno.agent import Agent, Message
 from agno.models.openai import OpenAIChat
@@ -12,10 +12,14 @@ from pydantic import BaseModel
 from agno.tools import tool
 
 from common.common import ChatbotInterface, ClimateDataService
+from common.common.conversation import ConversationHistory, history_context
+from common.common.intents import WEATHER_INTENTS
 from common.common.mongodb.tools import TemperatureTools
 from common.common.logging_config import get_logger
 from test_agno.config import Config
 
+MAX_PROMPT_CITIES = 50
+
 
 class HumanWeatherAgent:
     """A human-like weather agent that communicates naturally and uses temperature tools."""
@@ -23,7 +27,7 @@ class HumanWeatherAgent:
     def __init__(self):
         """Initialize the human weather agent with configuration and tools."""
         self.config = Config()
-        self.chatbot = ChatbotInterface(response_delay=0.3, log_level="INFO")
+        self.chatbot = ChatbotInterface(log_level="INFO")
         self.logger = get_logger("human_weather_agent")
         self.temperature_tools = TemperatureTools()
         self.openai_client = self._setup_openai_client()
@@ -89,34 +93,39 @@ class HumanWeatherAgent:
         Returns:
             Weather data response string
         """
-        query_lower = user_query.lower()
+        intent = WEATHER_INTENTS.intent(user_query)
         
-        if "temperature" in query_lower and "city" in query_lower:
-            words = user_query.split()
-            for i, word in enumerate(words):
-                if word.lower() in ["temperature", "temp", "weather"]:
-                    if i + 1 < len(words):
-                        city = words[i + 1]
-                        try:
-                            temp_data = self.temperature_tools.get_current_temperature(city)
-                            return f"Current temperature for {city}: {temp_data}"
-                        except:
-                            return f"Temperature data for {city} not available"
+        if intent == "temperature":
+            cities = self.temperature_tools.find_cities(user_query)
+            if not cities:
+                words = user_query.split()
+                cities = [words[i + 1] for i, word in enumerate(words[:-1])
+                          if word.lower() in ["temperature", "temp", "weather"]]
+            if cities:
+                city = cities[0]
+                try:
+                    temp_data = self.temperature_tools.get_current_temperature(city)
+                    return f"Current temperature for {city}: {temp_data}"
+                except:
+                    return f"Temperature data for {city} not available"
         
-        elif "compare" in query_lower or "between" in query_lower:
-            words = user_query.split()
-            cities = []
-            for word in words:
-                if word[0].isupper() and len(word) > 2:
-                    cities.append(word)
+        elif intent == "compare":
+            cities = self.temperature_tools.find_cities(user_query)
+            if len(cities) < 2:
+                words = user_query.split()
+                cities = []
+                for word in words:
+                    word = word.strip(",.?!")
+                    if word[:1].isupper() and len(word) > 2:
+                        cities.append(word)
             if len(cities) >= 2:
                 try:
-                    comparison = self.temperature_tools.get_temperature_comparison(f"{cities[0]},{cities[1]}")
+                    comparison = self.temperature_tools.compare_cities(cities)
                     return f"Temperature comparison: {comparison}"
                 except:
-                    return f"Comparison data for {cities[0]} and {cities[1]} not available"
+                    return f"Comparison data for {', '.join(cities)} not available"
         
-        elif "summary" in query_lower or "all" in query_lower:
+        elif intent == "summary":
             try:
                 summary = self.temperature_tools.get_weather_summary()
                 return f"Weather summary: {summary}"
@@ -125,25 +134,61 @@ class HumanWeatherAgent:
         
         else:
             try:
-                all_temps = self.temperature_tools.get_all_cities_temperatures()
+                all_temps = list(
+                    self.temperature_tools.iter_cities_temperatures(limit=MAX_PROMPT_CITIES)
+                )
                 return f"All cities temperatures: {all_temps}"
             except:
                 return "Temperature data not available"
 
-    def process_weather_query(self, user_query: str) -> str:
+    def process_weather_query(self, user_query: str, context: str = "") -> str:
         """Process weather query and generate response.
 
         Args:
             user_query: User's weather query
+            context: Rendered earlier turns of the conversation
 
         Returns:
             Generated weather response
         """
-        self.logger.info(f"Processing weather query: {user_query}")
+        self.logger.info("Processing weather query: %s", user_query)
+        
+        response = self.weather_agent.run(self._build_weather_prompt(user_query, context))
+        
+        self.logger.info("Generated response: %s", response)
+        return response
+
+    def stream_weather_query(self, user_query: str, context: str = "") -> Iterator[str]:
+        """Process weather query and stream the response as it is generated.
+
+        Args:
+            user_query: User's weather query
+            context: Rendered earlier turns of the conversation
+
+        Yields:
+            Response text chunks
+        """
+        self.logger.info("Streaming weather query: %s", user_query)
         
+        for chunk in self.weather_agent.run(self._build_weather_prompt(user_query, context),
+                                         stream=True):
+            content = getattr(chunk, "content", None)
+            if isinstance(content, str) and content:
+                yield content
+
+    def _build_weather_prompt(self, user_query: str, context: str = "") -> str:
+        """Build the prompt for a weather query with the matching weather data.
+
+        Args:
+            user_query: User's weather query
+            context: Rendered earlier turns of the conversation
+
+        Returns:
+            Prompt for the weather agent
+        """
         weather_data = self.get_weather_data(user_query)
         
-        prompt = f"""The user asked: "{user_query}"
+        return f"""{context}The user asked: "{user_query}"
 
 Available weather data: {weather_data}
 
@@ -151,11 +196,41 @@ Please help them with their weather-related question. Respond in a friendly,
 conversational manner. Make the weather information interesting and easy to understand.
         
 Always be helpful, friendly, and conversational in your response."""
-        
-        response = self.weather_agent.run(prompt)
-        
-        self.logger.info(f"Generated response: {response}")
-        return response
+
+    def respond(self, user_input: str, history: Optional[ConversationHistory] = None) -> str:
+        """Answer a single weather query.
+
+        Args:
+            user_input: User's input message
+            history: Earlier turns of the conversation, included in the prompt
+
+        Returns:
+            Response text
+        """
+        if not user_input.strip():
+            return "I didn't catch that. Could you please ask me about weather or temperatures for any city?"
+        self.chatbot.send_message("Let me check that for you...")
+        response = self.process_weather_query(user_input, history_context(history))
+        return response if isinstance(response, str) else str(getattr(response, "content", response))
+
+    def respond_stream(self, user_input: str,
+                       history: Optional[ConversationHistory] = None) -> Iterator[str]:
+        """Answer a single weather query, streaming the response as it is generated.
+
+        The history is rendered before returning, so the caller may record the
+        new message in it while the response streams.
+
+        Args:
+            user_input: User's input message
+            history: Earlier turns of the conversation, included in the prompt
+
+        Returns:
+            Iterator of response text chunks
+        """
+        if not user_input.strip():
+            return iter(["I didn't catch that. Could you please ask me about weather or temperatures for any city?"])
+        self.chatbot.send_message("Let me check that for you...")
+        return self.stream_weather_query(user_input, history_context(history))
 
     def start_interactive_mode(self) -> None:
         """Start interactive mode for weather queries."""
@@ -170,18 +245,15 @@ Always be helpful, friendly, and conversational in your response."""
                     self.chatbot.receive_response("Thanks for chatting with me! Have a great day and stay weather-aware! 👋")
                     break
                 
-                if user_input.strip():
-                    self.chatbot.send_message("Let me check that for you...")
-                    response = self.process_weather_query(user_input)
-                    self.chatbot.receive_response(response)
-                else:
-                    self.chatbot.receive_response("I didn't catch that. Could you please ask me about weather or temperatures for any city?")
+                chunks = self.respond_stream(user_input, self.chatbot.history)
+                self.chatbot.record_user_message(user_input)
+                self.chatbot.stream_response(chunks)
                     
             except KeyboardInterrupt:
                 self.chatbot.receive_response("Thanks for chatting! Take care! 👋")
                 break
             except Exception as e:
-                self.logger.error(f"Error in interactive mode: {str(e)}")
+                self.logger.error("Error in interactive mode: %s", e)
                 self.chatbot.receive_response("Oops! I encountered a little weather hiccup. Could you try asking again?")
 
     def close(self) -> None:
@@ -0,0 +1,186 @@
+"""Admission control and back-pressure for the chat handling path."""
+
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Optional
+
+from common.common.logging_config import get_logger
+
+
+class AdmissionRejected(RuntimeError):
+    """Raised when a request is not admitted."""
+
+    def __init__(self, reason: str, message: str):
+        """Initialize the rejection.
+
+        Args:
+            reason: ``session_busy``, ``queue_full`` or ``timeout``
+            message: Human-readable explanation
+        """
+        super().__init__(message)
+        self.reason = reason
+
+
+class AdmissionController:
+    """Bounds concurrent work per process and per session.
+
+    Up to ``max_in_flight`` requests run at once. Further requests wait in
+    a FIFO queue of at most ``max_queue`` entries for up to
+    ``queue_timeout`` seconds; when the queue is full they are rejected
+    immediately. A session may have at most ``max_per_session`` requests
+    running or queued. A finished request hands its slot directly to the
+    oldest waiter, so queued requests are served in arrival order.
+
+    All methods must be called from the event loop thread.
+    """
+
+    def __init__(self, max_in_flight: int = 32, max_per_session: int = 1,
+                 max_queue: int = 256, queue_timeout: float = 30.0):
+        """Initialize the controller.
+
+        Args:
+            max_in_flight: Maximum number of requests running at once
+            max_per_session: Maximum number of running or queued requests per session
+            max_queue: Maximum number of waiting requests
+            queue_timeout: Seconds a request may wait for a slot
+        """
+        self.max_in_flight = max_in_flight
+        self.max_per_session = max_per_session
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.logger = get_logger("admission_control")
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._sessions: Dict[str, int] = {}
+
+    @property
+    def in_flight(self) -> int:
+        """Number of running requests."""
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        """Number of waiting requests."""
+        return sum(1 for waiter in self._waiters if not waiter.done())
+
+    def stats(self) -> Dict[str, int]:
+        """Get the current load and the admission counters.
+
+        Returns:
+            Dictionary of in-flight, queued, admitted, rejected and timed-out counts
+        """
+        return {
+            "in_flight": self._in_flight,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+    async def acquire(self, session_id: Optional[str] = None) -> None:
+        """Wait for a slot.
+
+        Args:
+            session_id: Session the request belongs to, or None for no per-session limit
+
+        Raises:
+            AdmissionRejected: If the session is busy, the queue is full or the
+                deadline passes before a slot frees up
+        """
+        if session_id is not None:
+            if self._sessions.get(session_id, 0) >= self.max_per_session:
+                self.rejected += 1
+                raise AdmissionRejected("session_busy",
+                                        "A previous message of this session is still being handled")
+            self._sessions[session_id] = self._sessions.get(session_id, 0) + 1
+        try:
+            await self._acquire_slot()
+        except BaseException:
+            self._leave_session(session_id)
+            raise
+        self.admitted += 1
+
+    async def _acquire_slot(self) -> None:
+        """Take a free slot or queue for one."""
+        if self._in_flight < self.max_in_flight and not self._waiters:
+            self._in_flight += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            raise AdmissionRejected("queue_full", "The server is busy")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                return
+            waiter.cancel()
+            self._remove_waiter(waiter)
+            self.timed_out += 1
+            self.logger.warning("Request waited %ss without a free slot", self.queue_timeout)
+            raise AdmissionRejected("timeout", "The server is busy") from None
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was already handed over; pass it on
+                self._release_slot()
+            else:
+                waiter.cancel()
+                self._remove_waiter(waiter)
+            raise
+
+    def release(self, session_id: Optional[str] = None) -> None:
+        """Return a slot taken with ``acquire``.
+
+        Args:
+            session_id: Session passed to ``acquire``
+        """
+        self._leave_session(session_id)
+        self._release_slot()
+
+    def _release_slot(self) -> None:
+        """Hand the slot to the oldest live waiter, or free it."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._in_flight -= 1
+
+    def _remove_waiter(self, waiter: asyncio.Future) -> None:
+        """Drop an abandoned waiter from the queue."""
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def _leave_session(self, session_id: Optional[str]) -> None:
+        """Decrement the request count of a session."""
+        if session_id is None:
+            return
+        remaining = self._sessions.get(session_id, 0) - 1
+        if remaining > 0:
+            self._sessions[session_id] = remaining
+        else:
+            self._sessions.pop(session_id, None)
+
+    @asynccontextmanager
+    async def admit(self, session_id: Optional[str] = None) -> AsyncIterator[None]:
+        """Hold a slot for the duration of a block.
+
+        Args:
+            session_id: Session the request belongs to, or None for no per-session limit
+
+        Raises:
+            AdmissionRejected: If the request is not admitted
+        """
+        await self.acquire(session_id)
+        try:
+            yield
+        finally:
+            self.release(session_id)
@@ -0,0 +1,421 @@
+"""Asyncio chat server multiplexing many conversations over one process."""
+
+import asyncio
+import inspect
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    AsyncIterable,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from common.common.admission import AdmissionController, AdmissionRejected
+from common.common.chatbot import ChatbotInterface
+from common.common.conversation import ConversationHistory
+from common.common.logging_config import get_logger
+
+QUIT_COMMANDS = ("/quit", "quit", "exit", "q")
+
+BUSY_MESSAGE = "Server is busy, please try again later."
+
+# Number of recent turn latencies kept per session
+MAX_SESSION_LATENCIES = 100
+
+Response = Union[str, Iterable[str], AsyncIterable[str]]
+Handler = Callable[["ChatSession", str], Union[Response, Awaitable[Response]]]
+
+
+class ChatSession:
+    """State of one conversation, independent of the connection carrying it."""
+
+    def __init__(self, session_id: str, handler_name: str,
+                 history: Optional[ConversationHistory] = None):
+        """Initialize an empty session.
+
+        Args:
+            session_id: Unique session identifier
+            handler_name: Name of the handler answering this session
+            history: Bounded conversation history, a default-sized one if None
+        """
+        self.session_id = session_id
+        self.handler_name = handler_name
+        self.created_at = time.time()
+        self.last_active = time.monotonic()
+        self.history = history if history is not None else ConversationHistory()
+        self.turn_count = 0
+        self.latencies: Deque[float] = deque(maxlen=MAX_SESSION_LATENCIES)
+        self.state: Dict[str, Any] = {}
+        self.attached = False
+        self.last_error: Optional[str] = None
+
+    def touch(self) -> None:
+        """Mark the session as active now."""
+        self.last_active = time.monotonic()
+
+    def record_turn(self, message: str, response: str, latency: float) -> None:
+        """Store a finished exchange.
+
+        Args:
+            message: User message
+            response: Handler response
+            latency: Seconds spent producing the response
+        """
+        self.history.add("user", message)
+        self.history.add("assistant", response)
+        self.latencies.append(latency)
+        self.turn_count += 1
+
+
+class SessionRegistry:
+    """Bounded registry of live sessions with idle expiry."""
+
+    def __init__(self, max_sessions: int = 1000, idle_timeout: float = 1800.0,
+                 history_factory: Callable[[], ConversationHistory] = ConversationHistory):
+        """Initialize the registry.
+
+        Args:
+            max_sessions: Maximum number of sessions held at once
+            idle_timeout: Seconds after which an inactive, detached session is dropped
+            history_factory: Callable creating the history of a new session
+        """
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.history_factory = history_factory
+        self._sessions: Dict[str, ChatSession] = {}
+
+    def __len__(self) -> int:
+        """Number of live sessions."""
+        return len(self._sessions)
+
+    def create(self, handler_name: str) -> Optional[ChatSession]:
+        """Create a session, expiring idle ones first if the registry is full.
+
+        Args:
+            handler_name: Name of the handler answering the session
+
+        Returns:
+            New session, or None if the registry is full
+        """
+        if len(self._sessions) >= self.max_sessions:
+            self.expire_idle()
+            if len(self._sessions) >= self.max_sessions:
+                return None
+        session = ChatSession(uuid.uuid4().hex[:12], handler_name, self.history_factory())
+        self._sessions[session.session_id] = session
+        return session
+
+    def get(self, session_id: str) -> Optional[ChatSession]:
+        """Get a live session by identifier.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            Session or None if unknown or expired
+        """
+        return self._sessions.get(session_id)
+
+    def close(self, session_id: str) -> None:
+        """Drop a session.
+
+        Args:
+            session_id: Session identifier
+        """
+        self._sessions.pop(session_id, None)
+
+    def expire_idle(self) -> int:
+        """Drop detached sessions idle for longer than the timeout.
+
+        Returns:
+            Number of sessions dropped
+        """
+        cutoff = time.monotonic() - self.idle_timeout
+        expired = [session_id for session_id, session in self._sessions.items()
+                   if not session.attached and session.last_active < cutoff]
+        for session_id in expired:
+            del self._sessions[session_id]
+        return len(expired)
+
+
+def agent_handler(agent, stream: bool = True) -> Handler:
+    """Wrap an agent exposing ``respond(user_input, history)`` as a session handler.
+
+    The session history passed to the agent holds the earlier turns only; the
+    server records the new exchange once the response is complete.
+
+    Args:
+        agent: Climate or weather agent
+        stream: Whether to use the agent's ``respond_stream`` method when it has one
+
+    Returns:
+        Handler calling the agent's ``respond`` or ``respond_stream`` method
+    """
+    respond = getattr(agent, "respond_stream", None) if stream else None
+    respond = respond or agent.respond
+
+    def handle(session: ChatSession, message: str) -> Response:
+        return respond(message, session.history)
+    return handle
+
+
+class ChatServer:
+    """Line-based TCP chat server serving many sessions from one event loop.
+
+    Each connection opens a session answered by one of the registered
+    handlers. Coroutine handlers run on the event loop; blocking handlers,
+    such as the framework agents, run on a bounded thread pool so a slow
+    model call never stalls other conversations. Messages of one session are
+    answered in order.
+
+    Clients send one message per line and can use ``/agent <name>`` to switch
+    handlers, ``/session`` to show the session identifier, ``/resume <id>``
+    to continue a detached session and ``/quit`` to disconnect.
+    """
+
+    def __init__(self, handlers: Dict[str, Handler], default_handler: Optional[str] = None,
+                 host: str = "127.0.0.1", port: int = 8765, max_sessions: int = 1000,
+                 idle_timeout: float = 1800.0, max_workers: int = 32,
+                 chatbot: Optional[ChatbotInterface] = None,
+                 history_factory: Callable[[], ConversationHistory] = ConversationHistory,
+                 admission: Optional[AdmissionController] = None):
+        """Initialize the server.
+
+        Args:
+            handlers: Handlers by name, e.g. ``{"climate": ..., "weather": ...}``
+            default_handler: Handler for new sessions, the first registered if None
+            host: Interface to listen on
+            port: Port to listen on, 0 for any free port
+            max_sessions: Maximum number of live sessions
+            idle_timeout: Seconds after which a detached session expires
+            max_workers: Threads available to blocking handlers
+            chatbot: Interface used to log and pace the conversations
+            history_factory: Callable creating the bounded history of a new session
+            admission: Limits on concurrent messages; by default as many as
+                ``max_workers`` run at once and a session handles one at a time
+        """
+        if not handlers:
+            raise ValueError("At least one handler is required")
+        self.handlers = dict(handlers)
+        self.default_handler = default_handler or next(iter(self.handlers))
+        self.host = host
+        self.port = port
+        self.registry = SessionRegistry(max_sessions, idle_timeout, history_factory)
+        self.chatbot = chatbot or ChatbotInterface(response_delay=0.0, keep_history=False)
+        self.admission = admission or AdmissionController(max_in_flight=max_workers)
+        self.logger = get_logger("chat_server")
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="chat-handler")
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def register_handler(self, name: str, handler: Handler) -> None:
+        """Add or replace a handler.
+
+        Args:
+            name: Handler name clients select with ``/agent``
+            handler: Callable taking the session and message
+        """
+        self.handlers[name] = handler
+
+    async def handle_message(self, session: ChatSession, message: str,
+                             on_chunk: Optional[Callable[[str], Any]] = None) -> str:
+        """Answer one message with the session's handler.
+
+        Handlers may return the full text or an iterator or async iterator of
+        chunks; chunks are passed to ``on_chunk`` as they arrive.
+
+        Args:
+            session: Session the message belongs to
+            message: User message
+            on_chunk: Callback or coroutine function receiving the response
+                text, chunk by chunk when the handler streams
+
+        Returns:
+            Response text
+        """
+        session.touch()
+        session.last_error = None
+        await self.chatbot.asend_message(f"[{session.session_id}] {message}")
+        started = time.perf_counter()
+        try:
+            async with self.admission.admit(session.session_id):
+                response, streamed = await self._run_handler(session, message, on_chunk, started)
+        except AdmissionRejected as e:
+            self.logger.warning("Rejected message of session %s: %s", session.session_id, e.reason)
+            session.last_error = e.reason
+            session.touch()
+            await self._deliver(BUSY_MESSAGE, on_chunk)
+            return BUSY_MESSAGE
+
+        session.record_turn(message, response, time.perf_counter() - started)
+        session.touch()
+        if not streamed:
+            await self.chatbot.areceive_response(f"[{session.session_id}] {response}")
+            await self._deliver(response, on_chunk)
+        return response
+
+    async def _run_handler(self, session: ChatSession, message: str,
+                           on_chunk: Optional[Callable[[str], Any]],
+                           started: float) -> Tuple[str, bool]:
+        """Run the session's handler, streaming its chunks if it returns an iterator.
+
+        Returns:
+            Response text and whether it was already delivered chunk by chunk
+        """
+        handler = self.handlers[session.handler_name]
+        try:
+            if inspect.iscoroutinefunction(handler):
+                response = await handler(session, message)
+            else:
+                loop = asyncio.get_running_loop()
+                response = await loop.run_in_executor(self._executor, handler, session, message)
+                if inspect.isawaitable(response):
+                    response = await response
+            if isinstance(response, str):
+                return response, False
+            response = await self.chatbot.astream_response(
+                response, on_chunk, started, self._executor
+            )
+            return response, True
+        except Exception as e:
+            self.logger.error("Handler %s failed: %s", session.handler_name, e,
+                              extra={"session_id": session.session_id})
+            session.last_error = str(e)
+            return f"Sorry, I encountered an error: {str(e)}", False
+
+    @staticmethod
+    async def _deliver(text: str, on_chunk: Optional[Callable[[str], Any]]) -> None:
+        """Pass a complete response to the chunk callback, if any."""
+        if on_chunk is not None:
+            result = on_chunk(text)
+            if inspect.isawaitable(result):
+                await result
+
+    @staticmethod
+    def _chunk_writer(writer: asyncio.StreamWriter) -> Callable[[str], Awaitable[None]]:
+        """Build a callback writing response chunks straight to the client."""
+        async def write(chunk: str) -> None:
+            writer.write(chunk.encode())
+            await writer.drain()
+        return write
+
+    def _command(self, session: ChatSession, line: str) -> Union[str, ChatSession]:
+        """Run a slash command, returning a reply or the session to continue with."""
+        command, _, argument = line.partition(" ")
+        argument = argument.strip()
+        if command == "/agent":
+            if argument not in self.handlers:
+                return f"Unknown agent '{argument}'. Available: {', '.join(self.handlers)}"
+            session.handler_name = argument
+            return f"Switched to the {argument} agent."
+        if command == "/session":
+            return (f"Session {session.session_id} ({session.handler_name} agent, "
+                    f"{session.turn_count} turns)")
+        if command == "/resume":
+            resumed = self.registry.get(argument)
+            if resumed is None or resumed.attached:
+                return f"Session '{argument}' is not available."
+            return resumed
+        return f"Unknown command '{command}'."
+
+    async def _handle_connection(self, reader: asyncio.StreamReader,
+                                 writer: asyncio.StreamWriter) -> None:
+        """Serve one client connection until it quits or disconnects."""
+        session = self.registry.create(self.default_handler)
+        if session is None:
+            writer.write(f"{BUSY_MESSAGE}\n".encode())
+            await writer.drain()
+            writer.close()
+            return
+
+        session.attached = True
+        self.logger.info("Session %s connected (%s live sessions)",
+                         session.session_id, len(self.registry))
+        writer.write(f"Session {session.session_id} started with the {session.handler_name} "
+                     f"agent. Type /quit to exit.\n".encode())
+        try:
+            await writer.drain()
+            while True:
+                raw = await reader.readline()
+                if not raw:
+                    break
+                line = raw.decode("utf-8", errors="replace").strip()
+                if not line:
+                    continue
+                if line.lower() in QUIT_COMMANDS:
+                    writer.write(b"Goodbye!\n")
+                    self.registry.close(session.session_id)
+                    break
+                if line.startswith("/"):
+                    reply = self._command(session, line)
+                    if isinstance(reply, ChatSession):
+                        session.attached = False
+                        session, reply.attached = reply, True
+                        reply = f"Resumed session {session.session_id}."
+                else:
+                    await self.handle_message(session, line, self._chunk_writer(writer))
+                    reply = ""
+                writer.write(f"{reply}\n".encode())
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            session.attached = False
+            session.touch()
+            writer.close()
+            self.logger.info("Session %s disconnected", session.session_id)
+
+    async def _expire_sessions(self) -> None:
+        """Periodically drop idle sessions."""
+        while True:
+            await asyncio.sleep(min(self.registry.idle_timeout, 60.0))
+            expired = self.registry.expire_idle()
+            if expired:
+                self.logger.debug("Expired %s idle sessions", expired)
+
+    async def start(self) -> asyncio.AbstractServer:
+        """Start listening.
+
+        Returns:
+            The underlying asyncio server
+        """
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self.logger.info("Chat server listening on %s:%s with agents: %s",
+                         self.host, self.port, ", ".join(self.handlers))
+        return self._server
+
+    async def serve_forever(self) -> None:
+        """Start the server and serve until cancelled."""
+        server = self._server or await self.start()
+        expiry = asyncio.ensure_future(self._expire_sessions())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            expiry.cancel()
+            await self.close()
+
+    async def close(self) -> None:
+        """Stop listening and release the handler threads."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        self._executor.shutdown(wait=False)
+
+    def run(self) -> None:
+        """Serve until interrupted."""
+        try:
+            asyncio.run(self.serve_forever())
+        except KeyboardInterrupt:
+            self.logger.info("Chat server stopped.")
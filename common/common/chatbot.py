@@ -1,27 +1,81 @@
 """Chatbot interface module for AI agent frameworks testing."""
 
-import time
+import asyncio
+import inspect
 import logging
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor
 from datetime import datetime
-from typing import Optional
+from typing import (Any, AsyncIterable, AsyncIterator, Callable, Deque, Dict, Iterable, List,
+                    Optional, TextIO, Union)
 
+from common.common.conversation import ConversationHistory
+from common.common.intents import CHATBOT_INTENTS
 from common.common.logging_config import get_logger
 
+# Number of streamed responses whose metrics are kept
+MAX_RESPONSE_METRICS = 1000
+
+_END_OF_STREAM = object()
+
+
+async def aiter_chunks(chunks: Union[Iterable[str], AsyncIterable[str]],
+                       executor: Optional[Executor] = None) -> AsyncIterator[str]:
+    """Iterate over sync or async chunks from a coroutine.
+
+    Synchronous iterators are advanced on ``executor`` (the loop's default
+    executor if None), so a model client blocking between tokens never
+    stalls the event loop.
+
+    Args:
+        chunks: Iterable or async iterable of text chunks
+        executor: Executor advancing synchronous iterators
+
+    Yields:
+        Text chunks in order
+    """
+    if hasattr(chunks, "__aiter__"):
+        async for chunk in chunks:
+            yield chunk
+        return
+    iterator = iter(chunks)
+    loop = asyncio.get_running_loop()
+    while True:
+        chunk = await loop.run_in_executor(executor, next, iterator, _END_OF_STREAM)
+        if chunk is _END_OF_STREAM:
+            return
+        yield chunk
+
 
 class ChatbotInterface:
-    """A terminal-based chatbot interface with timestamp logging and configurable delays."""
+    """A terminal-based chatbot interface with timestamp logging and optional pacing.
+
+    Sent messages are paced by ``response_delay``, one second by default;
+    streaming and server callers pass 0 to turn pacing off. The synchronous
+    API waits on an event that ``stop`` interrupts, and the ``a``-prefixed
+    coroutines await a cancellable ``asyncio.sleep`` so paced sessions never
+    block the event loop.
+    """
 
-    def __init__(self, response_delay: float = 1.0, log_level: str = "INFO"):
+    def __init__(self, response_delay: float = 1.0, log_level: str = "INFO",
+                 keep_history: bool = True):
         """Initialize the chatbot interface.
 
         Args:
-            response_delay: Delay in seconds between messages
+            response_delay: Delay in seconds after each sent message, 0 for no pacing
             log_level: Logging level for the chatbot
+            keep_history: Whether to keep a bounded history of the conversation
         """
         self.response_delay = response_delay
         self.logger = get_logger("chatbot_interface")
         self.logger.setLevel(getattr(logging, log_level.upper()))
         self.is_running = False
+        self.history = ConversationHistory() if keep_history else None
+        self.response_metrics: Deque[Dict[str, float]] = deque(maxlen=MAX_RESPONSE_METRICS)
+        self._stopped = threading.Event()
 
     def _get_timestamp(self) -> str:
         """Get current timestamp in formatted string.
@@ -37,8 +91,8 @@ class ChatbotInterface:
         Args:
             message: Message to send
         """
-        self.logger.info(f"USER: {message}")
-        time.sleep(self.response_delay)
+        self.logger.info("USER: %s", message)
+        self.pace()
 
     def receive_response(self, response: str) -> None:
         """Receive and log a response.
@@ -46,11 +100,136 @@ class ChatbotInterface:
         Args:
             response: Response message to receive
         """
-        self.logger.info(f"BOT: {response}")
+        self.logger.info("BOT: %s", response)
+        if self.history is not None:
+            self.history.add("assistant", response)
+
+    def record_user_message(self, message: str) -> None:
+        """Add a user message to the conversation history.
+
+        Args:
+            message: User's input message
+        """
+        if self.history is not None:
+            self.history.add("user", message)
+
+    def stream_response(self, chunks: Iterable[str], started: Optional[float] = None,
+                        output: Optional[TextIO] = None) -> str:
+        """Render a response in the terminal as its chunks arrive.
+
+        Args:
+            chunks: Iterable of text chunks, e.g. tokens from a streaming model call
+            started: ``time.perf_counter()`` when the request was made, defaults to now
+            output: Stream to render to, standard output by default
+
+        Returns:
+            Full response text
+        """
+        started = time.perf_counter() if started is None else started
+        output = output or sys.stdout
+        parts: List[str] = []
+        first_chunk_at = None
+        for chunk in chunks:
+            if not chunk:
+                continue
+            if first_chunk_at is None:
+                first_chunk_at = time.perf_counter()
+                output.write(f"[{self._get_timestamp()}] Bot: ")
+            output.write(chunk)
+            output.flush()
+            parts.append(chunk)
+        if parts:
+            output.write("\n")
+            output.flush()
+        return self._finish_stream(parts, started, first_chunk_at)
+
+    async def astream_response(self, chunks: Union[Iterable[str], AsyncIterable[str]],
+                               on_chunk: Optional[Callable[[str], Any]] = None,
+                               started: Optional[float] = None,
+                               executor: Optional[Executor] = None) -> str:
+        """Deliver a response chunk by chunk from a coroutine.
+
+        Args:
+            chunks: Iterable or async iterable of text chunks
+            on_chunk: Callback or coroutine function receiving every chunk,
+                e.g. a writer to a client connection
+            started: ``time.perf_counter()`` when the request was made, defaults to now
+            executor: Executor advancing synchronous iterators
+
+        Returns:
+            Full response text
+        """
+        started = time.perf_counter() if started is None else started
+        parts: List[str] = []
+        first_chunk_at = None
+        async for chunk in aiter_chunks(chunks, executor):
+            if not chunk:
+                continue
+            if first_chunk_at is None:
+                first_chunk_at = time.perf_counter()
+            parts.append(chunk)
+            if on_chunk is not None:
+                result = on_chunk(chunk)
+                if inspect.isawaitable(result):
+                    await result
+        return self._finish_stream(parts, started, first_chunk_at)
+
+    def _finish_stream(self, parts: List[str], started: float,
+                       first_chunk_at: Optional[float]) -> str:
+        """Record the metrics of a streamed response and log it."""
+        response = "".join(parts)
+        finished = time.perf_counter()
+        metrics = {
+            "time_to_first_token": (first_chunk_at or finished) - started,
+            "duration": finished - started,
+            "chunks": len(parts),
+            "characters": len(response),
+        }
+        self.response_metrics.append(metrics)
+        self.logger.info("BOT: streamed %s characters in %s chunks, first token after %.2fs, "
+                         "total %.2fs", metrics["characters"], metrics["chunks"],
+                         metrics["time_to_first_token"], metrics["duration"])
+        self.logger.debug("BOT: %s", response)
+        if self.history is not None:
+            self.history.add("assistant", response)
+        return response
+
+    @property
+    def last_response_metrics(self) -> Optional[Dict[str, float]]:
+        """Time to first token, duration, chunk and character counts of the last stream."""
+        return self.response_metrics[-1] if self.response_metrics else None
+
+    def pace(self) -> None:
+        """Wait for the response delay, returning early when the interface is stopped."""
+        if self.response_delay > 0:
+            self._stopped.wait(self.response_delay)
+
+    async def asend_message(self, message: str) -> None:
+        """Send a message and log it without blocking the event loop.
+
+        Args:
+            message: Message to send
+        """
+        self.logger.info("USER: %s", message)
+        await self.apace()
+
+    async def areceive_response(self, response: str) -> None:
+        """Receive and log a response from a coroutine.
+
+        Args:
+            response: Response message to receive
+        """
+        self.receive_response(response)
+
+    async def apace(self) -> None:
+        """Await the response delay; cancelling the awaiting task cuts it short."""
+        if self.response_delay > 0:
+            await asyncio.sleep(self.response_delay)
 
     def start(self) -> None:
         """Start the interactive chatbot interface."""
         self.is_running = True
+        self._stopped.clear()
         self.logger.info("Chatbot interface started. Type 'quit' to exit.")
 
         while self.is_running:
@@ -63,6 +242,7 @@ class ChatbotInterface:
                     break
 
                 self.send_message(user_input)
+                self.record_user_message(user_input)
                 
                 bot_response = self._generate_response(user_input)
                 self.receive_response(bot_response)
@@ -72,7 +252,7 @@ class ChatbotInterface:
                 self.is_running = False
                 break
             except Exception as e:
-                self.logger.error(f"Error: {str(e)}")
+                self.logger.error("Error: %s", e)
 
     def _generate_response(self, user_input: str) -> str:
         """Generate a response based on user input.
@@ -83,13 +263,14 @@ class ChatbotInterface:
         Returns:
             Generated response string
         """
-        if "hello" in user_input.lower():
+        intent = CHATBOT_INTENTS.intent(user_input)
+        if intent == "greeting":
             return "Hello! How can I help you today?"
-        elif "how are you" in user_input.lower():
+        elif intent == "wellbeing":
             return "I'm doing well, thank you for asking!"
-        elif "time" in user_input.lower():
+        elif intent == "time":
             return f"The current time is {self._get_timestamp()}"
-        elif "help" in user_input.lower():
+        elif intent == "help":
             return "I'm a simple chatbot interface. You can ask me basic questions or type 'quit' to exit."
         else:
             return "I received your message. This is a test interface for AI agent frameworks."
@@ -97,13 +278,14 @@ class ChatbotInterface:
     def stop(self) -> None:
         """Stop the chatbot interface."""
         self.is_running = False
+        self._stopped.set()
         self.logger.info("Chatbot interface stopped.")
 
     def set_response_delay(self, delay: float) -> None:
         """Set the response delay between messages.
 
         Args:
-            delay: Delay in seconds
+            delay: Delay in seconds, 0 to disable pacing
         """
         self.response_delay = delay
-        self.logger.debug(f"Response delay set to {delay} seconds.") 
\ No newline at end of file
+        self.logger.debug("Response delay set to %s seconds.", delay) 
\ No newline at end of file
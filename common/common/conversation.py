@@ -0,0 +1,206 @@
+"""Bounded per-session conversation history."""
+
+import math
+import sys
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Sequence
+
+# Rough characters per token for English text with the OpenAI tokenizers
+CHARS_PER_TOKEN = 4
+
+ROLES = ("user", "assistant", "system")
+
+Summarizer = Callable[[Optional[str], Sequence["Turn"]], str]
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in a text without a tokenizer.
+
+    Args:
+        text: Message text
+
+    Returns:
+        Approximate token count
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut a text down to roughly ``max_tokens`` tokens.
+
+    Args:
+        text: Message text
+        max_tokens: Token limit
+
+    Returns:
+        The text, shortened with an ellipsis if it was over the limit
+    """
+    limit = max_tokens * CHARS_PER_TOKEN
+    return text if len(text) <= limit else text[:max(limit - 1, 0)] + "…"
+
+
+class Turn:
+    """Compact record of one message."""
+
+    __slots__ = ("role", "text", "tokens", "timestamp")
+
+    def __init__(self, role: str, text: str, tokens: int, timestamp: float):
+        """Initialize the record.
+
+        Args:
+            role: ``user``, ``assistant`` or ``system``
+            text: Message text
+            tokens: Estimated token count of the text
+            timestamp: Epoch seconds when the message was added
+        """
+        self.role = role
+        self.text = text
+        self.tokens = tokens
+        self.timestamp = timestamp
+
+    def __repr__(self) -> str:
+        return f"Turn(role={self.role!r}, tokens={self.tokens})"
+
+
+class ConversationHistory:
+    """Ring buffer of recent messages kept within a turn and token budget.
+
+    Adding a message evicts the oldest ones until at most ``max_turns``
+    messages totalling at most ``max_tokens`` remain; single messages are
+    truncated to ``max_message_tokens``. Evicted messages are dropped, or
+    folded into a rolling summary when a ``summarizer`` is given, so both
+    memory per session and the history sent with each prompt stay bounded.
+    """
+
+    def __init__(self, max_turns: int = 20, max_tokens: int = 2000,
+                 max_message_tokens: int = 500, summarizer: Optional[Summarizer] = None,
+                 max_summary_tokens: int = 300):
+        """Initialize an empty history.
+
+        Args:
+            max_turns: Maximum number of messages kept verbatim
+            max_tokens: Token budget of the messages kept verbatim
+            max_message_tokens: Token limit of a single stored message
+            summarizer: Optional callable taking the previous summary and the
+                evicted turns and returning the new summary
+            max_summary_tokens: Token limit of the rolling summary
+        """
+        self.max_turns = max_turns
+        self.max_tokens = max_tokens
+        self.max_message_tokens = min(max_message_tokens, max_tokens)
+        self.summarizer = summarizer
+        self.max_summary_tokens = max_summary_tokens
+        self.summary: Optional[str] = None
+        self.evicted = 0
+        self._turns: Deque[Turn] = deque()
+        self._tokens = 0
+
+    def __len__(self) -> int:
+        """Number of messages kept verbatim."""
+        return len(self._turns)
+
+    @property
+    def tokens(self) -> int:
+        """Estimated tokens of the kept messages and the summary."""
+        summary_tokens = estimate_tokens(self.summary) if self.summary else 0
+        return self._tokens + summary_tokens
+
+    @property
+    def turns(self) -> List[Turn]:
+        """Kept messages, oldest first."""
+        return list(self._turns)
+
+    def add(self, role: str, text: str) -> Turn:
+        """Append a message, evicting old ones to stay within budget.
+
+        Args:
+            role: ``user``, ``assistant`` or ``system``
+            text: Message text
+
+        Returns:
+            The stored record
+
+        Raises:
+            ValueError: If the role is unknown
+        """
+        if role not in ROLES:
+            raise ValueError(f"Unknown role: {role}")
+        text = truncate_to_tokens(text, self.max_message_tokens)
+        turn = Turn(sys.intern(role), text, estimate_tokens(text), time.time())
+        self._turns.append(turn)
+        self._tokens += turn.tokens
+
+        evicted: List[Turn] = []
+        while len(self._turns) > self.max_turns or self._tokens > self.max_tokens:
+            oldest = self._turns.popleft()
+            self._tokens -= oldest.tokens
+            evicted.append(oldest)
+        if evicted:
+            self.evicted += len(evicted)
+            if self.summarizer is not None:
+                self.summary = truncate_to_tokens(self.summarizer(self.summary, evicted),
+                                                  self.max_summary_tokens)
+        return turn
+
+    def messages(self) -> List[Dict[str, str]]:
+        """Get the history as chat messages, the summary first.
+
+        Returns:
+            List of ``{"role", "content"}`` dictionaries
+        """
+        messages = []
+        if self.summary:
+            messages.append({"role": "system",
+                             "content": f"Summary of the earlier conversation: {self.summary}"})
+        messages.extend({"role": turn.role, "content": turn.text} for turn in self._turns)
+        return messages
+
+    def render(self) -> str:
+        """Render the history as plain text for prompt templates.
+
+        Returns:
+            One ``Role: text`` line per message, the summary first
+        """
+        return "\n".join(f"{message['role'].capitalize()}: {message['content']}"
+                         for message in self.messages())
+
+    def clear(self) -> None:
+        """Forget all messages and the summary."""
+        self._turns.clear()
+        self._tokens = 0
+        self.summary = None
+
+
+def history_context(history: Optional[ConversationHistory]) -> str:
+    """Render the earlier turns of a conversation as a prompt preamble.
+
+    Args:
+        history: Conversation history, or None when there is none
+
+    Returns:
+        ``Conversation so far:`` followed by the rendered history and a blank
+        line, or an empty string when the history is missing or empty
+    """
+    if history is None or not (history.summary or len(history)):
+        return ""
+    return f"Conversation so far:\n{history.render()}\n\n"
+
+
+def bounded_messages(limit: int) -> Callable[[List, List], List]:
+    """Build a reducer appending messages while keeping only the latest ``limit``.
+
+    Intended for ``Annotated`` list fields of LangGraph states, so nodes
+    return only their new messages and the state never grows without bound.
+
+    Args:
+        limit: Maximum number of messages kept
+
+    Returns:
+        Reducer taking the current and the new messages
+    """
+    def reduce(current: Optional[List], new: Optional[List]) -> List:
+        merged = list(current or [])
+        merged.extend(new or [])
+        return merged[-limit:]
+    return reduce
@@ -0,0 +1,156 @@
+"""Compiled keyword intent dispatcher for chatbot and agent routing."""
+
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+
+class Intent:
+    """Named intent triggered by keywords."""
+
+    __slots__ = ("name", "any_of", "all_of", "priority", "whole_word")
+
+    def __init__(self, name: str, any_of: Iterable[str] = (), all_of: Iterable[str] = (),
+                 priority: int = 0, whole_word: bool = True):
+        """Initialize the intent.
+
+        Args:
+            name: Intent name returned by the dispatcher
+            any_of: Keywords of which at least one must occur, if any are given
+            all_of: Keywords that must all occur
+            priority: Intents with a higher priority win; ties go to the intent
+                registered first
+            whole_word: Whether keywords only match whole words
+        """
+        self.name = name
+        self.any_of = tuple(keyword.lower() for keyword in any_of)
+        self.all_of = tuple(keyword.lower() for keyword in all_of)
+        self.priority = priority
+        self.whole_word = whole_word
+        if not self.any_of and not self.all_of:
+            raise ValueError(f"Intent {name} needs at least one keyword")
+
+    def __repr__(self) -> str:
+        return f"Intent(name={self.name!r}, priority={self.priority})"
+
+
+class IntentMatch:
+    """Result of classifying a message."""
+
+    __slots__ = ("intent", "spans")
+
+    def __init__(self, intent: str, spans: List[Tuple[int, int, str]]):
+        """Initialize the match.
+
+        Args:
+            intent: Name of the matched intent
+            spans: ``(start, end, keyword)`` of the intent's keywords in the message
+        """
+        self.intent = intent
+        self.spans = spans
+
+    def __repr__(self) -> str:
+        return f"IntentMatch(intent={self.intent!r}, spans={self.spans})"
+
+
+class IntentDispatcher:
+    """Classifies messages against many keyword intents in one pass.
+
+    All keywords of all intents are compiled into a single case-insensitive
+    regular expression, longest keywords first, so a message is scanned once
+    regardless of how many intents are registered. The keywords found are
+    then checked against each intent's ``any_of``/``all_of`` rules in
+    priority order.
+    """
+
+    def __init__(self, intents: Sequence[Intent]):
+        """Compile the intents.
+
+        Args:
+            intents: Intents in registration order
+        """
+        self.intents = list(intents)
+        self._ranked = sorted(range(len(self.intents)),
+                              key=lambda index: (-self.intents[index].priority, index))
+
+        patterns: Dict[str, str] = {}
+        for intent in self.intents:
+            for keyword in intent.any_of + intent.all_of:
+                # A keyword shared with a substring intent matches as a substring
+                pattern = re.escape(keyword)
+                if intent.whole_word and patterns.get(keyword, r"\b").startswith(r"\b"):
+                    pattern = rf"\b{pattern}\b"
+                patterns[keyword] = pattern
+        ordered = sorted(patterns, key=len, reverse=True)
+        self._pattern = re.compile("|".join(patterns[keyword] for keyword in ordered),
+                                   re.IGNORECASE)
+
+    def _scan(self, text: str) -> Dict[str, List[Tuple[int, int, str]]]:
+        """Find all keyword occurrences, grouped by keyword."""
+        found: Dict[str, List[Tuple[int, int, str]]] = {}
+        for match in self._pattern.finditer(text):
+            keyword = match.group(0).lower()
+            found.setdefault(keyword, []).append((match.start(), match.end(), keyword))
+        return found
+
+    @staticmethod
+    def _matches(intent: Intent, keywords: Set[str]) -> bool:
+        """Check an intent's keyword rules against the keywords found."""
+        if intent.any_of and not keywords.intersection(intent.any_of):
+            return False
+        return all(keyword in keywords for keyword in intent.all_of)
+
+    def classify(self, text: str) -> Optional[IntentMatch]:
+        """Classify a message.
+
+        Args:
+            text: User message
+
+        Returns:
+            Highest-priority matching intent with its keyword spans, or None
+        """
+        found = self._scan(text)
+        if not found:
+            return None
+        keywords = set(found)
+        for index in self._ranked:
+            intent = self.intents[index]
+            if self._matches(intent, keywords):
+                spans = sorted(span for keyword in intent.any_of + intent.all_of
+                               for span in found.get(keyword, ()))
+                return IntentMatch(intent.name, spans)
+        return None
+
+    def intent(self, text: str, default: Optional[str] = None) -> Optional[str]:
+        """Get the name of the matching intent.
+
+        Args:
+            text: User message
+            default: Name returned when no intent matches
+
+        Returns:
+            Intent name or ``default``
+        """
+        match = self.classify(text)
+        return match.intent if match else default
+
+
+# Intents of the built-in chatbot responder
+CHATBOT_INTENTS = IntentDispatcher([
+    Intent("greeting", ["hello"]),
+    Intent("wellbeing", ["how are you"]),
+    Intent("time", ["time"]),
+    Intent("help", ["help"]),
+])
+
+# Messages the climate agents answer with a climate analysis
+CLIMATE_INTENTS = IntentDispatcher([
+    Intent("climate", ["climate", "weather"]),
+])
+
+# Data the weather agents fetch for a query; unmatched queries get all cities
+WEATHER_INTENTS = IntentDispatcher([
+    Intent("temperature", ["temperature", "temperatures", "temp"], ["city"]),
+    Intent("compare", ["compare", "compared", "compares", "comparing", "comparison",
+                       "comparisons", "between"]),
+    Intent("summary", ["summary", "all"]),
+])
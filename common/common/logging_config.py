@@ -1,11 +1,510 @@
 """Centralized logging configuration for AI agent frameworks testing."""
 
+import atexit
+import copy
+import glob
+import gzip
+import json
 import logging
 import os
+import queue
+import re
+import shutil
 import sys
-from datetime import datetime
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+QUEUE_POLICIES = ("drop", "block")
+
+# File suffix of rotated log files by compression
+COMPRESSIONS = {"gzip": ".gz", "zstd": ".zst"}
+_LEFTOVER_SUFFIX = re.compile(r"\d{8}-\d{6}(-\d+)?")
+
+# Listener of the most recent asynchronous configuration, stopped on reconfiguration
+_active_listener: Optional[QueueListener] = None
+
+# Rate-limit filters installed by the most recent configuration, by logger name
+_active_rate_limits: Dict[str, "RateLimitFilter"] = {}
+
+# Lock file descriptors held by this process, by the absolute path of the log file
+_log_file_locks: Dict[str, int] = {}
+
+# Attributes of every LogRecord; any other attribute was passed through ``extra``
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {
+    "message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats each record as one JSON object per line.
+
+    The object holds ``timestamp`` (UTC, ISO 8601), ``level``, ``logger`` and
+    the rendered ``message``, followed by the event fields passed with
+    ``extra``, e.g. ``logger.info("Retrieved climate data for %s", city,
+    extra={"city": city})``. Tracebacks and stack information are added
+    under ``exception`` and ``stack``. Values that are not JSON types are
+    written with ``str``.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Render a record as a JSON line."""
+        event = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc)
+            .isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                event[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            event["exception"] = record.exc_text
+        if record.stack_info:
+            event["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(event, default=str, ensure_ascii=False)
+
+
+class BoundedQueueHandler(QueueHandler):
+    """Queue handler that drops or blocks when its bounded queue is full.
+
+    With the ``drop`` policy a full queue discards the record and counts it;
+    the next record that fits is preceded by a warning with the number of
+    records dropped since the last one. With the ``block`` policy the
+    logging thread waits for the listener to make room.
+    """
+
+    def __init__(self, log_queue: queue.Queue, policy: str = "drop"):
+        """Initialize the handler.
+
+        Args:
+            log_queue: Bounded queue read by a ``QueueListener``
+            policy: ``drop`` or ``block``
+
+        Raises:
+            ValueError: If the policy is unknown
+        """
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(f"Unknown queue policy: {policy}")
+        super().__init__(log_queue)
+        self.policy = policy
+        self.dropped = 0
+        self._unreported = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Render the message and traceback so the record no longer refers to live objects.
+
+        Unlike the base class the traceback stays in ``exc_text`` instead of
+        being appended to the message, and the format is left to the
+        listener's handlers.
+        """
+        record = copy.copy(record)
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """Put a prepared record on the queue according to the policy.
+
+        Called with the handler lock held, so the drop counters need no
+        further locking.
+        """
+        if self.policy == "block":
+            self.queue.put(record)
+            return
+        try:
+            if self._unreported:
+                self.queue.put_nowait(self._dropped_record(record, self._unreported))
+                self._unreported = 0
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            self._unreported += 1
+
+    @staticmethod
+    def _dropped_record(record: logging.LogRecord, count: int) -> logging.LogRecord:
+        """Build the warning reporting dropped records."""
+        return logging.LogRecord(record.name, logging.WARNING, __file__, 0,
+                                 f"Dropped {count} log records: logging queue full",
+                                 None, None)
+
+
+class CompressingRotatingFileHandler(RotatingFileHandler):
+    """File handler rotating by size and age that compresses rotated files.
+
+    The file is rotated when a record would grow it beyond ``max_bytes`` or
+    when it is ``rotate_interval`` seconds old; a file kept from an earlier
+    run counts from its modification time. Rotation only
+    renames the file; a background thread then compresses it to
+    ``<file>.1.gz`` (or ``.zst``), so logging threads never wait for the
+    compression unless the previous one is still running. At most
+    ``backup_count`` rotated files are kept; an uncompressed ``<file>.1``
+    left by a failed compression is moved aside to ``<file>.<mtime>`` first,
+    and counts towards ``backup_count`` until it is deleted, oldest first.
+
+    The handler must be the only writer of its file, see ``_claim_log_file``.
+    """
+
+    def __init__(self, filename: str, max_bytes: int = 0,
+                 rotate_interval: Optional[float] = None, backup_count: int = 5,
+                 compression: Optional[str] = "gzip", encoding: Optional[str] = None):
+        """Initialize the handler.
+
+        Args:
+            filename: Path of the active log file
+            max_bytes: Size in bytes that triggers a rotation, 0 for no size limit
+            rotate_interval: Seconds after which the file is rotated, None for no limit
+            backup_count: Number of rotated files kept
+            compression: ``gzip``, ``zstd`` (needs the ``zstandard`` package) or
+                None to keep rotated files uncompressed
+            encoding: Encoding of the log file
+
+        Raises:
+            ValueError: If the compression is unknown or unavailable, or
+                backup_count is not positive
+        """
+        if compression is not None and compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression: {compression}")
+        if compression == "zstd":
+            try:
+                import zstandard  # noqa: F401
+            except ImportError as e:
+                raise ValueError("zstd compression needs the zstandard package") from e
+        if backup_count < 1:
+            raise ValueError("backup_count must be positive")
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count,
+                         encoding=encoding)
+        self.rotate_interval = rotate_interval
+        self.compression = compression
+        self._rollover_at = self._next_rollover(self._file_started())
+        self._compressor: Optional[threading.Thread] = None
+        if compression is not None:
+            self.namer = self._compressed_name
+            self.rotator = self._rotate
+
+    def _file_started(self) -> float:
+        """Get the epoch time the active file was started, its mtime if not empty."""
+        try:
+            stat = os.stat(self.baseFilename)
+        except OSError:
+            return time.time()
+        return min(stat.st_mtime, time.time()) if stat.st_size else time.time()
+
+    def _next_rollover(self, started: Optional[float] = None) -> Optional[float]:
+        """Get the epoch time of the next time-based rotation.
+
+        Args:
+            started: Epoch time the active file was started, now if None
+        """
+        if self.rotate_interval is None:
+            return None
+        return (time.time() if started is None else started) + self.rotate_interval
+
+    def _compressed_name(self, name: str) -> str:
+        """Add the compression suffix to a rotated file name."""
+        return name + COMPRESSIONS[self.compression]
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        """Check whether the file is due for rotation by age or size."""
+        if self._rollover_at is not None and time.time() >= self._rollover_at:
+            return True
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self) -> None:
+        """Rotate the file once the previous compression has finished."""
+        self._wait_for_compression()
+        super().doRollover()
+        self._rollover_at = self._next_rollover()
+
+    def _rotate(self, source: str, dest: str) -> None:
+        """Rename the active file and compress it in the background."""
+        if not os.path.exists(source):
+            return
+        plain = dest[:-len(COMPRESSIONS[self.compression])]
+        if os.path.exists(plain):
+            os.replace(plain, self._leftover_name(plain))
+        self._prune_leftovers()
+        os.replace(source, plain)
+        self._compressor = threading.Thread(target=self._compress, args=(plain, dest),
+                                            name="log-compressor", daemon=True)
+        self._compressor.start()
+
+    def _leftover_name(self, plain: str) -> str:
+        """Get a free name for an uncompressed file left by an earlier rotation."""
+        stamp = datetime.fromtimestamp(os.path.getmtime(plain)).strftime("%Y%m%d-%H%M%S")
+        name = f"{self.baseFilename}.{stamp}"
+        index = 1
+        while os.path.exists(name):
+            name = f"{self.baseFilename}.{stamp}-{index}"
+            index += 1
+        return name
+
+    def _prune_leftovers(self) -> None:
+        """Delete the oldest leftovers beyond ``backup_count`` rotated files.
+
+        Called after the older backups were shifted, so one slot is taken by
+        the file being rotated.
+        """
+        prefix = self.baseFilename + "."
+        leftovers = sorted(
+            (path for path in glob.glob(glob.escape(prefix) + "*")
+             if _LEFTOVER_SUFFIX.fullmatch(path[len(prefix):])),
+            key=os.path.getmtime)
+        rotated = 1 + sum(
+            os.path.exists(self.rotation_filename(f"{self.baseFilename}.{index}"))
+            for index in range(2, self.backupCount + 1))
+        for path in leftovers[:max(len(leftovers) + rotated - self.backupCount, 0)]:
+            os.remove(path)
+
+    def _compress(self, plain: str, dest: str) -> None:
+        """Compress a rotated file; it stays uncompressed if that fails."""
+        partial = dest + ".tmp"
+        try:
+            with open(plain, "rb") as source, self._open_compressed(partial) as target:
+                shutil.copyfileobj(source, target, 1024 * 1024)
+            os.replace(partial, dest)
+            os.remove(plain)
+        except OSError:
+            if os.path.exists(partial):
+                os.remove(partial)
+
+    def _open_compressed(self, path: str):
+        """Open a compressed file for writing."""
+        if self.compression == "zstd":
+            import zstandard
+            return zstandard.open(path, "wb")
+        return gzip.open(path, "wb")
+
+    def _wait_for_compression(self) -> None:
+        """Wait for the running compression, if any."""
+        if self._compressor is not None:
+            self._compressor.join()
+            self._compressor = None
+
+    def close(self) -> None:
+        """Close the file after the running compression has finished."""
+        self._wait_for_compression()
+        super().close()
+
+
+def _claim_log_file(path: str) -> str:
+    """Claim a log file for this process, or get a file of its own.
+
+    A rotating handler must be the only writer of its file: another process
+    would keep appending to the renamed file or rotate it a second time. The
+    first process locks ``<path>.lock`` for its lifetime and writes ``path``;
+    a concurrent one, e.g. a CLI run next to ``--serve``, writes
+    ``<stem>_<pid><suffix>`` instead. Without ``fcntl`` every process gets
+    its own file.
+
+    Args:
+        path: Shared log file path
+
+    Returns:
+        Path of the log file this process may write
+    """
+    key = os.path.abspath(path)
+    if key in _log_file_locks:
+        return path
+    if fcntl is not None:
+        descriptor = os.open(f"{key}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(descriptor, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(descriptor)
+        else:
+            _log_file_locks[key] = descriptor
+            return path
+    stem, suffix = os.path.splitext(path)
+    return f"{stem}_{os.getpid()}{suffix}"
+
+
+class LogRateLimit:
+    """Sampling and rate limit applied to each message of a logger."""
+
+    __slots__ = ("rate", "burst", "sample_every")
+
+    def __init__(self, rate: Optional[float] = None, burst: int = 10, sample_every: int = 1):
+        """Initialize the limit.
+
+        Args:
+            rate: Messages per second let through per message key, None for no limit
+            burst: Messages per key let through at once before ``rate`` applies
+            sample_every: Let through only every N-th message per key
+
+        Raises:
+            ValueError: If a value is not positive
+        """
+        if (rate is not None and rate <= 0) or burst < 1 or sample_every < 1:
+            raise ValueError("Rate, burst and sample_every must be positive")
+        self.rate = rate
+        self.burst = burst
+        self.sample_every = sample_every
+
+    def __repr__(self) -> str:
+        return (f"LogRateLimit(rate={self.rate}, burst={self.burst}, "
+                f"sample_every={self.sample_every})")
+
+
+# Per-lookup messages of the climate data services, which flood the logs under load
+HOT_PATH_RATE_LIMITS = {
+    "climate_data_service": LogRateLimit(rate=5.0, burst=20),
+    "async_climate_data_service": LogRateLimit(rate=5.0, burst=20),
+}
+
+
+class _KeyState:
+    """Token bucket and counters of one message key."""
+
+    __slots__ = ("tokens", "updated", "seen_at", "seen", "suppressed", "levelno")
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+        self.seen_at = updated
+        self.seen = 0
+        self.suppressed = 0
+        self.levelno = logging.NOTSET
+
+
+class RateLimitFilter(logging.Filter):
+    """Logger filter that samples and rate-limits messages per message key.
+
+    The key of a record is its unrendered message, so ``"Retrieved climate
+    data for %s"`` is limited as one message whatever the city. Of each key
+    only every ``sample_every``-th record is considered, and considered
+    records pass while the key's token bucket, refilled at ``rate`` per
+    second up to ``burst`` tokens, has a token left. Every
+    ``summary_interval`` seconds a record reporting the number of
+    suppressed messages per key is written to the logger's handlers.
+
+    Keys are tracked for at most ``max_keys`` messages, least recently seen
+    first out, and keys not seen during a summary interval are dropped when
+    the summaries are written, so messages with varying text cannot grow the
+    filter without bound. A dropped key's pending summary is written first.
+    """
+
+    def __init__(self, limit: LogRateLimit, summary_interval: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic, max_keys: int = 1000):
+        """Initialize the filter.
+
+        Args:
+            limit: Sampling and rate limit per message key
+            summary_interval: Seconds between summaries of suppressed messages
+            clock: Monotonic clock returning seconds
+            max_keys: Maximum number of message keys tracked at once
+        """
+        super().__init__()
+        self.limit = limit
+        self.summary_interval = summary_interval
+        self.clock = clock
+        self.max_keys = max_keys
+        self.suppressed = 0
+        self._keys: OrderedDict[str, _KeyState] = OrderedDict()
+        self._lock = threading.Lock()
+        self._next_summary = clock() + summary_interval
+        self._logger: Optional[logging.Logger] = None
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Decide whether a record passes and write due summaries.
+
+        Args:
+            record: Record logged on the filtered logger
+
+        Returns:
+            Whether the record is passed to the handlers
+        """
+        key = record.msg if isinstance(record.msg, str) else str(record.msg)
+        now = self.clock()
+        limit = self.limit
+        summaries: List[Tuple[str, int, int]] = []
+        with self._lock:
+            state = self._keys.get(key)
+            if state is None:
+                state = self._keys[key] = _KeyState(limit.burst, now)
+                if len(self._keys) > self.max_keys:
+                    summaries.extend(self._summary(*self._keys.popitem(last=False)))
+            else:
+                self._keys.move_to_end(key)
+            state.seen_at = now
+            state.seen += 1
+            allowed = (state.seen - 1) % limit.sample_every == 0
+            if allowed and limit.rate is not None:
+                state.tokens = min(limit.burst, state.tokens + (now - state.updated) * limit.rate)
+                state.updated = now
+                if state.tokens >= 1:
+                    state.tokens -= 1
+                else:
+                    allowed = False
+            if not allowed:
+                state.suppressed += 1
+                state.levelno = max(state.levelno, record.levelno)
+                self.suppressed += 1
+            if now >= self._next_summary:
+                summaries.extend(self._take_summaries(idle_before=now - self.summary_interval))
+                self._next_summary = now + self.summary_interval
+
+        if self._logger is None:
+            self._logger = logging.getLogger(record.name)
+        if summaries:
+            self._write_summaries(summaries)
+        return allowed
+
+    @staticmethod
+    def _summary(key: str, state: _KeyState) -> List[Tuple[str, int, int]]:
+        """Take the pending summary of a key, if it suppressed anything."""
+        if not state.suppressed:
+            return []
+        summary = (key, state.suppressed, state.levelno)
+        state.suppressed = 0
+        state.levelno = logging.NOTSET
+        return [summary]
+
+    def _take_summaries(self, idle_before: Optional[float] = None) -> List[Tuple[str, int, int]]:
+        """Collect and reset the suppressed counts; called with the lock held.
+
+        Args:
+            idle_before: Drop the keys last seen before this time, if given
+        """
+        summaries = []
+        for key, state in list(self._keys.items()):
+            summaries.extend(self._summary(key, state))
+            if idle_before is not None and state.seen_at < idle_before:
+                del self._keys[key]
+        return summaries
+
+    def _write_summaries(self, summaries: List[Tuple[str, int, int]]) -> None:
+        """Write one summary record per suppressed message key."""
+        for key, count, levelno in summaries:
+            summary = self._logger.makeRecord(
+                self._logger.name, levelno, __file__, 0,
+                "Suppressed %d messages like %r", (count, key), None,
+                extra={"suppressed": count, "message_key": key},
+            )
+            self._logger.callHandlers(summary)
+
+    def flush(self) -> None:
+        """Write the summaries of messages suppressed since the last one."""
+        with self._lock:
+            summaries = self._take_summaries()
+            self._next_summary = self.clock() + self.summary_interval
+        if self._logger is not None:
+            self._write_summaries(summaries)
 
 
 class LoggingConfig:
@@ -14,28 +513,106 @@ class LoggingConfig:
     def __init__(self, 
                  log_level: str = "INFO",
                  log_file: Optional[str] = None,
-                 log_format: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"):
+                 log_format: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+                 async_logging: bool = False,
+                 queue_size: int = 10000,
+                 queue_policy: str = "drop",
+                 json_format: bool = False,
+                 rate_limits: Optional[Dict[str, LogRateLimit]] = None,
+                 summary_interval: float = 60.0,
+                 max_bytes: int = 0,
+                 rotate_interval: Optional[float] = None,
+                 backup_count: int = 5,
+                 compression: Optional[str] = "gzip"):
         """Initialize logging configuration.
 
         Args:
             log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
             log_file: Optional log file path
             log_format: Log message format
+            async_logging: Whether logging threads only enqueue records while a
+                background listener thread writes them to the handlers
+            queue_size: Maximum number of records waiting in asynchronous mode
+            queue_policy: ``drop`` to discard records when the queue is full,
+                ``block`` to wait for room
+            json_format: Whether handlers write JSON lines instead of ``log_format``
+            rate_limits: Sampling and rate limits by logger name, e.g.
+                ``HOT_PATH_RATE_LIMITS``
+            summary_interval: Seconds between summaries of rate-limited messages
+            max_bytes: Size in bytes at which the log file is rotated, 0 for no limit
+            rotate_interval: Seconds after which the log file is rotated, None for
+                no limit; without both limits the log file grows unbounded
+            backup_count: Number of rotated log files kept
+            compression: ``gzip``, ``zstd`` or None for rotated log files
         """
         self.log_level = getattr(logging, log_level.upper())
         self.log_file = log_file
         self.log_format = log_format
+        self.async_logging = async_logging
+        self.queue_size = queue_size
+        self.queue_policy = queue_policy
+        self.json_format = json_format
+        self.rate_limits = rate_limits or {}
+        self.summary_interval = summary_interval
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.backup_count = backup_count
+        self.compression = compression
+        self.rate_limit_filters: Dict[str, RateLimitFilter] = {}
+        self.queue_handler: Optional[BoundedQueueHandler] = None
+        self.listener: Optional[QueueListener] = None
         self._setup_logging()
 
     def _setup_logging(self) -> None:
         """Set up the logging configuration."""
+        global _active_listener
+        if _active_listener is not None:
+            _active_listener.stop()
+            _active_listener = None
+        for name, rate_limit_filter in _active_rate_limits.items():
+            logging.getLogger(name).removeFilter(rate_limit_filter)
+        _active_rate_limits.clear()
+
+        for name, limit in self.rate_limits.items():
+            rate_limit_filter = RateLimitFilter(limit, self.summary_interval)
+            logging.getLogger(name).addFilter(rate_limit_filter)
+            self.rate_limit_filters[name] = rate_limit_filter
+        _active_rate_limits.update(self.rate_limit_filters)
+
+        handlers = self._get_handlers()
+        if self.async_logging:
+            log_queue: queue.Queue = queue.Queue(self.queue_size)
+            self.queue_handler = BoundedQueueHandler(log_queue, self.queue_policy)
+            self.listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+            self.listener.start()
+            _active_listener = self.listener
+            handlers = [self.queue_handler]
+
         logging.basicConfig(
             level=self.log_level,
             format=self.log_format,
-            handlers=self._get_handlers(),
+            handlers=handlers,
             force=True
         )
 
+    def stop(self) -> None:
+        """Write pending rate-limit summaries, then queued records, and stop the listener.
+
+        The listener part does nothing unless asynchronous logging is enabled.
+        """
+        global _active_listener
+        for rate_limit_filter in self.rate_limit_filters.values():
+            rate_limit_filter.flush()
+        if self.listener is None:
+            return
+        if _active_listener is self.listener:
+            _active_listener = None
+        # The listener drains the queue before its thread exits
+        if self.listener._thread is not None:
+            self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.flush()
+
     def _get_handlers(self) -> list:
         """Get logging handlers.
 
@@ -46,19 +623,33 @@ class LoggingConfig:
 
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setLevel(self.log_level)
-        console_formatter = logging.Formatter(self.log_format)
-        console_handler.setFormatter(console_formatter)
+        console_handler.setFormatter(self._get_formatter())
         handlers.append(console_handler)
 
         if self.log_file:
-            file_handler = logging.FileHandler(self.log_file)
+            if self.max_bytes or self.rotate_interval is not None:
+                file_handler = CompressingRotatingFileHandler(
+                    self.log_file, self.max_bytes, self.rotate_interval,
+                    self.backup_count, self.compression,
+                )
+            else:
+                file_handler = logging.FileHandler(self.log_file)
             file_handler.setLevel(self.log_level)
-            file_formatter = logging.Formatter(self.log_format)
-            file_handler.setFormatter(file_formatter)
+            file_handler.setFormatter(self._get_formatter())
             handlers.append(file_handler)
 
         return handlers
 
+    def _get_formatter(self) -> logging.Formatter:
+        """Get the formatter of the handlers.
+
+        Returns:
+            JSON formatter in structured mode, otherwise a ``log_format`` formatter
+        """
+        if self.json_format:
+            return JsonFormatter()
+        return logging.Formatter(self.log_format)
+
     @staticmethod
     def get_logger(name: str) -> logging.Logger:
         """Get a logger instance.
@@ -74,35 +665,77 @@ class LoggingConfig:
     @staticmethod
     def setup_framework_logging(framework_name: str, 
                                log_level: str = "INFO",
-                               log_dir: str = "logs") -> logging.Logger:
+                               log_dir: str = "logs",
+                               async_logging: bool = False,
+                               json_format: bool = False,
+                               rate_limits: Optional[Dict[str, LogRateLimit]] = None,
+                               max_bytes: int = 10 * 1024 * 1024,
+                               rotate_interval: Optional[float] = 24 * 60 * 60,
+                               backup_count: int = 5,
+                               compression: Optional[str] = "gzip") -> logging.Logger:
         """Set up framework-specific logging.
 
+        Logs go to ``{log_dir}/{framework_name}.log``, which is rotated at
+        ``max_bytes`` or after ``rotate_interval`` seconds into at most
+        ``backup_count`` compressed files shared by all runs. Only one process
+        writes that file at a time; processes started while it is in use write
+        ``{log_dir}/{framework_name}_{pid}.log``.
+
         Args:
             framework_name: Name of the framework
             log_level: Logging level
             log_dir: Directory for log files
+            async_logging: Whether to write log records from a background thread
+            json_format: Whether to write JSON lines
+            rate_limits: Sampling and rate limits by logger name
+            max_bytes: Size in bytes at which the log file is rotated, 0 for no limit
+            rotate_interval: Seconds after which the log file is rotated, None for no limit
+            backup_count: Number of rotated log files kept
+            compression: ``gzip``, ``zstd`` or None for rotated log files
 
         Returns:
             Configured logger instance
         """
         Path(log_dir).mkdir(exist_ok=True)
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        log_file = f"{log_dir}/{framework_name}_{timestamp}.log"
-        
-        config = LoggingConfig(log_level=log_level, log_file=log_file)
+        log_file = _claim_log_file(f"{log_dir}/{framework_name}.log")
+
+        config = LoggingConfig(log_level=log_level, log_file=log_file,
+                               async_logging=async_logging, json_format=json_format,
+                               rate_limits=rate_limits, max_bytes=max_bytes,
+                               rotate_interval=rotate_interval, backup_count=backup_count,
+                               compression=compression)
         return config.get_logger(framework_name)
 
 
 def setup_logging(log_level: str = "INFO", 
-                 log_file: Optional[str] = None) -> None:
+                 log_file: Optional[str] = None,
+                 async_logging: bool = False,
+                 json_format: bool = False,
+                 rate_limits: Optional[Dict[str, LogRateLimit]] = None) -> LoggingConfig:
     """Set up global logging configuration.
 
     Args:
         log_level: Logging level
         log_file: Optional log file path
+        async_logging: Whether to write log records from a background thread
+        json_format: Whether to write JSON lines
+        rate_limits: Sampling and rate limits by logger name
+
+    Returns:
+        The applied configuration
     """
-    LoggingConfig(log_level=log_level, log_file=log_file)
+    return LoggingConfig(log_level=log_level, log_file=log_file,
+                         async_logging=async_logging, json_format=json_format,
+                         rate_limits=rate_limits)
+
+
+@atexit.register
+def _stop_active_listener() -> None:
+    """Write out rate-limit summaries and records still queued when the interpreter exits."""
+    for rate_limit_filter in _active_rate_limits.values():
+        rate_limit_filter.flush()
+    if _active_listener is not None and _active_listener._thread is not None:
+        _active_listener.stop()
 
 
 def get_logger(name: str) -> logging.Logger:
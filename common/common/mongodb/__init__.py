@@ -1,6 +1,10 @@
 """MongoDB climate data service package."""
 
+from .async_climate_data import AsyncClimateDataService
+from .city_resolver import CityResolver
 from .climate_data import ClimateDataService
+from .history import TemperatureHistory
 
 __version__ = "0.1.0"
-__all__ = ["ClimateDataService"] 
\ No newline at end of file
+__all__ = ["ClimateDataService", "AsyncClimateDataService", "CityResolver",
+           "TemperatureHistory"] 
\ No newline at end of file
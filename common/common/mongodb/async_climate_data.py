@@ -0,0 +1,179 @@
+"""Asynchronous MongoDB read service for climate data."""
+
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from pymongo import ASCENDING, AsyncMongoClient
+from pymongo.asynchronous.collection import AsyncCollection
+from pymongo.asynchronous.database import AsyncDatabase
+
+from common.common.logging_config import get_logger
+from common.common.mongodb.climate_data import ClimateDataService
+from common.common.mongodb.rollups import TemperatureRollups
+from common.common.mongodb.stats import SNAPSHOT_PROJECTION
+from common.common.mongodb.summary import SUMMARY_ID, decode_summary
+
+
+class AsyncClimateDataService:
+    """Asyncio counterpart of the ClimateDataService read paths.
+
+    Writes stay on the synchronous ClimateDataService, which maintains the
+    rollups and the materialized summary; this service only reads them, so
+    several lookups can be awaited concurrently from one event loop.
+    """
+
+    def __init__(self, connection_string: str = "mongodb://localhost:27017/"):
+        """Initialize the async climate data service.
+
+        Args:
+            connection_string: MongoDB connection string
+        """
+        self.client: AsyncMongoClient = AsyncMongoClient(connection_string)
+        self.db: AsyncDatabase = self.client["climate_db"]
+        self.collection: AsyncCollection = self.db["city_climate"]
+        self.rollups_collection: AsyncCollection = self.db["city_climate_rollups"]
+        self.summary_collection: AsyncCollection = self.db["climate_summary"]
+        self.logger = get_logger("async_climate_data_service")
+
+    async def get_city_climate(self, city_name: str) -> Optional[Dict]:
+        """Get climate data for a specific city.
+
+        Args:
+            city_name: Name of the city
+
+        Returns:
+            Climate data dictionary or None if not found
+        """
+        data = await self.collection.find_one({"city": city_name})
+        if data:
+            self.logger.info("Retrieved climate data for %s", city_name, extra={"city": city_name})
+        else:
+            self.logger.warning("No climate data found for %s", city_name,
+                                extra={"city": city_name})
+        return data
+
+    async def get_cities_climate(self, city_names: List[str],
+                                 projection: Optional[Dict] = None) -> List[Dict]:
+        """Get climate data for several cities in a single query.
+
+        Args:
+            city_names: Names of the cities
+            projection: Optional fields to return
+
+        Returns:
+            List of climate data dictionaries for the cities that were found with
+            a numeric temperature
+        """
+        cursor = self.collection.find(
+            {"city": {"$in": list(city_names)}, "temperature_celsius": {"$type": "number"}},
+            projection,
+        )
+        data = await cursor.to_list()
+        self.logger.info("Retrieved climate data for %s of %s cities", len(data), len(city_names))
+        return data
+
+    async def get_all_cities(self) -> List[str]:
+        """Get list of all cities with climate data.
+
+        Returns:
+            List of city names
+        """
+        cities = await self.collection.distinct("city")
+        self.logger.info("Retrieved %s cities with climate data", len(cities))
+        return cities
+
+    async def get_temperature_snapshot(self, projection: Optional[Dict] = None,
+                                       batch_size: int = 10000) -> AsyncIterator[Dict]:
+        """Stream projected temperature readings for all cities.
+
+        Args:
+            projection: Fields to return, defaults to the statistics snapshot fields
+            batch_size: Number of documents fetched per round trip
+
+        Yields:
+            Projected city documents holding a numeric temperature
+        """
+        cursor = self.collection.find(
+            {"temperature_celsius": {"$type": "number"}},
+            projection or SNAPSHOT_PROJECTION,
+            batch_size=batch_size,
+        )
+        try:
+            async for doc in cursor:
+                yield doc
+        finally:
+            await cursor.close()
+
+    async def iter_city_climate(self, query: Optional[Dict] = None,
+                                projection: Optional[Dict] = None,
+                                limit: Optional[int] = None,
+                                batch_size: int = 1000) -> AsyncIterator[Dict]:
+        """Stream city documents in city index order.
+
+        Args:
+            query: Optional filter on the city documents
+            projection: Optional fields to return
+            limit: Optional maximum number of documents
+            batch_size: Number of documents fetched per round trip
+
+        Yields:
+            Matching documents sorted by city
+        """
+        cursor = self.collection.find(query or {}, projection, batch_size=batch_size)
+        cursor = cursor.sort("city", ASCENDING)
+        if limit:
+            cursor = cursor.limit(limit)
+        try:
+            async for doc in cursor:
+                yield doc
+        finally:
+            await cursor.close()
+
+    async def nearest_cities(self, latitude: float, longitude: float, limit: int = 5,
+                             max_distance_km: Optional[float] = None,
+                             query: Optional[Dict] = None) -> List[Dict]:
+        """Find the cities closest to a point using the 2dsphere index.
+
+        Args:
+            latitude: Latitude in degrees
+            longitude: Longitude in degrees
+            limit: Maximum number of cities to return
+            max_distance_km: Optional search radius in kilometers
+            query: Optional filter applied to candidate cities
+
+        Returns:
+            List of climate data dictionaries ordered by distance
+        """
+        pipeline = ClimateDataService.geo_near_pipeline(
+            latitude, longitude, limit, max_distance_km, query
+        )
+        cursor = await self.collection.aggregate(pipeline)
+        cities = await cursor.to_list()
+        self.logger.info("Found %s cities near (%s, %s)", len(cities), latitude, longitude)
+        return cities
+
+    async def get_temperature_trend(self, city_name: str, window: str = "24h") -> Optional[Dict]:
+        """Get rolling temperature aggregates for a city.
+
+        Args:
+            city_name: Name of the city
+            window: Trailing window, one of ``24h``, ``7d`` or ``30d``
+
+        Returns:
+            Dictionary with count, mean, std, min and max, or None if there is no data
+        """
+        query, projection = TemperatureRollups.window_query(city_name, window)
+        documents = await self.rollups_collection.find(query, projection).to_list()
+        return TemperatureRollups.combine(documents)
+
+    async def get_weather_summary(self) -> Dict[str, Any]:
+        """Get the materialized weather summary over all cities.
+
+        Returns:
+            Summary document, or an empty dictionary if it has not been built yet
+        """
+        return decode_summary(await self.summary_collection.find_one({"_id": SUMMARY_ID}))
+
+    async def close(self) -> None:
+        """Close the MongoDB connection."""
+        await self.client.close()
+        self.logger.info("Async MongoDB connection closed")
@@ -0,0 +1,255 @@
+"""Fuzzy resolution of free-text city names against the city directory."""
+
+import bisect
+import difflib
+import heapq
+import re
+import threading
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+MIN_PREFIX_LENGTH = 3
+
+# Punctuation ending a clause; a partial city name must not be followed by another word
+CLAUSE_BREAK = re.compile(r"[,.;:!?()\[\]{}\"/]+")
+
+
+def normalize_city_name(name: str) -> str:
+    """Normalize a city name for matching.
+
+    Accents are stripped, letters lowercased and punctuation collapsed, so
+    "São Paulo", "sao paulo" and "Sao-Paulo" share one key.
+
+    Args:
+        name: City name as written by the user or stored in the database
+
+    Returns:
+        Normalized matching key, empty if the name holds no letters or digits
+    """
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(re.findall(r"[a-z0-9]+", stripped.lower()))
+
+
+def trigrams(key: str) -> Set[str]:
+    """Get the padded character trigrams of a normalized key.
+
+    Args:
+        key: Normalized city name
+
+    Returns:
+        Set of trigrams, with the word start weighted by double padding
+    """
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class CityResolver:
+    """In-memory trigram and prefix index over canonical city names.
+
+    Exact keys resolve with a score of 1.0. Partial names ("Rio") resolve
+    through a sorted prefix index, and misspellings ("tokio") through the
+    trigram index, which narrows the directory to a few candidates before
+    they are scored with ``difflib``. Lookups never touch the database.
+    """
+
+    def __init__(self, cities: Iterable[str] = (), min_score: float = 0.8,
+                 candidates: int = 8):
+        """Initialize the resolver.
+
+        Args:
+            cities: Canonical city names to index
+            min_score: Minimum score for a match to be returned
+            candidates: Number of trigram candidates scored per lookup
+        """
+        self.min_score = min_score
+        self.candidates = candidates
+        self._lock = threading.Lock()
+        self._names: Dict[str, str] = {}
+        self._sorted_keys: List[str] = []
+        self._trigrams: Dict[str, Set[str]] = {}
+        self.refresh(cities)
+
+    def __len__(self) -> int:
+        """Number of indexed cities."""
+        return len(self._names)
+
+    def refresh(self, cities: Iterable[str]) -> None:
+        """Rebuild the index from a full city directory.
+
+        Args:
+            cities: Canonical city names
+        """
+        names: Dict[str, str] = {}
+        for city in cities:
+            key = normalize_city_name(city)
+            if key:
+                names.setdefault(key, city)
+
+        index: Dict[str, Set[str]] = {}
+        for key in names:
+            for gram in trigrams(key):
+                index.setdefault(gram, set()).add(key)
+
+        with self._lock:
+            self._names = names
+            self._sorted_keys = sorted(names)
+            self._trigrams = index
+
+    def add(self, city: str) -> bool:
+        """Index a single new city.
+
+        Args:
+            city: Canonical city name
+
+        Returns:
+            True if the city was added, False if it was already indexed
+        """
+        key = normalize_city_name(city)
+        with self._lock:
+            if not key or key in self._names:
+                return False
+            self._names[key] = city
+            bisect.insort(self._sorted_keys, key)
+            for gram in trigrams(key):
+                self._trigrams.setdefault(gram, set()).add(key)
+        return True
+
+    def remove(self, city: str) -> bool:
+        """Drop a city from the index.
+
+        Args:
+            city: Canonical city name
+
+        Returns:
+            True if the city was indexed, False otherwise
+        """
+        key = normalize_city_name(city)
+        with self._lock:
+            if self._names.pop(key, None) is None:
+                return False
+            self._sorted_keys.pop(bisect.bisect_left(self._sorted_keys, key))
+            for gram in trigrams(key):
+                self._trigrams[gram].discard(key)
+        return True
+
+    def resolve(self, name: str) -> Optional[Tuple[str, float]]:
+        """Resolve a city name to its best canonical match.
+
+        Args:
+            name: City name as written by the user
+
+        Returns:
+            Tuple of canonical city name and score between 0 and 1, or None if
+            no city scores at least ``min_score``
+        """
+        key = normalize_city_name(name)
+        if not key:
+            return None
+        with self._lock:
+            match = self._match(key, word_prefix=False)
+        return match if match and match[1] >= self.min_score else None
+
+    def canonical(self, name: str) -> Optional[str]:
+        """Get the canonical name for a city, or None if it cannot be resolved.
+
+        Args:
+            name: City name as written by the user
+
+        Returns:
+            Canonical city name or None
+        """
+        match = self.resolve(name)
+        return match[0] if match else None
+
+    def find_in_text(self, text: str, max_words: int = 3) -> List[str]:
+        """Find the cities mentioned in free text.
+
+        Every run of up to ``max_words`` words is resolved; overlapping
+        matches are settled in favour of the higher score. A run naming only
+        the first words of a city ("Rio" for "Rio de Janeiro") matches only
+        at the end of a clause, so "San Diego" does not resolve to "San
+        Francisco" and "new with" does not resolve to "New York".
+
+        Args:
+            text: User input
+            max_words: Longest run of words tried as a city name
+
+        Returns:
+            Canonical city names without duplicates, best match first
+        """
+        spans = []
+        offset = 0
+        with self._lock:
+            for clause in CLAUSE_BREAK.split(text):
+                words = normalize_city_name(clause).split()
+                for start in range(len(words)):
+                    for end in range(start + 1, min(start + max_words, len(words)) + 1):
+                        match = self._match(" ".join(words[start:end]), word_prefix=True,
+                                            partial=end == len(words))
+                        if match and match[1] >= self.min_score:
+                            spans.append((match[1], end - start, offset + start, match[0]))
+                offset += len(words)
+
+        taken: Set[int] = set()
+        cities: List[str] = []
+        for _, length, start, city in sorted(spans, key=lambda span: (-span[0], -span[1], span[2])):
+            positions = range(start, start + length)
+            if taken.intersection(positions):
+                continue
+            taken.update(positions)
+            if city not in cities:
+                cities.append(city)
+        return cities
+
+    def _match(self, key: str, word_prefix: bool,
+               partial: bool = True) -> Optional[Tuple[str, float]]:
+        """Score a normalized key against the index; the caller holds the lock."""
+        city = self._names.get(key)
+        if city is not None:
+            return city, 1.0
+        best = self._prefix_match(key, word_prefix) if partial else None
+        fuzzy = self._fuzzy_match(key)
+        if fuzzy and (best is None or fuzzy[1] > best[1]):
+            best = fuzzy
+        return best
+
+    def _prefix_match(self, key: str, word_prefix: bool) -> Optional[Tuple[str, float]]:
+        """Find the shortest indexed name starting with the key.
+
+        With ``word_prefix`` the key has to end on a word boundary of the name,
+        so "rio" matches "rio de janeiro" but "par" does not match "paris".
+        """
+        if len(key) < MIN_PREFIX_LENGTH:
+            return None
+        best = None
+        position = bisect.bisect_left(self._sorted_keys, key)
+        while position < len(self._sorted_keys):
+            candidate = self._sorted_keys[position]
+            if not candidate.startswith(key):
+                break
+            if (not word_prefix or candidate[len(key)] == " ") and (
+                    best is None or len(candidate) < len(best)):
+                best = candidate
+            position += 1
+        if best is None:
+            return None
+        return self._names[best], 0.8 + 0.2 * len(key) / len(best)
+
+    def _fuzzy_match(self, key: str) -> Optional[Tuple[str, float]]:
+        """Score the names sharing the most trigrams with the key."""
+        shared: Dict[str, int] = {}
+        for gram in trigrams(key):
+            for candidate in self._trigrams.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        if not shared:
+            return None
+
+        matcher = difflib.SequenceMatcher(None, b=key)
+        best, best_score = None, 0.0
+        for candidate in heapq.nlargest(self.candidates, shared, key=shared.__getitem__):
+            matcher.set_seq1(candidate)
+            score = matcher.ratio()
+            if score > best_score:
+                best, best_score = candidate, score
+        return self._names[best], best_score
@@ -1,20 +1,38 @@
 """MongoDB service for climate data management."""
 
 import os
-from typing import Dict, Any, List, Optional
+import time
+from typing import Dict, Any, Iterator, List, Optional
 from datetime import datetime, timedelta
 import json
-from pymongo import MongoClient
+from bson import ObjectId
+from pymongo import ASCENDING, GEOSPHERE, MongoClient, ReturnDocument, UpdateOne
 from pymongo.collection import Collection
 from pymongo.database import Database
 
 from common.common.logging_config import get_logger
+from common.common.mongodb.clock import utc_now
+from common.common.mongodb.lookup_cache import CityLookupCache
+from common.common.mongodb.rollups import TemperatureRollups
+from common.common.mongodb.stats import SNAPSHOT_PROJECTION
+from common.common.mongodb.summary import WeatherSummaryStore
 
 logger = get_logger("climate_data")
 
+# Fields stamped on every write, ignored when telling a change from a no-op
+WRITE_STAMPS = ("timestamp", "updated_at")
+
+# City lookup caches shared by every service on the same connection string
+_lookup_caches: Dict[str, CityLookupCache] = {}
+
 
 class ClimateDataService:
-    """Service for managing climate data in MongoDB."""
+    """Service for managing climate data in MongoDB.
+
+    Construction does no I/O; the indexes are created by ``ensure_indexes``,
+    which runs on the first write or geo query if it was not called during
+    setup.
+    """
 
     def __init__(self, connection_string: str = "mongodb://localhost:27017/"):
         """Initialize the climate data service.
@@ -25,7 +43,56 @@ class ClimateDataService:
         self.client = MongoClient(connection_string)
         self.db: Database = self.client["climate_db"]
         self.collection: Collection = self.db["city_climate"]
+        self.rollups = TemperatureRollups(self.db["city_climate_rollups"])
+        self.summary = WeatherSummaryStore(self.db["climate_summary"], self.collection)
+        self.lookup_cache = _lookup_caches.setdefault(connection_string, CityLookupCache())
         self.logger = get_logger("climate_data_service")
+        self._indexes_ready = False
+
+    def ensure_indexes(self) -> None:
+        """Create the indexes used by the service queries, once per service."""
+        if self._indexes_ready:
+            return
+        self.collection.create_index([("city", ASCENDING)])
+        self.collection.create_index([("location", GEOSPHERE)])
+        self.collection.create_index([("updated_at", ASCENDING)])
+        self.rollups.ensure_indexes()
+        self.summary.ensure_indexes()
+        self._indexes_ready = True
+
+    def _record_write(self, before: Optional[Dict], after: Optional[Dict]) -> None:
+        """Fold a written city document into the rollups and the materialized summary.
+
+        Args:
+            before: City document before the write, or None if it did not exist
+            after: City document after the write, or None if it was deleted
+        """
+        self.ensure_indexes()
+        if after and "city" in after:
+            self.lookup_cache.record_insert(after["city"])
+        if after:
+            temperature = after.get("temperature_celsius")
+            if isinstance(temperature, (int, float)) and "city" in after:
+                self.rollups.record(after["city"], temperature, after["timestamp"])
+        self.summary.apply_changes([(before, after)])
+
+    @staticmethod
+    def make_location(latitude: float, longitude: float) -> Dict:
+        """Build a GeoJSON point for a city document.
+
+        Args:
+            latitude: Latitude in degrees
+            longitude: Longitude in degrees
+
+        Returns:
+            GeoJSON point dictionary
+
+        Raises:
+            ValueError: If the coordinates are out of range
+        """
+        if not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+            raise ValueError(f"Invalid coordinates: ({latitude}, {longitude})")
+        return {"type": "Point", "coordinates": [longitude, latitude]}
 
     def insert_city_climate(self, city_data: Dict) -> str:
         """Insert climate data for a city.
@@ -36,35 +103,209 @@ class ClimateDataService:
         Returns:
             Inserted document ID
         """
-        city_data["timestamp"] = datetime.now()
+        city_data["timestamp"] = utc_now()
+        city_data["updated_at"] = utc_now()
         result = self.collection.insert_one(city_data)
-        self.logger.info(f"Inserted climate data for {city_data.get('city', 'Unknown')}")
+        self._record_write(None, city_data)
+        self.logger.info("Inserted climate data for %s", city_data.get('city', 'Unknown'))
         return str(result.inserted_id)
 
     def get_city_climate(self, city_name: str) -> Optional[Dict]:
         """Get climate data for a specific city.
 
+        Cities ruled out by the lookup cache return None without a query.
+
         Args:
             city_name: Name of the city
 
         Returns:
             Climate data dictionary or None if not found
         """
+        self.refresh_lookup_cache()
+        if not self.lookup_cache.might_exist(city_name):
+            self.logger.debug("Skipped lookup of unknown city %s", city_name)
+            return None
+
         data = self.collection.find_one({"city": city_name})
         if data:
-            self.logger.info(f"Retrieved climate data for {city_name}")
+            self.logger.info("Retrieved climate data for %s", city_name, extra={"city": city_name})
         else:
-            self.logger.warning(f"No climate data found for {city_name}")
+            self.lookup_cache.record_miss(city_name)
+            self.logger.warning("No climate data found for %s", city_name,
+                                extra={"city": city_name})
+        return data
+
+    def get_cities_climate(self, city_names: List[str],
+                           projection: Optional[Dict] = None) -> List[Dict]:
+        """Get climate data for several cities in a single query.
+
+        Args:
+            city_names: Names of the cities
+            projection: Optional fields to return
+
+        Returns:
+            List of climate data dictionaries for the cities that were found with
+            a numeric temperature
+        """
+        self.refresh_lookup_cache()
+        candidates = [city for city in city_names if self.lookup_cache.might_exist(city)]
+        data = []
+        if candidates:
+            data = list(self.collection.find(
+                {"city": {"$in": candidates}, "temperature_celsius": {"$type": "number"}},
+                projection,
+            ))
+        self.logger.info("Retrieved climate data for %s of %s cities", len(data), len(city_names))
         return data
 
+    def refresh_lookup_cache(self) -> None:
+        """Rebuild the city lookup cache in the background once it is stale."""
+        self.lookup_cache.refresh_in_background(self.iter_city_names)
+
+    def iter_city_names(self, batch_size: int = 10000) -> Iterator[str]:
+        """Stream the distinct city names.
+
+        Unlike ``distinct`` the names arrive in batches through a ``$group``
+        aggregation, so the directory is not bound by the 16MB reply limit.
+
+        Args:
+            batch_size: Number of names fetched per round trip
+
+        Returns:
+            Iterator over the city names
+        """
+        cursor = self.collection.aggregate([{"$group": {"_id": "$city"}}],
+                                           allowDiskUse=True, batchSize=batch_size)
+        with cursor:
+            for doc in cursor:
+                if isinstance(doc["_id"], str):
+                    yield doc["_id"]
+
     def get_all_cities(self) -> List[str]:
         """Get list of all cities with climate data.
 
+        The city lookup cache is rebuilt from the result.
+
         Returns:
             List of city names
         """
-        cities = self.collection.distinct("city")
-        self.logger.info(f"Retrieved {len(cities)} cities with climate data")
+        started_at = time.monotonic()
+        cities = list(self.iter_city_names())
+        self.lookup_cache.rebuild(cities, started_at)
+        self.logger.info("Retrieved %s cities with climate data", len(cities))
+        return cities
+
+    def get_temperature_snapshot(self, projection: Optional[Dict] = None,
+                                 batch_size: int = 10000,
+                                 since: Optional[datetime] = None,
+                                 updated_since: Optional[datetime] = None) -> Iterator[Dict]:
+        """Stream projected temperature readings for all cities.
+
+        Only documents holding a numeric temperature are returned, and only the
+        projected fields are transferred from the server.
+
+        Args:
+            projection: Fields to return, defaults to the statistics snapshot fields
+            batch_size: Number of documents fetched per round trip
+            since: Only return documents with a reading timestamp at or after this time
+            updated_since: Only return documents written at or after this naive UTC
+                time, whatever the timestamp of their reading
+
+        Returns:
+            Cursor over the projected documents
+        """
+        query: Dict[str, Any] = {"temperature_celsius": {"$type": "number"}}
+        if since is not None:
+            query["timestamp"] = {"$gte": since}
+        if updated_since is not None:
+            query["updated_at"] = {"$gte": updated_since}
+        return self.collection.find(query, projection or SNAPSHOT_PROJECTION, batch_size=batch_size)
+
+    def iter_city_climate(self, query: Optional[Dict] = None,
+                          projection: Optional[Dict] = None,
+                          limit: Optional[int] = None,
+                          batch_size: int = 1000) -> Iterator[Dict]:
+        """Stream city documents in city index order.
+
+        Args:
+            query: Optional filter on the city documents
+            projection: Optional fields to return
+            limit: Optional maximum number of documents
+            batch_size: Number of documents fetched per round trip
+
+        Returns:
+            Cursor over the matching documents sorted by city
+        """
+        cursor = self.collection.find(query or {}, projection, batch_size=batch_size)
+        cursor = cursor.sort("city", ASCENDING)
+        if limit:
+            cursor = cursor.limit(limit)
+        return cursor
+
+    def set_city_location(self, city_name: str, latitude: float, longitude: float) -> bool:
+        """Set the coordinates of a city without touching its readings.
+
+        Args:
+            city_name: Name of the city
+            latitude: Latitude in degrees
+            longitude: Longitude in degrees
+
+        Returns:
+            True if a city document was updated, False otherwise
+        """
+        self.ensure_indexes()
+        result = self.collection.update_many(
+            {"city": city_name}, {"$set": {"location": self.make_location(latitude, longitude)}}
+        )
+        return result.modified_count > 0
+
+    @classmethod
+    def geo_near_pipeline(cls, latitude: float, longitude: float, limit: int = 5,
+                          max_distance_km: Optional[float] = None,
+                          query: Optional[Dict] = None) -> List[Dict]:
+        """Build the ``$geoNear`` aggregation pipeline for a nearest-city search.
+
+        Args:
+            latitude: Latitude in degrees
+            longitude: Longitude in degrees
+            limit: Maximum number of cities to return
+            max_distance_km: Optional search radius in kilometers
+            query: Optional filter applied to candidate cities
+
+        Returns:
+            Aggregation pipeline
+        """
+        geo_near: Dict[str, Any] = {
+            "near": cls.make_location(latitude, longitude),
+            "distanceField": "distance_meters",
+            "spherical": True,
+        }
+        if max_distance_km is not None:
+            geo_near["maxDistance"] = max_distance_km * 1000
+        if query:
+            geo_near["query"] = query
+        return [{"$geoNear": geo_near}, {"$limit": limit}]
+
+    def nearest_cities(self, latitude: float, longitude: float, limit: int = 5,
+                       max_distance_km: Optional[float] = None,
+                       query: Optional[Dict] = None) -> List[Dict]:
+        """Find the cities closest to a point using the 2dsphere index.
+
+        Args:
+            latitude: Latitude in degrees
+            longitude: Longitude in degrees
+            limit: Maximum number of cities to return
+            max_distance_km: Optional search radius in kilometers
+            query: Optional filter applied to candidate cities
+
+        Returns:
+            List of climate data dictionaries ordered by distance, each with a
+            ``distance_meters`` field
+        """
+        self.ensure_indexes()
+        pipeline = self.geo_near_pipeline(latitude, longitude, limit, max_distance_km, query)
+        cities = list(self.collection.aggregate(pipeline))
+        self.logger.info("Found %s cities near (%s, %s)", len(cities), latitude, longitude)
         return cities
 
     def update_city_climate(self, city_name: str, climate_data: Dict) -> bool:
@@ -75,18 +316,92 @@ class ClimateDataService:
             climate_data: Updated climate data
 
         Returns:
-            True if update was successful, False otherwise
+            True if the city was inserted or any of its values changed, False
+            if the update only restamped an identical reading
         """
-        climate_data["timestamp"] = datetime.now()
-        result = self.collection.update_one(
-            {"city": city_name}, {"$set": climate_data}, upsert=True
+        changed_fields = [field for field in climate_data if field not in WRITE_STAMPS]
+        climate_data["timestamp"] = utc_now()
+        climate_data["updated_at"] = utc_now()
+        new_id = ObjectId()
+        before = self.collection.find_one_and_update(
+            {"city": city_name},
+            {"$set": climate_data, "$setOnInsert": {"_id": new_id}},
+            upsert=True, return_document=ReturnDocument.BEFORE
         )
-        success = result.modified_count > 0 or result.upserted_id is not None
-        if success:
-            self.logger.info(f"Updated climate data for {city_name}")
+        after = {**(before or {"_id": new_id}), "city": city_name, **climate_data}
+        self._record_write(before, after)
+        changed = before is None or any(
+            before.get(field) != climate_data[field] for field in changed_fields
+        )
+        if changed:
+            self.logger.info("Updated climate data for %s", city_name)
         else:
-            self.logger.warning(f"Failed to update climate data for {city_name}")
-        return success
+            self.logger.info("Climate data for %s was unchanged", city_name)
+        return changed
+
+    def bulk_upsert_city_climate(self, readings: List[Dict]) -> int:
+        """Upsert many city readings with a single unordered bulk write.
+
+        Unlike ``update_city_climate`` the readings keep their own timestamps.
+        The latest reading per city becomes the city document, while every
+        reading is folded into the rollups. Every reading is stamped with the
+        ``updated_at`` of the write.
+
+        Args:
+            readings: Validated readings holding at least city, temperature_celsius
+                and timestamp fields
+
+        Returns:
+            Number of city documents written
+        """
+        latest: Dict[str, Dict] = {}
+        updated_at = utc_now()
+        for reading in readings:
+            reading["updated_at"] = updated_at
+            current = latest.get(reading["city"])
+            if current is None or reading["timestamp"] >= current["timestamp"]:
+                latest[reading["city"]] = reading
+        if not latest:
+            return 0
+
+        existing: Dict[str, Dict] = {}
+        for doc in self.collection.find({"city": {"$in": list(latest)}}):
+            existing.setdefault(doc["city"], doc)
+
+        operations = []
+        changes = []
+        for city, reading in latest.items():
+            before = existing.get(city)
+            new_id = ObjectId()
+            operations.append(UpdateOne(
+                {"city": city},
+                {"$set": reading, "$setOnInsert": {"_id": new_id}},
+                upsert=True,
+            ))
+            changes.append((before, {**(before or {"_id": new_id}), **reading}))
+
+        self.collection.bulk_write(operations, ordered=False)
+        for city in latest:
+            self.lookup_cache.record_insert(city)
+        self.rollups.record_many(
+            (reading["city"], reading["temperature_celsius"], reading["timestamp"])
+            for reading in readings
+        )
+        self.summary.apply_changes(changes)
+        self.logger.info("Bulk upserted %s cities from %s readings", len(operations), len(readings))
+        return len(operations)
+
+    def get_temperature_trend(self, city_name: str, window: str = "24h") -> Optional[Dict]:
+        """Get rolling temperature aggregates for a city.
+
+        Args:
+            city_name: Name of the city
+            window: Trailing window, one of ``24h``, ``7d`` or ``30d``
+
+        Returns:
+            Dictionary with count, mean, std, min and max, or None if there is no data
+        """
+        return self.rollups.get_window(city_name, window)
 
     def delete_city_climate(self, city_name: str) -> bool:
         """Delete climate data for a city.
@@ -97,14 +412,34 @@ class ClimateDataService:
         Returns:
             True if deletion was successful, False otherwise
         """
-        result = self.collection.delete_one({"city": city_name})
-        success = result.deleted_count > 0
+        before = self.collection.find_one_and_delete({"city": city_name})
+        success = before is not None
         if success:
-            self.logger.info(f"Deleted climate data for {city_name}")
+            self._record_write(before, None)
+            self.logger.info("Deleted climate data for %s", city_name)
         else:
-            self.logger.warning(f"No climate data found to delete for {city_name}")
+            self.logger.warning("No climate data found to delete for %s", city_name)
         return success
 
+    def ensure_summary(self) -> Dict:
+        """Build the materialized weather summary if it does not exist yet.
+
+        Run once while setting up a deployment; otherwise the first summary
+        read pays for the full scan.
+
+        Returns:
+            Summary document with count, sum, sum_sq, conditions, hottest and coldest
+        """
+        return self.summary.ensure_summary()
+
+    def get_weather_summary(self) -> Dict:
+        """Get the materialized weather summary over all cities.
+
+        Returns:
+            Summary document with count, sum, sum_sq, conditions, hottest and coldest
+        """
+        return self.summary.get()
+
     def get_climate_statistics(self) -> Dict:
         """Get climate database statistics.
 
@@ -123,7 +458,7 @@ class ClimateDataService:
             "collection_name": self.collection.name,
         }
         
-        self.logger.info(f"Retrieved database statistics: {stats}")
+        self.logger.info("Retrieved database statistics: %s", stats)
         return stats
 
     def close(self) -> None:
@@ -0,0 +1,26 @@
+"""Time base of stored readings and query boundaries: naive datetimes in UTC."""
+
+from datetime import datetime, timezone
+
+
+def utc_now() -> datetime:
+    """Get the current time as naive UTC.
+
+    Returns:
+        Current time in the form MongoDB returns datetimes in
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def to_utc(value: datetime) -> datetime:
+    """Convert a datetime to naive UTC.
+
+    Args:
+        value: Datetime; naive values are taken to be in UTC already
+
+    Returns:
+        Naive UTC datetime
+    """
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
@@ -0,0 +1,161 @@
+"""Vectorized derived weather metrics over arrays of readings."""
+
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Magnus coefficients for saturation vapour pressure over water
+MAGNUS_A = 17.625
+MAGNUS_B = 243.04
+
+CLIMATE_TYPE_EDGES = np.array([0.0, 15.0, 25.0])
+CLIMATE_TYPES = np.array(["Cold", "Cool", "Mild", "Warm"], dtype=object)
+
+DERIVED_UNITS = {
+    "temperature_fahrenheit": "°F",
+    "temperature_kelvin": "K",
+    "dew_point": "°C",
+    "heat_index": "°C",
+    "feels_like": "°C",
+}
+
+
+def celsius_to_fahrenheit(celsius: np.ndarray) -> np.ndarray:
+    """Convert temperatures from Celsius to Fahrenheit."""
+    return np.asarray(celsius, dtype=np.float64) * 1.8 + 32.0
+
+
+def fahrenheit_to_celsius(fahrenheit: np.ndarray) -> np.ndarray:
+    """Convert temperatures from Fahrenheit to Celsius."""
+    return (np.asarray(fahrenheit, dtype=np.float64) - 32.0) / 1.8
+
+
+def celsius_to_kelvin(celsius: np.ndarray) -> np.ndarray:
+    """Convert temperatures from Celsius to Kelvin."""
+    return np.asarray(celsius, dtype=np.float64) + 273.15
+
+
+def dew_point(celsius: np.ndarray, humidity: np.ndarray) -> np.ndarray:
+    """Compute the dew point with the Magnus approximation.
+
+    Args:
+        celsius: Air temperatures in Celsius
+        humidity: Relative humidity percentages
+
+    Returns:
+        Dew points in Celsius, NaN where the humidity is unknown
+    """
+    celsius = np.asarray(celsius, dtype=np.float64)
+    humidity = np.clip(np.asarray(humidity, dtype=np.float64), 0.1, 100.0)
+    gamma = np.log(humidity / 100.0) + MAGNUS_A * celsius / (MAGNUS_B + celsius)
+    return MAGNUS_B * gamma / (MAGNUS_A - gamma)
+
+
+def heat_index(celsius: np.ndarray, humidity: np.ndarray) -> np.ndarray:
+    """Compute the heat index with the NWS Rothfusz regression.
+
+    Below roughly 27°C the simple Steadman formula is used, as in the NWS
+    algorithm, and the low/high humidity adjustments are applied where due.
+
+    Args:
+        celsius: Air temperatures in Celsius
+        humidity: Relative humidity percentages
+
+    Returns:
+        Heat index in Celsius, NaN where the humidity is unknown
+    """
+    t = celsius_to_fahrenheit(celsius)
+    rh = np.asarray(humidity, dtype=np.float64)
+
+    simple = 0.5 * (t + 61.0 + (t - 68.0) * 1.2 + rh * 0.094)
+    full = (-42.379 + 2.04901523 * t + 10.14333127 * rh
+            - 0.22475541 * t * rh - 6.83783e-3 * t * t - 5.481717e-2 * rh * rh
+            + 1.22874e-3 * t * t * rh + 8.5282e-4 * t * rh * rh
+            - 1.99e-6 * t * t * rh * rh)
+
+    dry = (rh < 13.0) & (t >= 80.0) & (t <= 112.0)
+    full = full - np.where(
+        dry, (13.0 - rh) / 4.0 * np.sqrt(np.clip(17.0 - np.abs(t - 95.0), 0.0, None) / 17.0), 0.0
+    )
+    humid = (rh > 85.0) & (t >= 80.0) & (t <= 87.0)
+    full = full + np.where(humid, (rh - 85.0) / 10.0 * (87.0 - t) / 5.0, 0.0)
+
+    return fahrenheit_to_celsius(np.where((simple + t) / 2.0 >= 80.0, full, simple))
+
+
+def apparent_temperature(celsius: np.ndarray, humidity: np.ndarray,
+                         wind_speed: np.ndarray = 0.0) -> np.ndarray:
+    """Compute the Steadman apparent temperature used by the Australian BoM.
+
+    Args:
+        celsius: Air temperatures in Celsius
+        humidity: Relative humidity percentages
+        wind_speed: Wind speeds in metres per second, calm by default
+
+    Returns:
+        Apparent temperatures in Celsius, NaN where the humidity is unknown
+    """
+    celsius = np.asarray(celsius, dtype=np.float64)
+    vapour_pressure = (np.asarray(humidity, dtype=np.float64) / 100.0
+                       * 6.105 * np.exp(17.27 * celsius / (237.7 + celsius)))
+    return celsius + 0.33 * vapour_pressure - 0.70 * np.asarray(wind_speed) - 4.00
+
+
+def climate_types(celsius: np.ndarray) -> np.ndarray:
+    """Bucket temperatures into the coarse climate types.
+
+    Args:
+        celsius: Air temperatures in Celsius
+
+    Returns:
+        Object array of ``Cold``, ``Cool``, ``Mild`` or ``Warm``
+    """
+    return CLIMATE_TYPES[np.digitize(np.asarray(celsius, dtype=np.float64), CLIMATE_TYPE_EDGES)]
+
+
+def derived_metrics(celsius: np.ndarray, humidity: np.ndarray) -> Dict[str, np.ndarray]:
+    """Compute every derived metric over arrays of readings.
+
+    Args:
+        celsius: Air temperatures in Celsius
+        humidity: Relative humidity percentages, NaN where unknown
+
+    Returns:
+        Dictionary mapping the ``DERIVED_UNITS`` names to arrays of values
+    """
+    celsius = np.asarray(celsius, dtype=np.float64)
+    humidity = np.asarray(humidity, dtype=np.float64)
+    with np.errstate(invalid="ignore"):
+        return {
+            "temperature_fahrenheit": celsius_to_fahrenheit(celsius),
+            "temperature_kelvin": celsius_to_kelvin(celsius),
+            "dew_point": dew_point(celsius, humidity),
+            "heat_index": heat_index(celsius, humidity),
+            "feels_like": apparent_temperature(celsius, humidity),
+        }
+
+
+def format_derived_metrics(documents: Sequence) -> List[Dict[str, Optional[str]]]:
+    """Compute and format the derived metrics for city readings.
+
+    Args:
+        documents: City documents or snapshot records with a numeric temperature
+
+    Returns:
+        One dictionary of formatted metrics per reading; metrics needing an
+        unknown humidity are None
+    """
+    count = len(documents)
+    celsius = np.fromiter((doc["temperature_celsius"] for doc in documents), np.float64, count)
+    humidity = np.fromiter(
+        (value if isinstance(value, (int, float)) else np.nan
+         for value in (doc.get("humidity_percent") for doc in documents)),
+        np.float64, count,
+    )
+    metrics = derived_metrics(celsius, humidity)
+    columns = [
+        [None if value != value else f"{value}{DERIVED_UNITS[name]}"
+         for value in values.round(1).tolist()]
+        for name, values in metrics.items()
+    ]
+    return [dict(zip(metrics, row)) for row in zip(*columns)]
@@ -0,0 +1,482 @@
+"""Compressed in-process temperature history for fast range analytics."""
+
+import bisect
+import math
+import os
+import tempfile
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from common.common.logging_config import get_logger
+
+TEMPERATURE_SCALE = 100.0
+HUMIDITY_SCALE = 10.0
+MISSING = np.iinfo(np.int16).min
+
+TimeLike = Union[datetime, np.datetime64, int, float]
+
+
+def to_epoch_seconds(values) -> np.ndarray:
+    """Convert datetimes, datetime64 values or epoch seconds to int64 epoch seconds."""
+    array = np.asarray(values)
+    if array.dtype.kind in "iuf":
+        return array.astype(np.int64)
+    return array.astype("datetime64[s]").astype(np.int64)
+
+
+def _quantize(values: np.ndarray, scale: float) -> np.ndarray:
+    """Quantize floats to int16 steps of ``1 / scale``, mapping NaN to ``MISSING``."""
+    scaled = np.clip(np.round(values * scale), MISSING + 1, np.iinfo(np.int16).max)
+    return np.where(np.isnan(values), MISSING, scaled).astype(np.int16)
+
+
+def _dequantize(values: np.ndarray, scale: float) -> np.ndarray:
+    """Restore floats from int16 steps, mapping ``MISSING`` back to NaN."""
+    return np.where(values == MISSING, np.nan, values / scale)
+
+
+class HistoryChunk:
+    """Sealed, immutable run of readings for one city.
+
+    Timestamps are stored as the first epoch second plus per-reading deltas,
+    in the narrowest unsigned type that fits, or as a single step when the
+    cadence is constant. Temperatures and humidities are int16 with 0.01°C
+    and 0.1% resolution, or float32 without quantization. Count, sum, sum of
+    squares, min and max are kept so fully covered chunks never need decoding.
+    """
+
+    __slots__ = ("start", "end", "count", "step", "deltas", "temperatures", "humidities",
+                 "quantized", "sum", "sum_sq", "min", "max", "spilled")
+
+    def __init__(self, timestamps: np.ndarray, temperatures: np.ndarray,
+                 humidities: np.ndarray, quantize: bool = True):
+        """Encode a run of readings.
+
+        Args:
+            timestamps: Non-decreasing epoch seconds
+            temperatures: Temperatures in Celsius
+            humidities: Humidity percentages, NaN where unknown
+            quantize: Whether to store int16 values instead of float32
+        """
+        deltas = np.diff(timestamps)
+        self.start = int(timestamps[0])
+        self.end = int(timestamps[-1])
+        self.count = int(timestamps.size)
+        self.step = None
+        self.deltas = None
+        if deltas.size and (deltas == deltas[0]).all():
+            self.step = int(deltas[0])
+        elif deltas.size:
+            dtype = np.uint16 if deltas.max() <= np.iinfo(np.uint16).max else np.uint32
+            self.deltas = deltas.astype(dtype)
+
+        self.quantized = quantize
+        if quantize:
+            self.temperatures = _quantize(temperatures, TEMPERATURE_SCALE)
+            self.humidities = _quantize(humidities, HUMIDITY_SCALE)
+        else:
+            self.temperatures = temperatures.astype(np.float32)
+            self.humidities = humidities.astype(np.float32)
+
+        decoded = self.decode_temperatures()
+        self.sum = float(decoded.sum())
+        self.sum_sq = float((decoded * decoded).sum())
+        self.min = float(decoded.min())
+        self.max = float(decoded.max())
+        self.spilled = False
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held in memory by the encoded columns."""
+        if self.spilled:
+            return 0
+        deltas = self.deltas.nbytes if self.deltas is not None else 0
+        return deltas + self.temperatures.nbytes + self.humidities.nbytes
+
+    def decode_timestamps(self) -> np.ndarray:
+        """Decode the epoch seconds of every reading."""
+        if self.step is not None:
+            return self.start + np.arange(self.count, dtype=np.int64) * self.step
+        timestamps = np.empty(self.count, dtype=np.int64)
+        timestamps[0] = self.start
+        if self.deltas is not None:
+            np.cumsum(self.deltas, dtype=np.int64, out=timestamps[1:])
+            timestamps[1:] += self.start
+        return timestamps
+
+    def decode_temperatures(self) -> np.ndarray:
+        """Decode the temperatures in Celsius."""
+        if self.quantized:
+            return self.temperatures / TEMPERATURE_SCALE
+        return self.temperatures.astype(np.float64)
+
+    def decode_humidities(self) -> np.ndarray:
+        """Decode the humidity percentages, NaN where unknown."""
+        if self.quantized:
+            return _dequantize(self.humidities, HUMIDITY_SCALE)
+        return self.humidities.astype(np.float64)
+
+    def spill(self, path: str) -> None:
+        """Append the encoded columns to a file and map them back read-only.
+
+        Args:
+            path: Spill file of the chunk's city
+        """
+        columns = [name for name in ("deltas", "temperatures", "humidities")
+                   if getattr(self, name) is not None]
+        with open(path, "ab") as handle:
+            offsets = []
+            for name in columns:
+                offsets.append(handle.tell())
+                handle.write(getattr(self, name).tobytes())
+        for name, offset in zip(columns, offsets):
+            column = getattr(self, name)
+            setattr(self, name, np.memmap(path, dtype=column.dtype, mode="r",
+                                          offset=offset, shape=column.shape))
+        self.spilled = True
+
+
+class _CitySeries:
+    """Sealed chunks plus the open append buffer of one city."""
+
+    __slots__ = ("index", "chunks", "starts", "timestamps", "temperatures", "humidities")
+
+    def __init__(self, index: int):
+        self.index = index
+        self.chunks: List[HistoryChunk] = []
+        self.starts: List[int] = []
+        self.timestamps: List[int] = []
+        self.temperatures: List[float] = []
+        self.humidities: List[float] = []
+
+    @property
+    def last(self) -> Optional[int]:
+        """Epoch second of the latest reading, if any."""
+        if self.timestamps:
+            return self.timestamps[-1]
+        return self.chunks[-1].end if self.chunks else None
+
+
+class TemperatureHistory:
+    """Per-city temperature history held in compressed, array-backed chunks.
+
+    Readings are appended per city in time order and sealed into chunks of
+    ``chunk_size``. With quantization and a constant cadence a reading
+    costs four bytes, so a year of minutely readings for one city takes
+    about 2 MB. Once the chunks in memory exceed ``max_memory_bytes``, the
+    oldest are spilled to files under ``spill_dir`` and memory-mapped back.
+    Range queries decode only the chunks overlapping the range, and aggregate
+    queries use stored chunk summaries for chunks covered completely.
+    """
+
+    def __init__(self, chunk_size: int = 8192, quantize: bool = True,
+                 max_memory_bytes: Optional[int] = 256 * 1024 * 1024,
+                 spill_dir: Optional[str] = None):
+        """Initialize an empty history.
+
+        Args:
+            chunk_size: Readings per sealed chunk
+            quantize: Whether to store int16 values instead of float32
+            max_memory_bytes: In-memory chunk budget before spilling, None for no limit
+            spill_dir: Directory for spill files, a temporary directory by default
+        """
+        self.chunk_size = chunk_size
+        self.quantize = quantize
+        self.max_memory_bytes = max_memory_bytes
+        self.spill_dir = spill_dir
+        self.logger = get_logger("temperature_history")
+        self._series: Dict[str, _CitySeries] = {}
+        self._resident: Deque[Tuple[_CitySeries, HistoryChunk]] = deque()
+        self._resident_bytes = 0
+        self._spill_files: List[str] = []
+        self._lock = threading.RLock()
+
+    def __contains__(self, city: str) -> bool:
+        """Check whether the history holds readings for a city."""
+        return city in self._series
+
+    def cities(self) -> List[str]:
+        """Get the cities with history.
+
+        Returns:
+            List of city names
+        """
+        with self._lock:
+            return list(self._series)
+
+    def count(self, city: str) -> int:
+        """Get the number of stored readings for a city.
+
+        Args:
+            city: Name of the city
+
+        Returns:
+            Number of readings
+        """
+        with self._lock:
+            series = self._series.get(city)
+            if series is None:
+                return 0
+            return sum(chunk.count for chunk in series.chunks) + len(series.timestamps)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held in memory by sealed chunks."""
+        return self._resident_bytes
+
+    def append(self, city: str, timestamp: TimeLike, temperature: float,
+               humidity: Optional[float] = None) -> bool:
+        """Append a single reading.
+
+        Args:
+            city: Name of the city
+            timestamp: Time of the reading
+            temperature: Temperature in Celsius
+            humidity: Optional humidity percentage
+
+        Returns:
+            True if stored, False if it is older than the city's latest reading
+        """
+        return self.extend(city, [timestamp], [temperature],
+                           [math.nan if humidity is None else humidity]) == 1
+
+    def extend(self, city: str, timestamps: Iterable[TimeLike], temperatures: Iterable[float],
+               humidities: Optional[Iterable[float]] = None) -> int:
+        """Append readings for one city.
+
+        The batch is sorted by time; readings older than the city's latest
+        stored reading are dropped, since sealed chunks are immutable.
+
+        Args:
+            city: Name of the city
+            timestamps: Times of the readings
+            temperatures: Temperatures in Celsius
+            humidities: Optional humidity percentages, NaN where unknown
+
+        Returns:
+            Number of readings stored
+        """
+        seconds = to_epoch_seconds(list(timestamps) if not isinstance(timestamps, np.ndarray)
+                                   else timestamps)
+        temps = np.asarray(temperatures, dtype=np.float64)
+        hums = (np.full(temps.shape, np.nan) if humidities is None
+                else np.asarray(humidities, dtype=np.float64))
+        order = np.argsort(seconds, kind="stable")
+        seconds, temps, hums = seconds[order], temps[order], hums[order]
+
+        with self._lock:
+            series = self._series.get(city)
+            if series is None:
+                series = self._series[city] = _CitySeries(len(self._series))
+            if series.last is not None:
+                keep = seconds >= series.last
+                seconds, temps, hums = seconds[keep], temps[keep], hums[keep]
+
+            position = 0
+            while position < seconds.size:
+                room = self.chunk_size - len(series.timestamps)
+                if not series.timestamps and seconds.size - position >= self.chunk_size:
+                    end = position + self.chunk_size
+                    self._seal(series, seconds[position:end], temps[position:end],
+                               hums[position:end])
+                    position = end
+                    continue
+                end = min(position + room, seconds.size)
+                series.timestamps.extend(seconds[position:end].tolist())
+                series.temperatures.extend(temps[position:end].tolist())
+                series.humidities.extend(hums[position:end].tolist())
+                position = end
+                if len(series.timestamps) == self.chunk_size:
+                    self._seal(series, np.asarray(series.timestamps, dtype=np.int64),
+                               np.asarray(series.temperatures), np.asarray(series.humidities))
+                    series.timestamps, series.temperatures, series.humidities = [], [], []
+            self._enforce_budget()
+        return int(seconds.size)
+
+    def _seal(self, series: _CitySeries, timestamps: np.ndarray, temperatures: np.ndarray,
+              humidities: np.ndarray) -> None:
+        """Encode a full run of readings as a chunk; the caller holds the lock."""
+        chunk = HistoryChunk(timestamps, temperatures, humidities, self.quantize)
+        series.chunks.append(chunk)
+        series.starts.append(chunk.start)
+        self._resident.append((series, chunk))
+        self._resident_bytes += chunk.nbytes
+
+    def _enforce_budget(self) -> None:
+        """Spill the oldest resident chunks until the memory budget holds."""
+        if self.max_memory_bytes is None:
+            return
+        while self._resident and self._resident_bytes > self.max_memory_bytes:
+            series, chunk = self._resident.popleft()
+            self._resident_bytes -= chunk.nbytes
+            chunk.spill(self._spill_path(series))
+
+    def _spill_path(self, series: _CitySeries) -> str:
+        """Get the spill file of a city, creating the spill directory on first use."""
+        if self.spill_dir is None:
+            self.spill_dir = tempfile.mkdtemp(prefix="temperature-history-")
+        path = os.path.join(self.spill_dir, f"city-{series.index:06d}.bin")
+        if path not in self._spill_files:
+            self._spill_files.append(path)
+        return path
+
+    def _overlapping(self, series: _CitySeries, start: int, end: int) -> List[HistoryChunk]:
+        """Get the sealed chunks overlapping ``[start, end]`` in time order."""
+        first = max(bisect.bisect_right(series.starts, start) - 1, 0)
+        chunks = []
+        for chunk in series.chunks[first:]:
+            if chunk.start > end:
+                break
+            if chunk.end >= start:
+                chunks.append(chunk)
+        return chunks
+
+    @staticmethod
+    def _bounds(start: Optional[TimeLike], end: Optional[TimeLike]) -> Tuple[int, int]:
+        """Convert optional range bounds to epoch seconds."""
+        low = int(to_epoch_seconds([start])[0]) if start is not None else np.iinfo(np.int64).min
+        high = int(to_epoch_seconds([end])[0]) if end is not None else np.iinfo(np.int64).max
+        return low, high
+
+    def range(self, city: str, start: Optional[TimeLike] = None,
+              end: Optional[TimeLike] = None) -> Dict[str, np.ndarray]:
+        """Get the readings of a city within a time range.
+
+        Args:
+            city: Name of the city
+            start: Inclusive start of the range, unbounded if None
+            end: Inclusive end of the range, unbounded if None
+
+        Returns:
+            Dictionary of ``timestamp`` (datetime64[s]), ``temperature_celsius``
+            and ``humidity_percent`` arrays in time order
+        """
+        low, high = self._bounds(start, end)
+        parts: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        with self._lock:
+            series = self._series.get(city)
+            if series is not None:
+                for chunk in self._overlapping(series, low, high):
+                    parts.append((chunk.decode_timestamps(), chunk.decode_temperatures(),
+                                  chunk.decode_humidities()))
+                if series.timestamps:
+                    parts.append((np.asarray(series.timestamps, dtype=np.int64),
+                                  np.asarray(series.temperatures),
+                                  np.asarray(series.humidities)))
+
+        if not parts:
+            seconds = np.empty(0, dtype=np.int64)
+            temps = hums = np.empty(0)
+        else:
+            seconds, temps, hums = (np.concatenate(column) for column in zip(*parts))
+        mask = (seconds >= low) & (seconds <= high)
+        return {
+            "timestamp": seconds[mask].astype("datetime64[s]"),
+            "temperature_celsius": temps[mask],
+            "humidity_percent": hums[mask],
+        }
+
+    def aggregate(self, city: str, start: Optional[TimeLike] = None,
+                  end: Optional[TimeLike] = None) -> Optional[Dict]:
+        """Aggregate the temperatures of a city within a time range.
+
+        Chunks lying completely inside the range contribute their stored
+        summaries; only the chunks straddling the range edges are decoded.
+
+        Args:
+            city: Name of the city
+            start: Inclusive start of the range, unbounded if None
+            end: Inclusive end of the range, unbounded if None
+
+        Returns:
+            Dictionary with count, mean, std, min and max, or None if there is no data
+        """
+        low, high = self._bounds(start, end)
+        count, total, total_sq = 0, 0.0, 0.0
+        minimum, maximum = math.inf, -math.inf
+
+        def fold(values: np.ndarray) -> None:
+            nonlocal count, total, total_sq, minimum, maximum
+            if values.size:
+                count += int(values.size)
+                total += float(values.sum())
+                total_sq += float((values * values).sum())
+                minimum = min(minimum, float(values.min()))
+                maximum = max(maximum, float(values.max()))
+
+        with self._lock:
+            series = self._series.get(city)
+            if series is None:
+                return None
+            for chunk in self._overlapping(series, low, high):
+                if low <= chunk.start and chunk.end <= high:
+                    count += chunk.count
+                    total += chunk.sum
+                    total_sq += chunk.sum_sq
+                    minimum = min(minimum, chunk.min)
+                    maximum = max(maximum, chunk.max)
+                else:
+                    seconds = chunk.decode_timestamps()
+                    fold(chunk.decode_temperatures()[(seconds >= low) & (seconds <= high)])
+            if series.timestamps:
+                seconds = np.asarray(series.timestamps, dtype=np.int64)
+                fold(np.asarray(series.temperatures)[(seconds >= low) & (seconds <= high)])
+
+        if not count:
+            return None
+        mean = total / count
+        return {
+            "count": count,
+            "mean": mean,
+            "std": math.sqrt(max(total_sq / count - mean * mean, 0.0)),
+            "min": minimum,
+            "max": maximum,
+        }
+
+    def downsample(self, city: str, interval_seconds: int, start: Optional[TimeLike] = None,
+                   end: Optional[TimeLike] = None) -> Dict[str, np.ndarray]:
+        """Get per-interval temperature aggregates of a city within a time range.
+
+        Args:
+            city: Name of the city
+            interval_seconds: Bucket width in seconds
+            start: Inclusive start of the range, unbounded if None
+            end: Inclusive end of the range, unbounded if None
+
+        Returns:
+            Dictionary of bucket ``start`` (datetime64[s]) with ``count``, ``mean``,
+            ``min`` and ``max`` arrays for the non-empty buckets
+        """
+        readings = self.range(city, start, end)
+        seconds = readings["timestamp"].astype(np.int64)
+        temps = readings["temperature_celsius"]
+        buckets = seconds // interval_seconds
+        keys, first, counts = np.unique(buckets, return_index=True, return_counts=True)
+        if not keys.size:
+            empty = np.empty(0)
+            return {"start": empty.astype("datetime64[s]"), "count": empty.astype(np.int64),
+                    "mean": empty, "min": empty, "max": empty}
+        return {
+            "start": (keys * interval_seconds).astype("datetime64[s]"),
+            "count": counts,
+            "mean": np.add.reduceat(temps, first) / counts,
+            "min": np.minimum.reduceat(temps, first),
+            "max": np.maximum.reduceat(temps, first),
+        }
+
+    def close(self) -> None:
+        """Drop all history and delete the spill files."""
+        with self._lock:
+            self._series.clear()
+            self._resident.clear()
+            self._resident_bytes = 0
+            for path in self._spill_files:
+                try:
+                    os.remove(path)
+                except OSError:
+                    self.logger.warning("Could not remove history spill file %s", path)
+            self._spill_files.clear()
@@ -0,0 +1,251 @@
+"""Bloom filter and negative cache for lookups of unknown cities."""
+
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from common.common.logging_config import get_logger
+
+MASK_64 = (1 << 64) - 1
+
+
+def _hash_pair(key: str) -> Tuple[int, int]:
+    """Derive the two base hashes used for double hashing."""
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings.
+
+    A negative answer is definite; a positive answer is wrong with roughly
+    ``error_rate`` probability while no more than ``capacity`` keys were added.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        """Initialize an empty filter sized for the expected number of keys.
+
+        Args:
+            capacity: Expected number of keys
+            error_rate: Target false positive rate at capacity
+        """
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(int(round(self.size / capacity * math.log(2))), 1)
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    @classmethod
+    def from_keys(cls, keys: Iterable[str], error_rate: float = 0.01,
+                  headroom: float = 2.0) -> "BloomFilter":
+        """Build a filter holding the given keys, with room for more.
+
+        Bit positions for all keys are computed and set as one array
+        operation, so building from a large directory stays cheap.
+
+        Args:
+            keys: Keys to add
+            error_rate: Target false positive rate at capacity
+            headroom: Capacity as a multiple of the number of keys
+
+        Returns:
+            BloomFilter instance
+        """
+        keys = list(keys)
+        bloom = cls(int(len(keys) * headroom) + 1, error_rate)
+        if keys:
+            pairs = np.array([_hash_pair(key) for key in keys], dtype=np.uint64)
+            steps = np.arange(bloom.hashes, dtype=np.uint64)
+            positions = ((pairs[:, :1] + steps * pairs[:, 1:]) % np.uint64(bloom.size)).ravel()
+            bits = np.zeros(len(bloom._bits) * 8, dtype=bool)
+            bits[positions.astype(np.int64)] = True
+            bloom._bits = bytearray(np.packbits(bits, bitorder="little").tobytes())
+            bloom.count = len(keys)
+        return bloom
+
+    def _positions(self, key: str) -> List[int]:
+        """Get the bit positions of a key, wrapping like the uint64 arithmetic in ``from_keys``."""
+        first, second = _hash_pair(key)
+        return [((first + i * second) & MASK_64) % self.size for i in range(self.hashes)]
+
+    def add(self, key: str) -> None:
+        """Add a key to the filter.
+
+        Args:
+            key: Key to add
+        """
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        """Check whether a key may have been added."""
+        bits = self._bits
+        return all(bits[position >> 3] >> (position & 7) & 1 for position in self._positions(key))
+
+    @property
+    def saturated(self) -> bool:
+        """Whether more keys were added than the filter was sized for."""
+        return self.count > self.capacity
+
+
+class CityLookupCache:
+    """Answers "does this city exist?" without I/O where it safely can.
+
+    A Bloom filter built from the city directory rules out names that were
+    never stored, and a bounded TTL cache remembers recent misses for names
+    that slipped through the filter. Inserting a city adds it to the filter
+    and drops its negative entry; the owner calls ``refresh_in_background``
+    on lookups, which rebuilds the filter off the request path every
+    ``rebuild_interval`` seconds to pick up cities written by other processes.
+
+    Cities written by other processes are missing from the filter until the
+    next rebuild, so its negative answers are only trusted for
+    ``max_filter_age`` seconds after the directory read. Later the name is
+    looked up in the database, and the owner records the miss in the TTL
+    cache.
+    """
+
+    def __init__(self, ttl: float = 60.0, max_misses: int = 10000,
+                 rebuild_interval: float = 300.0, error_rate: float = 0.01,
+                 max_filter_age: float = 5.0):
+        """Initialize an empty cache; call ``rebuild`` to arm the filter.
+
+        Args:
+            ttl: Seconds a recorded miss is trusted
+            max_misses: Maximum number of remembered misses
+            rebuild_interval: Seconds after which ``stale`` reports the filter as outdated
+            error_rate: Target false positive rate of the filter
+            max_filter_age: Seconds after the directory read during which a
+                negative answer of the filter is trusted without a database read
+        """
+        self.ttl = ttl
+        self.max_misses = max_misses
+        self.rebuild_interval = rebuild_interval
+        self.error_rate = error_rate
+        self.max_filter_age = max_filter_age
+        self.hits = 0
+        self._bloom = None
+        self._built_at = 0.0
+        self._misses: OrderedDict[str, float] = OrderedDict()
+        self._inserted: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._rebuilding = False
+        self._retry_at = 0.0
+        self.logger = get_logger("city_lookup_cache")
+
+    @property
+    def stale(self) -> bool:
+        """Whether the filter is missing, saturated or older than the rebuild interval."""
+        return (self._bloom is None or self._bloom.saturated
+                or time.monotonic() - self._built_at >= self.rebuild_interval)
+
+    def rebuild(self, cities: Iterable[str], started_at: Optional[float] = None) -> None:
+        """Rebuild the Bloom filter from the full city directory.
+
+        Cities inserted through ``record_insert`` after ``started_at`` may be
+        missing from a directory read that was already under way, so they are
+        added to the new filter as well.
+
+        Args:
+            cities: Names of all stored cities
+            started_at: ``time.monotonic()`` taken before the directory was read
+        """
+        bloom = BloomFilter.from_keys(cities, self.error_rate)
+        with self._lock:
+            if started_at is not None:
+                self._inserted = {city: at for city, at in self._inserted.items()
+                                  if at >= started_at}
+                for city in self._inserted:
+                    bloom.add(city)
+            self._bloom = bloom
+            self._built_at = started_at if started_at is not None else time.monotonic()
+
+    def refresh_in_background(self, load_cities: Callable[[], Iterable[str]]
+                              ) -> Optional[threading.Thread]:
+        """Rebuild a stale filter on a background thread.
+
+        Lookups keep using the previous filter, or none, while the directory
+        is read. At most one rebuild runs at a time, and a failed rebuild is
+        retried after a tenth of the rebuild interval.
+
+        Args:
+            load_cities: Callable returning the names of all stored cities
+
+        Returns:
+            The started rebuild thread, or None if no rebuild was needed
+        """
+        with self._lock:
+            if self._rebuilding or not self.stale or time.monotonic() < self._retry_at:
+                return None
+            self._rebuilding = True
+        thread = threading.Thread(target=self._rebuild_from, args=(load_cities,),
+                                  name="city-lookup-rebuild", daemon=True)
+        thread.start()
+        return thread
+
+    def _rebuild_from(self, load_cities: Callable[[], Iterable[str]]) -> None:
+        """Read the city directory and rebuild the filter."""
+        started_at = time.monotonic()
+        try:
+            self.rebuild(load_cities(), started_at)
+        except Exception as e:
+            self._retry_at = time.monotonic() + self.rebuild_interval / 10
+            self.logger.warning("City lookup filter rebuild failed: %s", e)
+        finally:
+            with self._lock:
+                self._rebuilding = False
+
+    def might_exist(self, city: str) -> bool:
+        """Check whether a lookup for the city could find anything.
+
+        Args:
+            city: Name of the city
+
+        Returns:
+            False if the city is known to be missing, True if the database
+            has to be read
+        """
+        with self._lock:
+            if (self._bloom is not None and city not in self._bloom
+                    and time.monotonic() - self._built_at < self.max_filter_age):
+                self.hits += 1
+                return False
+            expires = self._misses.get(city)
+            if expires is None:
+                return True
+            if expires <= time.monotonic():
+                del self._misses[city]
+                return True
+            self.hits += 1
+            return False
+
+    def record_miss(self, city: str) -> None:
+        """Remember that a lookup for the city found nothing.
+
+        Args:
+            city: Name of the city
+        """
+        with self._lock:
+            self._misses[city] = time.monotonic() + self.ttl
+            self._misses.move_to_end(city)
+            while len(self._misses) > self.max_misses:
+                self._misses.popitem(last=False)
+
+    def record_insert(self, city: str) -> None:
+        """Make a newly stored city visible to lookups.
+
+        Args:
+            city: Name of the city
+        """
+        with self._lock:
+            self._misses.pop(city, None)
+            self._inserted[city] = time.monotonic()
+            if self._bloom is not None:
+                self._bloom.add(city)
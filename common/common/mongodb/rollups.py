@@ -0,0 +1,231 @@
+"""Incrementally maintained rolling temperature aggregates per city."""
+
+import math
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+from pymongo.collection import Collection
+from pymongo.errors import OperationFailure
+
+from common.common.logging_config import get_logger
+from common.common.mongodb.clock import to_utc, utc_now
+
+ROLLUP_BUCKETS = {
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
+
+TREND_WINDOWS = {
+    "24h": ("hour", 24),
+    "7d": ("day", 7),
+    "30d": ("day", 30),
+}
+
+
+def bucket_start(timestamp: datetime, bucket: str) -> datetime:
+    """Floor a timestamp to the start of its rollup bucket.
+
+    Args:
+        timestamp: Timestamp of the reading; timezone-aware timestamps are
+            converted to naive UTC
+        bucket: Bucket size name from ``ROLLUP_BUCKETS``
+
+    Returns:
+        Start of the bucket containing the timestamp
+    """
+    timestamp = to_utc(timestamp)
+    size = ROLLUP_BUCKETS[bucket]
+    return datetime.min + ((timestamp - datetime.min) // size) * size
+
+
+class TemperatureRollups:
+    """Per-city hourly and daily temperature rollups.
+
+    Each bucket document keeps count, sum, sum of squares, min and max, updated
+    atomically with ``$inc``/``$min``/``$max`` on every write. Trend queries
+    read a fixed number of buckets no matter how much history has accumulated.
+
+    Buckets older than their retention are removed by TTL indexes on
+    ``bucket_start``, one per bucket size, so the collection does not grow
+    with the history.
+    """
+
+    def __init__(self, collection: Collection,
+                 hour_retention: Optional[timedelta] = timedelta(days=7),
+                 day_retention: Optional[timedelta] = None):
+        """Initialize the rollup store.
+
+        Args:
+            collection: Collection holding the rollup bucket documents
+            hour_retention: Age after which hourly buckets are removed, None to keep them
+            day_retention: Age after which daily buckets are removed, None to keep them
+
+        Raises:
+            ValueError: If a retention is shorter than a trend window reading its buckets
+        """
+        retentions = {"hour": hour_retention, "day": day_retention}
+        for bucket, buckets in TREND_WINDOWS.values():
+            retention = retentions[bucket]
+            if retention is not None and retention < buckets * ROLLUP_BUCKETS[bucket]:
+                raise ValueError(f"{bucket} retention is shorter than {buckets} buckets")
+        self.collection = collection
+        self.retentions = retentions
+        self.logger = get_logger("temperature_rollups")
+
+    def ensure_indexes(self) -> None:
+        """Create the unique bucket index and the retention TTL indexes."""
+        self.collection.create_index(
+            [("city", ASCENDING), ("bucket", ASCENDING), ("bucket_start", DESCENDING)],
+            unique=True,
+        )
+        for bucket, retention in self.retentions.items():
+            if retention is not None:
+                self._ensure_ttl_index(bucket, int(retention.total_seconds()))
+
+    def _ensure_ttl_index(self, bucket: str, seconds: int) -> None:
+        """Create the TTL index of a bucket size, or update its expiry."""
+        name = f"{bucket}_bucket_ttl"
+        try:
+            self.collection.create_index(
+                [("bucket_start", ASCENDING)],
+                name=name,
+                expireAfterSeconds=seconds,
+                partialFilterExpression={"bucket": bucket},
+            )
+        except OperationFailure:
+            # The index exists with another expiry; collMod changes it in place.
+            self.collection.database.command(
+                "collMod", self.collection.name,
+                index={"name": name, "expireAfterSeconds": seconds},
+            )
+
+    def _bucket_updates(self, aggregates: Dict[Tuple[str, str, datetime], list]) -> list:
+        """Build upsert operations from pre-aggregated bucket values."""
+        return [
+            UpdateOne(
+                {"city": city, "bucket": bucket, "bucket_start": start},
+                {
+                    "$inc": {"count": count, "sum": total, "sum_sq": total_sq},
+                    "$min": {"min": low},
+                    "$max": {"max": high},
+                },
+                upsert=True,
+            )
+            for (city, bucket, start), (count, total, total_sq, low, high) in aggregates.items()
+        ]
+
+    def record_many(self, readings: Iterable[Tuple[str, float, datetime]]) -> int:
+        """Fold many readings into their rollup buckets.
+
+        Readings falling into the same bucket are combined locally first, so
+        the number of writes is bounded by the number of distinct buckets.
+
+        Args:
+            readings: Tuples of city name, temperature in Celsius and timestamp
+
+        Returns:
+            Number of bucket documents written
+        """
+        aggregates: Dict[Tuple[str, str, datetime], list] = {}
+        for city, temperature, timestamp in readings:
+            for bucket in ROLLUP_BUCKETS:
+                key = (city, bucket, bucket_start(timestamp, bucket))
+                values = aggregates.get(key)
+                if values is None:
+                    aggregates[key] = [1, temperature, temperature * temperature,
+                                       temperature, temperature]
+                else:
+                    values[0] += 1
+                    values[1] += temperature
+                    values[2] += temperature * temperature
+                    values[3] = min(values[3], temperature)
+                    values[4] = max(values[4], temperature)
+
+        if not aggregates:
+            return 0
+        self.collection.bulk_write(self._bucket_updates(aggregates), ordered=False)
+        return len(aggregates)
+
+    def record(self, city: str, temperature: float, timestamp: datetime) -> None:
+        """Fold a single reading into its rollup buckets.
+
+        Args:
+            city: Name of the city
+            temperature: Temperature in Celsius
+            timestamp: Timestamp of the reading
+        """
+        self.record_many([(city, temperature, timestamp)])
+
+    @staticmethod
+    def window_query(city: str, window: str = "24h",
+                     now: Optional[datetime] = None) -> Tuple[Dict, Dict]:
+        """Build the query selecting the rollup buckets covering a trailing window.
+
+        Args:
+            city: Name of the city
+            window: Window name from ``TREND_WINDOWS``
+            now: End of the window, defaults to the current time
+
+        Returns:
+            Tuple of query filter and projection
+        """
+        bucket, buckets = TREND_WINDOWS[window]
+        start = bucket_start(now or utc_now(), bucket) - (buckets - 1) * ROLLUP_BUCKETS[bucket]
+        return (
+            {"city": city, "bucket": bucket, "bucket_start": {"$gte": start}},
+            {"_id": 0, "bucket_start": 1, "count": 1, "sum": 1, "sum_sq": 1, "min": 1, "max": 1},
+        )
+
+    @staticmethod
+    def combine(documents: Iterable[Dict]) -> Optional[Dict]:
+        """Combine rollup bucket documents into window aggregates.
+
+        Args:
+            documents: Bucket documents returned by the window query
+
+        Returns:
+            Dictionary with count, mean, std, min and max, or None if there is no data
+        """
+        count = 0
+        total = 0.0
+        total_sq = 0.0
+        low = math.inf
+        high = -math.inf
+        window_start = None
+        for doc in documents:
+            count += doc["count"]
+            total += doc["sum"]
+            total_sq += doc["sum_sq"]
+            low = min(low, doc["min"])
+            high = max(high, doc["max"])
+            if window_start is None or doc["bucket_start"] < window_start:
+                window_start = doc["bucket_start"]
+
+        if not count:
+            return None
+
+        mean = total / count
+        return {
+            "count": count,
+            "mean": mean,
+            "std": math.sqrt(max(total_sq / count - mean * mean, 0.0)),
+            "min": low,
+            "max": high,
+            "window_start": window_start,
+        }
+
+    def get_window(self, city: str, window: str = "24h",
+                   now: Optional[datetime] = None) -> Optional[Dict]:
+        """Combine the rollup buckets covering a trailing window.
+
+        Args:
+            city: Name of the city
+            window: Window name from ``TREND_WINDOWS``
+            now: End of the window, defaults to the current time
+
+        Returns:
+            Dictionary with count, mean, std, min and max, or None if there is no data
+        """
+        query, projection = self.window_query(city, window, now)
+        return self.combine(self.collection.find(query, projection))
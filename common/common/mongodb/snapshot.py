@@ -0,0 +1,365 @@
+"""Compact array-backed in-memory snapshot of city temperature readings."""
+
+import threading
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+import numpy as np
+
+from common.common.logging_config import get_logger
+from common.common.mongodb.clock import utc_now
+from common.common.mongodb.stats import SNAPSHOT_PROJECTION, WEATHER_CONDITIONS, ClimateStatistics
+
+REFRESH_PROJECTION = {**SNAPSHOT_PROJECTION, "timestamp": 1, "updated_at": 1}
+
+# Look-back of incremental refreshes, covering clock skew between writers and
+# writes that commit after a later write was already read
+WATERMARK_OVERLAP = timedelta(seconds=5)
+
+# Documents read from the source before they are written under the lock
+APPLY_BATCH_SIZE = 1000
+
+
+class CityRecord:
+    """Read-only view of a single snapshot row."""
+
+    __slots__ = (
+        "city", "temperature_celsius", "humidity_percent", "weather_condition", "timestamp"
+    )
+
+    def __init__(self, city: str, temperature_celsius: float, humidity_percent: Optional[float],
+                 weather_condition: str, timestamp: Optional[datetime]):
+        """Initialize the record view.
+
+        Args:
+            city: Name of the city
+            temperature_celsius: Temperature in Celsius
+            humidity_percent: Humidity percentage or None if unknown
+            weather_condition: Weather condition
+            timestamp: Timestamp of the reading
+        """
+        self.city = city
+        self.temperature_celsius = temperature_celsius
+        self.humidity_percent = humidity_percent
+        self.weather_condition = weather_condition
+        self.timestamp = timestamp
+
+    def __getitem__(self, key: str):
+        """Allow dictionary-style access so records can stand in for documents."""
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default=None):
+        """Get a field by name, returning ``default`` if it does not exist."""
+        return getattr(self, key, default)
+
+    def __repr__(self) -> str:
+        return (f"CityRecord(city={self.city!r}, temperature_celsius={self.temperature_celsius}, "
+                f"weather_condition={self.weather_condition!r})")
+
+
+class CitySnapshot:
+    """Struct-of-arrays store of the latest reading per city.
+
+    Each city occupies one row across parallel NumPy columns, located through a
+    city -> row index. Rows are updated in place, so the snapshot can be kept
+    current incrementally from recently written documents. A document whose
+    ``updated_at`` write time is older than the row's is skipped, so a late
+    or repeated delivery never replaces a newer write.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        """Initialize an empty snapshot.
+
+        Args:
+            capacity: Initial number of rows to allocate
+        """
+        self._index: Dict[str, int] = {}
+        self._cities: List[str] = []
+        self.conditions = list(WEATHER_CONDITIONS)
+        self._condition_index = {name: code for code, name in enumerate(self.conditions)}
+        self.temperatures = np.empty(capacity, dtype=np.float32)
+        self.humidities = np.empty(capacity, dtype=np.float32)
+        self.condition_codes = np.empty(capacity, dtype=np.int16)
+        self.timestamps = np.empty(capacity, dtype=np.float64)
+        self.updated_ats = np.empty(capacity, dtype=np.float64)
+        self.latest_timestamp: Optional[datetime] = None
+        self.watermark: Optional[datetime] = None
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._cities)
+
+    def __contains__(self, city: str) -> bool:
+        return city in self._index
+
+    def _grow(self) -> None:
+        """Double the capacity of every column."""
+        capacity = max(2 * self.temperatures.size, 1)
+        for name in ("temperatures", "humidities", "condition_codes", "timestamps",
+                     "updated_ats"):
+            column = getattr(self, name)
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:column.size] = column
+            setattr(self, name, grown)
+
+    def _condition_code(self, condition: str) -> int:
+        """Get the code for a weather condition, registering new conditions."""
+        code = self._condition_index.get(condition)
+        if code is None:
+            code = len(self.conditions)
+            self.conditions.append(condition)
+            self._condition_index[condition] = code
+        return code
+
+    def apply(self, documents: Iterable[Dict], batch_size: int = APPLY_BATCH_SIZE) -> int:
+        """Insert or update rows from city documents.
+
+        Documents without a numeric temperature are ignored, as are documents
+        written before the row they would replace. The documents are read in
+        batches outside the lock, so readers only wait while a batch is
+        written, never while a cursor fetches from the database.
+
+        Args:
+            documents: City documents holding at least city and temperature fields,
+                optionally with the ``updated_at`` write time
+            batch_size: Number of documents written per lock acquisition
+
+        Returns:
+            Number of rows written
+        """
+        written = 0
+        documents = iter(documents)
+        while True:
+            batch = list(islice(documents, batch_size))
+            if not batch:
+                return written
+            with self._lock:
+                written += sum(map(self._apply_document, batch))
+
+    def _apply_document(self, doc: Dict) -> bool:
+        """Write one document into its row; the caller holds the lock."""
+        temperature = doc.get("temperature_celsius")
+        if not isinstance(temperature, (int, float)):
+            return False
+
+        city = doc["city"]
+        updated_at = doc.get("updated_at")
+        version = updated_at.timestamp() if updated_at else np.nan
+        row = self._index.get(city)
+        if row is not None and version < self.updated_ats[row]:
+            return False
+        if row is None:
+            row = len(self._cities)
+            if row == self.temperatures.size:
+                self._grow()
+            self._index[city] = row
+            self._cities.append(city)
+
+        humidity = doc.get("humidity_percent")
+        timestamp = doc.get("timestamp")
+        self.temperatures[row] = temperature
+        self.humidities[row] = humidity if isinstance(humidity, (int, float)) else np.nan
+        self.condition_codes[row] = self._condition_code(doc.get("weather_condition", "unknown"))
+        self.timestamps[row] = timestamp.timestamp() if timestamp else np.nan
+        self.updated_ats[row] = version
+        if updated_at and (self.watermark is None or updated_at > self.watermark):
+            self.watermark = updated_at
+        if timestamp and (self.latest_timestamp is None or timestamp > self.latest_timestamp):
+            self.latest_timestamp = timestamp
+        return True
+
+    def remove(self, city: str) -> bool:
+        """Remove a city, moving the last row into its slot.
+
+        Args:
+            city: Name of the city
+
+        Returns:
+            True if the city was present, False otherwise
+        """
+        with self._lock:
+            row = self._index.pop(city, None)
+            if row is None:
+                return False
+            last = len(self._cities) - 1
+            if row != last:
+                moved = self._cities[last]
+                self._cities[row] = moved
+                self._index[moved] = row
+                for column in (self.temperatures, self.humidities,
+                               self.condition_codes, self.timestamps, self.updated_ats):
+                    column[row] = column[last]
+            self._cities.pop()
+            return True
+
+    def retain(self, cities: Set[str], written_before: Optional[datetime] = None) -> int:
+        """Remove the cities missing from a full read of the database.
+
+        Args:
+            cities: Cities returned by the full read
+            written_before: Start of the full read; rows written after it are
+                kept, since the read may have missed them
+
+        Returns:
+            Number of rows removed
+        """
+        cutoff = written_before.timestamp() if written_before else np.inf
+        with self._lock:
+            stale = [city for city, row in self._index.items()
+                     if city not in cities and not self.updated_ats[row] >= cutoff]
+            for city in stale:
+                self.remove(city)
+        return len(stale)
+
+    def _record(self, row: int) -> CityRecord:
+        """Materialize a record view for a row."""
+        humidity = float(self.humidities[row])
+        timestamp = float(self.timestamps[row])
+        return CityRecord(
+            self._cities[row],
+            round(float(self.temperatures[row]), 2),
+            None if np.isnan(humidity) else round(humidity, 2),
+            self.conditions[self.condition_codes[row]],
+            None if np.isnan(timestamp) else datetime.fromtimestamp(timestamp),
+        )
+
+    def get(self, city: str) -> Optional[CityRecord]:
+        """Get the latest reading for a city.
+
+        Args:
+            city: Name of the city
+
+        Returns:
+            Record view or None if the city is not in the snapshot
+        """
+        with self._lock:
+            row = self._index.get(city)
+            return None if row is None else self._record(row)
+
+    def cities(self) -> List[str]:
+        """Get the names of all cities in the snapshot.
+
+        Returns:
+            List of city names in row order
+        """
+        with self._lock:
+            return list(self._cities)
+
+    def records(self) -> Iterator[CityRecord]:
+        """Iterate over record views for all rows.
+
+        Returns:
+            Iterator of records in row order
+        """
+        with self._lock:
+            records = [self._record(row) for row in range(len(self._cities))]
+        return iter(records)
+
+    def to_statistics(self) -> ClimateStatistics:
+        """Copy the current columns into a statistics engine.
+
+        Returns:
+            ClimateStatistics over the snapshot rows
+        """
+        with self._lock:
+            size = len(self._cities)
+            return ClimateStatistics(
+                list(self._cities),
+                self.temperatures[:size].astype(np.float64),
+                self.humidities[:size].astype(np.float64),
+                self.condition_codes[:size].copy(),
+                list(self.conditions),
+            )
+
+
+class SnapshotRefresher:
+    """Background thread keeping a CitySnapshot current from MongoDB.
+
+    Refreshes read the documents written since the snapshot's ``updated_at``
+    watermark, less ``WATERMARK_OVERLAP``, so backfilled readings with old
+    timestamps are picked up too. Every ``full_refresh_every``-th refresh
+    reads all documents instead and drops the cities that were deleted.
+    """
+
+    def __init__(self, snapshot: CitySnapshot, climate_service, interval: float = 30.0,
+                 full_refresh_every: int = 10):
+        """Initialize the refresher.
+
+        Args:
+            snapshot: Snapshot to keep current
+            climate_service: ClimateDataService to read documents from
+            interval: Seconds between refreshes
+            full_refresh_every: Number of refreshes between full reads
+        """
+        self.snapshot = snapshot
+        self.climate_service = climate_service
+        self.interval = interval
+        self.full_refresh_every = max(full_refresh_every, 1)
+        self.logger = get_logger("city_snapshot_refresher")
+        self._refreshes = 0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def refresh(self, full: bool = False) -> int:
+        """Apply documents written since the watermark, or all documents.
+
+        Args:
+            full: Whether to read every document and drop deleted cities; the
+                first refresh and every ``full_refresh_every``-th one are full
+
+        Returns:
+            Number of rows written
+        """
+        full = (full or self.snapshot.watermark is None
+                or self._refreshes % self.full_refresh_every == 0)
+        self._refreshes += 1
+        if not full:
+            documents = self.climate_service.get_temperature_snapshot(
+                REFRESH_PROJECTION, updated_since=self.snapshot.watermark - WATERMARK_OVERLAP
+            )
+            written = self.snapshot.apply(documents)
+            self.logger.debug("Refreshed %s snapshot rows", written)
+            return written
+
+        started_at = utc_now()
+        seen: Set[str] = set()
+
+        def track(documents: Iterable[Dict]) -> Iterator[Dict]:
+            for doc in documents:
+                seen.add(doc["city"])
+                yield doc
+
+        written = self.snapshot.apply(
+            track(self.climate_service.get_temperature_snapshot(REFRESH_PROJECTION))
+        )
+        removed = self.snapshot.retain(seen, written_before=started_at)
+        self.logger.debug("Fully refreshed %s snapshot rows and removed %s", written, removed)
+        return written
+
+    def _run(self) -> None:
+        """Refresh periodically until stopped."""
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                self.logger.error("Snapshot refresh failed: %s", e)
+
+    def start(self) -> None:
+        """Start the background refresh thread."""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="city-snapshot-refresher",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background refresh thread."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,278 @@
+"""Vectorized climate statistics over city temperature snapshots."""
+
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+WEATHER_CONDITIONS = ["sunny", "cloudy", "partly cloudy", "rainy", "foggy"]
+
+SNAPSHOT_PROJECTION = {
+    "_id": 0,
+    "city": 1,
+    "temperature_celsius": 1,
+    "humidity_percent": 1,
+    "weather_condition": 1,
+}
+
+
+def encode_conditions(conditions: Iterable[str], vocabulary: List[str]) -> np.ndarray:
+    """Encode weather condition names as small integer codes.
+
+    Unknown conditions are appended to ``vocabulary`` so codes stay stable
+    for the lifetime of the vocabulary list.
+
+    Args:
+        conditions: Weather condition names
+        vocabulary: Mutable list mapping code -> condition name
+
+    Returns:
+        Array of condition codes
+    """
+    index = {name: code for code, name in enumerate(vocabulary)}
+    codes = []
+    for condition in conditions:
+        code = index.get(condition)
+        if code is None:
+            code = len(vocabulary)
+            vocabulary.append(condition)
+            index[condition] = code
+        codes.append(code)
+    return np.asarray(codes, dtype=np.int16)
+
+
+class ClimateStatistics:
+    """Vectorized statistics over a snapshot of city temperature readings."""
+
+    def __init__(self,
+                 cities: Sequence[str],
+                 temperatures: np.ndarray,
+                 humidities: np.ndarray,
+                 condition_codes: np.ndarray,
+                 conditions: List[str]):
+        """Initialize the statistics engine from column arrays.
+
+        Args:
+            cities: City names, one per row
+            temperatures: Temperatures in Celsius
+            humidities: Humidity percentages (NaN where unknown)
+            condition_codes: Weather condition codes
+            conditions: Condition names indexed by code
+        """
+        self.cities = np.asarray(cities, dtype=object)
+        self.temperatures = np.asarray(temperatures, dtype=np.float64)
+        self.humidities = np.asarray(humidities, dtype=np.float64)
+        self.condition_codes = np.asarray(condition_codes, dtype=np.int16)
+        self.conditions = conditions
+
+    @classmethod
+    def from_documents(cls, documents: Iterable[Dict]) -> "ClimateStatistics":
+        """Build statistics from projected city documents.
+
+        Documents without a numeric temperature are skipped.
+
+        Args:
+            documents: Documents holding at least city and temperature fields
+
+        Returns:
+            ClimateStatistics instance
+        """
+        cities = []
+        temperatures = []
+        humidities = []
+        condition_names = []
+
+        for doc in documents:
+            temperature = doc.get("temperature_celsius")
+            if not isinstance(temperature, (int, float)):
+                continue
+            humidity = doc.get("humidity_percent")
+            cities.append(doc["city"])
+            temperatures.append(temperature)
+            humidities.append(humidity if isinstance(humidity, (int, float)) else np.nan)
+            condition_names.append(doc.get("weather_condition", "unknown"))
+
+        conditions = list(WEATHER_CONDITIONS)
+        return cls(
+            cities,
+            np.asarray(temperatures, dtype=np.float64),
+            np.asarray(humidities, dtype=np.float64),
+            encode_conditions(condition_names, conditions),
+            conditions,
+        )
+
+    @property
+    def count(self) -> int:
+        """Number of readings in the snapshot."""
+        return int(self.temperatures.size)
+
+    def mean(self) -> float:
+        """Get the mean temperature.
+
+        Returns:
+            Mean temperature in Celsius
+        """
+        return float(self.temperatures.mean())
+
+    def std(self) -> float:
+        """Get the population standard deviation of temperatures.
+
+        Returns:
+            Standard deviation in Celsius
+        """
+        return float(self.temperatures.std())
+
+    def mean_humidity(self) -> Optional[float]:
+        """Get the mean humidity, ignoring unknown values.
+
+        Returns:
+            Mean humidity percentage or None if no humidity is known
+        """
+        known = self.humidities[~np.isnan(self.humidities)]
+        return float(known.mean()) if known.size else None
+
+    def percentiles(self, q: Sequence[float] = (10, 25, 50, 75, 90)) -> Dict[str, float]:
+        """Get temperature percentiles.
+
+        Args:
+            q: Percentiles to compute, between 0 and 100
+
+        Returns:
+            Dictionary mapping ``p<q>`` to the temperature at that percentile
+        """
+        values = np.percentile(self.temperatures, q)
+        return {f"p{p:g}": float(v) for p, v in zip(q, values)}
+
+    def histogram(self, bins: int = 10) -> Dict[str, List]:
+        """Get a temperature histogram.
+
+        Args:
+            bins: Number of equal-width bins
+
+        Returns:
+            Dictionary with bin ``edges`` and per-bin ``counts``
+        """
+        counts, edges = np.histogram(self.temperatures, bins=bins)
+        return {"edges": edges.round(2).tolist(), "counts": counts.tolist()}
+
+    def _top_k(self, k: int, largest: bool) -> List[Dict]:
+        """Select the k hottest or coldest readings without a full sort."""
+        k = min(k, self.count)
+        if k <= 0:
+            return []
+        keys = -self.temperatures if largest else self.temperatures
+        rows = np.argpartition(keys, k - 1)[:k]
+        rows = rows[np.argsort(keys[rows], kind="stable")]
+        return [
+            {"city": self.cities[row], "temperature_celsius": float(self.temperatures[row])}
+            for row in rows
+        ]
+
+    def hottest(self, k: int = 1) -> List[Dict]:
+        """Get the k hottest cities, hottest first.
+
+        Args:
+            k: Number of cities to return
+
+        Returns:
+            List of dictionaries with city and temperature
+        """
+        return self._top_k(k, largest=True)
+
+    def coldest(self, k: int = 1) -> List[Dict]:
+        """Get the k coldest cities, coldest first.
+
+        Args:
+            k: Number of cities to return
+
+        Returns:
+            List of dictionaries with city and temperature
+        """
+        return self._top_k(k, largest=False)
+
+    def ranking(self) -> List[Dict]:
+        """Rank all readings from hottest to coldest.
+
+        Returns:
+            List of dictionaries with rank, city, temperature and weather condition
+        """
+        order = np.argsort(-self.temperatures, kind="stable")
+        return [
+            {
+                "rank": rank,
+                "city": self.cities[row],
+                "temperature_celsius": float(self.temperatures[row]),
+                "weather_condition": self.conditions[self.condition_codes[row]],
+            }
+            for rank, row in enumerate(order, start=1)
+        ]
+
+    def difference_matrix(self) -> np.ndarray:
+        """Get pairwise temperature differences between all readings.
+
+        Returns:
+            Square array where element ``[i, j]`` is temperature ``i`` minus temperature ``j``
+        """
+        return self.temperatures[:, np.newaxis] - self.temperatures[np.newaxis, :]
+
+    def by_condition(self) -> Dict[str, Dict]:
+        """Group readings by weather condition.
+
+        Returns:
+            Dictionary mapping condition to count, mean temperature and mean humidity
+        """
+        size = len(self.conditions)
+        counts = np.bincount(self.condition_codes, minlength=size)
+        temp_sums = np.bincount(self.condition_codes, weights=self.temperatures, minlength=size)
+
+        known = ~np.isnan(self.humidities)
+        humidity_counts = np.bincount(self.condition_codes[known], minlength=size)
+        humidity_sums = np.bincount(
+            self.condition_codes[known], weights=self.humidities[known], minlength=size
+        )
+
+        groups = {}
+        for code in np.flatnonzero(counts):
+            groups[self.conditions[code]] = {
+                "count": int(counts[code]),
+                "mean_temperature": float(temp_sums[code] / counts[code]),
+                "mean_humidity": (
+                    float(humidity_sums[code] / humidity_counts[code])
+                    if humidity_counts[code] else None
+                ),
+            }
+        return groups
+
+    def condition_distribution(self) -> Dict[str, int]:
+        """Count readings per weather condition.
+
+        Returns:
+            Dictionary mapping condition to number of cities
+        """
+        counts = np.bincount(self.condition_codes, minlength=len(self.conditions))
+        return {self.conditions[code]: int(counts[code]) for code in np.flatnonzero(counts)}
+
+    def summary(self, top_k: int = 3, bins: int = 10) -> Dict:
+        """Get a full statistical summary of the snapshot.
+
+        Args:
+            top_k: Number of hottest and coldest cities to include
+            bins: Number of histogram bins
+
+        Returns:
+            Dictionary with summary statistics, or an empty dictionary if there is no data
+        """
+        if not self.count:
+            return {}
+        return {
+            "count": self.count,
+            "mean": self.mean(),
+            "std": self.std(),
+            "min": float(self.temperatures.min()),
+            "max": float(self.temperatures.max()),
+            "mean_humidity": self.mean_humidity(),
+            "percentiles": self.percentiles(),
+            "histogram": self.histogram(bins),
+            "hottest": self.hottest(top_k),
+            "coldest": self.coldest(top_k),
+            "by_condition": self.by_condition(),
+        }
@@ -0,0 +1,315 @@
+"""Materialized global weather summary maintained on every write."""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import DESCENDING, ReturnDocument
+from pymongo.collection import Collection
+from pymongo.errors import DuplicateKeyError
+
+from common.common.logging_config import get_logger
+from common.common.mongodb.clock import utc_now
+from common.common.mongodb.stats import SNAPSHOT_PROJECTION, ClimateStatistics
+
+SUMMARY_ID = "global"
+
+
+EXTREME_PROJECTION = {"_id": 0, "doc_id": "$_id", "city": 1, "temperature_celsius": 1}
+
+
+def _reading(doc: Optional[Dict]) -> Optional[Tuple[Any, str, float, str]]:
+    """Extract the (id, city, temperature, condition) reading from a document, if any."""
+    if not doc:
+        return None
+    temperature = doc.get("temperature_celsius")
+    if not isinstance(temperature, (int, float)) or "city" not in doc:
+        return None
+    return doc["_id"], doc["city"], float(temperature), doc.get("weather_condition", "unknown")
+
+
+def _condition_counts(summary: Dict) -> Dict[str, int]:
+    """Read the condition histogram, also from summaries written as a plain dictionary."""
+    conditions = summary.get("conditions") or []
+    if isinstance(conditions, dict):
+        return dict(conditions)
+    return {entry["k"]: entry["v"] for entry in conditions}
+
+
+def decode_summary(summary: Optional[Dict]) -> Dict:
+    """Turn a stored summary document into the form returned to readers.
+
+    Conditions are stored as ``{"k": name, "v": count}`` entries, so names
+    containing ``.`` or starting with ``$`` never become field paths; readers
+    get them back as a dictionary.
+
+    Args:
+        summary: Stored summary document, or None
+
+    Returns:
+        Summary with ``conditions`` as a name to count dictionary, or an empty
+        dictionary if there is no summary
+    """
+    if not summary:
+        return {}
+    summary = dict(summary)
+    summary["conditions"] = _condition_counts(summary)
+    return summary
+
+
+class WeatherSummaryStore:
+    """Single-document summary of all city readings.
+
+    The summary keeps running count, sum and sum of squares, a per-condition
+    histogram and bounded hottest/coldest lists keyed by document id. Writers
+    pass the document before and after each change, so reading the summary is
+    a single small document fetch regardless of the number of cities.
+
+    ``count`` counts city documents holding a numeric temperature, not
+    distinct cities: a city with several stored readings counts once per
+    document.
+
+    Each change is folded in with one compare-and-set replace on the
+    document's ``version``, retried when a concurrent writer got there first,
+    so interleaved writers can neither lose increments nor leave duplicate
+    or stale hottest/coldest entries. The fold runs after the city write, so
+    a crash between the two leaves the summary off by that change; ``get``
+    therefore rebuilds the summary from the city documents once it is older
+    than ``rebuild_interval``.
+    """
+
+    def __init__(self, collection: Collection, climate_collection: Collection, top_k: int = 5,
+                 max_retries: int = 10, rebuild_interval: float = 3600.0):
+        """Initialize the summary store.
+
+        Args:
+            collection: Collection holding the summary document
+            climate_collection: Collection holding the city climate documents
+            top_k: Number of hottest and coldest cities to keep
+            max_retries: Attempts of a compare-and-set update before the summary
+                is dropped to be rebuilt on the next read
+            rebuild_interval: Seconds after which a read rebuilds the summary
+                to reconcile drift
+        """
+        self.collection = collection
+        self.climate_collection = climate_collection
+        self.top_k = top_k
+        self.max_retries = max_retries
+        self.rebuild_interval = rebuild_interval
+        self.logger = get_logger("weather_summary_store")
+
+    def ensure_indexes(self) -> None:
+        """Create the temperature index used to refill the hottest/coldest lists."""
+        self.climate_collection.create_index([("temperature_celsius", DESCENDING)])
+
+    def apply_changes(self, changes: Iterable[Tuple[Optional[Dict], Optional[Dict]]]) -> None:
+        """Fold document changes into the summary.
+
+        Nothing is written while the summary does not exist; it is built from
+        the stored documents, including these changes, on the next read.
+
+        Args:
+            changes: Pairs of (document before, document after) for each write;
+                ``None`` stands for a missing document on either side
+        """
+        increments: Dict[str, float] = {}
+        conditions: Dict[str, int] = {}
+        touched: List[Any] = []
+        entries: List[Dict] = []
+
+        for before, after in changes:
+            old = _reading(before)
+            new = _reading(after)
+            for reading, sign in ((old, -1), (new, 1)):
+                if reading is None:
+                    continue
+                doc_id, _, temperature, condition = reading
+                increments["count"] = increments.get("count", 0) + sign
+                increments["sum"] = increments.get("sum", 0) + sign * temperature
+                increments["sum_sq"] = increments.get("sum_sq", 0) + sign * temperature ** 2
+                conditions[condition] = conditions.get(condition, 0) + sign
+                touched.append(doc_id)
+            if new is not None:
+                entries.append({"doc_id": new[0], "city": new[1], "temperature_celsius": new[2]})
+
+        if not increments:
+            return
+
+        for _ in range(self.max_retries):
+            summary = self.collection.find_one({"_id": SUMMARY_ID})
+            if summary is None:
+                return
+            updated = self._fold(summary, increments, conditions, set(touched), entries)
+            result = self.collection.replace_one(
+                {"_id": SUMMARY_ID, "version": summary.get("version")}, updated
+            )
+            if result.matched_count:
+                return
+        self.collection.delete_one({"_id": SUMMARY_ID})
+        self.logger.warning("Dropped the weather summary after %s conflicting updates; "
+                            "it is rebuilt on the next read", self.max_retries)
+
+    def _fold(self, summary: Dict, increments: Dict[str, float], conditions: Dict[str, int],
+              touched: set, entries: List[Dict]) -> Dict:
+        """Build the next version of the summary document."""
+        updated = dict(summary)
+        for field, value in increments.items():
+            updated[field] = summary.get(field, 0) + value
+        updated["version"] = (summary.get("version") or 0) + 1
+
+        counts = _condition_counts(summary)
+        for condition, value in conditions.items():
+            counts[condition] = counts.get(condition, 0) + value
+        updated["conditions"] = [{"k": name, "v": count} for name, count in counts.items()]
+
+        latest = {entry["doc_id"]: entry["temperature_celsius"] for entry in entries}
+        hottest = summary.get("hottest", [])
+        coldest = summary.get("coldest", [])
+        if (self._demoted(hottest, touched, latest, hottest=True)
+                or self._demoted(coldest, touched, latest, hottest=False)):
+            updated["hottest"] = self._load_extremes(-1)
+            updated["coldest"] = self._load_extremes(1)
+        else:
+            updated["hottest"] = self._merge(hottest, touched, entries, reverse=True)
+            updated["coldest"] = self._merge(coldest, touched, entries, reverse=False)
+            if self._short(updated):
+                updated["hottest"] = self._load_extremes(-1)
+                updated["coldest"] = self._load_extremes(1)
+        return updated
+
+    def _merge(self, extremes: List[Dict], touched: set, entries: List[Dict],
+               reverse: bool) -> List[Dict]:
+        """Replace the touched readings of a bounded list and keep the top k."""
+        kept = [entry for entry in extremes if entry["doc_id"] not in touched]
+        latest = list({entry["doc_id"]: entry for entry in entries}.values())
+        merged = sorted(kept + latest, key=lambda entry: entry["temperature_celsius"],
+                        reverse=reverse)
+        return merged[:self.top_k]
+
+    @staticmethod
+    def _demoted(extremes: List[Dict], touched: set, latest: Dict[Any, float],
+                 hottest: bool) -> bool:
+        """Check whether a listed reading was removed or moved away from the extreme.
+
+        A demoted reading may now rank below one that was never in the bounded
+        list, so the list has to be reloaded from the index.
+        """
+        for entry in extremes:
+            if entry["doc_id"] not in touched:
+                continue
+            old = entry["temperature_celsius"]
+            new = latest.get(entry["doc_id"])
+            if new is None or (new < old if hottest else new > old):
+                return True
+        return False
+
+    def _short(self, summary: Optional[Dict]) -> bool:
+        """Check whether the hottest/coldest lists hold fewer entries than they should."""
+        if not summary:
+            return False
+        expected = min(self.top_k, int(summary.get("count", 0)))
+        return min(len(summary.get("hottest", [])), len(summary.get("coldest", []))) < expected
+
+    def _load_extremes(self, direction: int) -> List[Dict]:
+        """Load the top-k readings in one temperature direction from the index.
+
+        Args:
+            direction: -1 for the hottest readings, 1 for the coldest
+
+        Returns:
+            List of entries with document id, city and temperature
+        """
+        return list(self.climate_collection.aggregate([
+            {"$match": {"temperature_celsius": {"$type": "number"}}},
+            {"$sort": {"temperature_celsius": direction}},
+            {"$limit": self.top_k},
+            {"$project": EXTREME_PROJECTION},
+        ]))
+
+    def is_stale(self, summary: Optional[Dict]) -> bool:
+        """Check whether a summary is missing or due for a reconciling rebuild.
+
+        Args:
+            summary: Stored or decoded summary document, or None
+
+        Returns:
+            True if the summary should be rebuilt
+        """
+        if not summary:
+            return True
+        built_at = summary.get("built_at")
+        return built_at is None or utc_now() - built_at >= timedelta(
+            seconds=self.rebuild_interval)
+
+    def rebuild(self) -> Dict:
+        """Recompute the summary from every city document.
+
+        Returns:
+            The rebuilt summary document, in the form returned by ``get``
+        """
+        summary = self._build()
+        current = self.collection.find_one({"_id": SUMMARY_ID}, {"version": 1})
+        summary["version"] = ((current or {}).get("version") or 0) + 1
+        self.collection.replace_one({"_id": SUMMARY_ID}, summary, upsert=True)
+        self.logger.info("Rebuilt weather summary over %s cities", summary["count"])
+        return decode_summary(summary)
+
+    def _build(self) -> Dict:
+        """Compute a summary document from every city document."""
+        stats = ClimateStatistics.from_documents(
+            self.climate_collection.find({"temperature_celsius": {"$type": "number"}},
+                                         SNAPSHOT_PROJECTION)
+        )
+        return {
+            "_id": SUMMARY_ID,
+            "version": 1,
+            "built_at": utc_now(),
+            "count": stats.count,
+            "sum": float(stats.temperatures.sum()),
+            "sum_sq": float((stats.temperatures ** 2).sum()),
+            "conditions": [{"k": name, "v": count}
+                           for name, count in stats.condition_distribution().items()],
+            "hottest": self._load_extremes(-1),
+            "coldest": self._load_extremes(1),
+        }
+
+    def ensure_summary(self) -> Dict:
+        """Build the summary document if it does not exist yet.
+
+        A summary created concurrently by another process is kept.
+
+        Returns:
+            Summary document, in the form returned by ``get``
+        """
+        summary = self.collection.find_one({"_id": SUMMARY_ID})
+        if summary is None:
+            summary = self._build()
+            try:
+                self.collection.insert_one(summary)
+                self.logger.info("Built weather summary over %s cities", summary["count"])
+            except DuplicateKeyError:
+                summary = self.collection.find_one({"_id": SUMMARY_ID})
+        return decode_summary(summary)
+
+    def get(self) -> Dict:
+        """Get the summary document, building it on first use.
+
+        A summary older than ``rebuild_interval`` is rebuilt by the one reader
+        that claims it; concurrent readers get the current summary meanwhile.
+
+        Returns:
+            Summary document with count, sum, sum_sq, conditions, hottest and coldest
+        """
+        summary = self.ensure_summary()
+        if self.is_stale(summary) and self._claim_rebuild(summary.get("built_at")):
+            summary = self.rebuild()
+        return summary
+
+    def _claim_rebuild(self, built_at: Optional[datetime]) -> bool:
+        """Mark the stored summary as being rebuilt, unless another reader did first."""
+        claimed = self.collection.find_one_and_update(
+            {"_id": SUMMARY_ID, "built_at": built_at},
+            {"$set": {"built_at": utc_now()}},
+            projection={"_id": 1},
+            return_document=ReturnDocument.AFTER,
+        )
+        return claimed is not None
@@ -0,0 +1,302 @@
+"""Seeded synthetic climate data for load testing the data layer."""
+
+import json
+import os
+from datetime import datetime
+from typing import Dict, Iterator, List
+
+import numpy as np
+
+from common.common.logging_config import get_logger
+from common.common.mongodb.stats import WEATHER_CONDITIONS
+from common.common.mongodb.tools import BASE_TEMPERATURES, CITY_COORDINATES
+
+DAYS_PER_YEAR = 365.25
+
+# Day of year with the warmest mean temperature in the northern hemisphere
+NORTHERN_PEAK_DAY = 200
+
+# Humidity thresholds between sunny, partly cloudy, cloudy, rainy and foggy
+CONDITION_THRESHOLDS = np.array([55.0, 65.0, 78.0, 90.0])
+CONDITION_CODES = np.array([WEATHER_CONDITIONS.index(name) for name in
+                            ("sunny", "partly cloudy", "cloudy", "rainy", "foggy")], dtype=np.int8)
+
+
+class SyntheticClimateGenerator:
+    """Reproducible multi-station temperature time series.
+
+    The first stations are the sample cities with their ``BASE_TEMPERATURES``
+    ranges; further stations get a latitude-dependent range. Each station
+    follows a seasonal cosine between its low and high, shifted half a year in
+    the southern hemisphere, plus a diurnal swing and noise. Humidity falls as
+    the temperature rises above the station mean and drives the weather
+    condition.
+
+    Readings are produced in chunks of ``station_block`` stations by
+    ``time_block`` periods. Every chunk draws from its own generator seeded
+    with ``(seed, station block, time block)``, so the output depends only
+    on the arguments and chunks can be produced independently.
+    """
+
+    def __init__(self, n_cities: int = len(BASE_TEMPERATURES), seed: int = 0,
+                 station_block: int = 1024, time_block: int = 128):
+        """Build the station table.
+
+        Args:
+            n_cities: Number of stations
+            seed: Seed of the random generators
+            station_block: Stations per chunk
+            time_block: Periods per chunk
+        """
+        self.seed = seed
+        self.station_block = station_block
+        self.time_block = time_block
+        self.logger = get_logger("synthetic_climate")
+
+        rng = np.random.default_rng(seed)
+        known = list(BASE_TEMPERATURES)[:n_cities]
+        extra = n_cities - len(known)
+
+        latitudes = rng.uniform(-60.0, 70.0, extra)
+        lows = 25.0 - 0.5 * np.abs(latitudes) + rng.normal(0.0, 3.0, extra)
+
+        self.cities = np.array(known + [f"Station {i:07d}" for i in range(extra)], dtype=object)
+        self.latitudes = np.concatenate([[CITY_COORDINATES[city][0] for city in known], latitudes])
+        self.longitudes = np.concatenate([
+            [CITY_COORDINATES[city][1] for city in known], rng.uniform(-180.0, 180.0, extra)
+        ])
+        self.lows = np.concatenate([[BASE_TEMPERATURES[city][0] for city in known], lows])
+        self.highs = np.concatenate([
+            [BASE_TEMPERATURES[city][1] for city in known], lows + rng.uniform(6.0, 25.0, extra)
+        ])
+        self.base_humidities = rng.uniform(40.0, 80.0, n_cities)
+
+    @property
+    def n_cities(self) -> int:
+        """Number of stations."""
+        return int(self.cities.size)
+
+    def readings(self, start: datetime, days: int,
+                 interval_hours: float = 24.0) -> Iterator[Dict[str, np.ndarray]]:
+        """Generate readings for every station in column chunks.
+
+        Args:
+            start: Timestamp of the first reading
+            days: Length of the series in days
+            interval_hours: Hours between consecutive readings of a station
+
+        Yields:
+            Dictionaries of equally long arrays: ``station`` index, ``timestamp``
+            (datetime64), ``temperature_celsius``, ``humidity_percent`` and
+            ``condition_code`` into ``WEATHER_CONDITIONS``
+        """
+        periods = int(days * 24 / interval_hours)
+        step = np.timedelta64(int(interval_hours * 3600), "s")
+        origin = np.datetime64(start, "s")
+        start_of_year = np.datetime64(f"{start.year}-01-01", "s")
+
+        for station_start in range(0, self.n_cities, self.station_block):
+            stations = np.arange(station_start, min(station_start + self.station_block,
+                                                    self.n_cities))
+            for time_start in range(0, periods, self.time_block):
+                rng = np.random.default_rng(
+                    [self.seed, station_start // self.station_block, time_start // self.time_block]
+                )
+                offsets = np.arange(time_start, min(time_start + self.time_block, periods))
+                timestamps = origin + offsets * step
+                yield self._chunk(rng, stations, timestamps, start_of_year)
+
+    def _chunk(self, rng: np.random.Generator, stations: np.ndarray, timestamps: np.ndarray,
+               start_of_year: np.datetime64) -> Dict[str, np.ndarray]:
+        """Compute one chunk of readings as a stations x periods grid."""
+        seconds = (timestamps - start_of_year).astype(np.float64)
+        day_of_year = (seconds / 86400.0) % DAYS_PER_YEAR
+        hour = (seconds / 3600.0) % 24.0
+
+        peak = np.where(self.latitudes[stations] < 0,
+                        NORTHERN_PEAK_DAY - DAYS_PER_YEAR / 2, NORTHERN_PEAK_DAY)
+        mean = (self.lows[stations] + self.highs[stations]) / 2
+        amplitude = (self.highs[stations] - self.lows[stations]) / 2
+
+        season = np.cos(2 * np.pi * (day_of_year[np.newaxis, :] - peak[:, np.newaxis])
+                        / DAYS_PER_YEAR)
+        diurnal = np.cos(2 * np.pi * (hour - 15.0) / 24.0)
+        shape = (stations.size, timestamps.size)
+        temperatures = (mean[:, np.newaxis]
+                        + amplitude[:, np.newaxis] * season
+                        + 0.25 * amplitude[:, np.newaxis] * diurnal[np.newaxis, :]
+                        + rng.normal(0.0, 1.5, shape))
+
+        humidities = np.clip(
+            self.base_humidities[stations, np.newaxis]
+            - 1.2 * (temperatures - mean[:, np.newaxis])
+            + rng.normal(0.0, 8.0, shape),
+            5.0, 100.0,
+        )
+        conditions = CONDITION_CODES[
+            np.digitize(humidities + rng.normal(0.0, 5.0, shape), CONDITION_THRESHOLDS)
+        ]
+
+        return {
+            "station": np.repeat(stations.astype(np.int32), timestamps.size),
+            "timestamp": np.tile(timestamps, stations.size),
+            "temperature_celsius": temperatures.round(1).astype(np.float32).ravel(),
+            "humidity_percent": humidities.round(1).astype(np.float32).ravel(),
+            "condition_code": conditions.ravel(),
+        }
+
+    def documents(self, chunk: Dict[str, np.ndarray],
+                  include_location: bool = False) -> List[Dict]:
+        """Convert a chunk of readings into city documents.
+
+        Args:
+            chunk: Column chunk produced by ``readings``
+            include_location: Whether to add the station's GeoJSON point
+
+        Returns:
+            List of documents ready for the bulk write paths
+        """
+        stations = chunk["station"]
+        columns = zip(
+            self.cities[stations].tolist(),
+            chunk["temperature_celsius"].astype(np.float64).round(1).tolist(),
+            chunk["humidity_percent"].astype(np.float64).round(1).tolist(),
+            np.asarray(WEATHER_CONDITIONS, dtype=object)[chunk["condition_code"]].tolist(),
+            chunk["timestamp"].astype("datetime64[us]").tolist(),
+        )
+        documents = [
+            {"city": city, "temperature_celsius": temperature, "humidity_percent": humidity,
+             "weather_condition": condition, "timestamp": timestamp}
+            for city, temperature, humidity, condition, timestamp in columns
+        ]
+        if include_location:
+            for doc, station in zip(documents, stations.tolist()):
+                doc["location"] = {
+                    "type": "Point",
+                    "coordinates": [float(self.longitudes[station]),
+                                    float(self.latitudes[station])],
+                }
+        return documents
+
+    def load(self, climate_service, start: datetime, days: int, interval_hours: float = 24.0,
+             include_location: bool = False) -> int:
+        """Write the generated readings through the bulk upsert path.
+
+        Each city document ends up holding its station's latest reading and
+        every reading is folded into the rollups.
+
+        Args:
+            climate_service: ClimateDataService to write to
+            start: Timestamp of the first reading
+            days: Length of the series in days
+            interval_hours: Hours between consecutive readings of a station
+            include_location: Whether to store the station locations
+
+        Returns:
+            Number of readings written
+        """
+        written = 0
+        for chunk in self.readings(start, days, interval_hours):
+            climate_service.bulk_upsert_city_climate(self.documents(chunk, include_location))
+            written += chunk["station"].size
+        self.logger.info("Loaded %s synthetic readings for %s stations", written, self.n_cities)
+        return written
+
+    def fill_history(self, history, start: datetime, days: int,
+                     interval_hours: float = 24.0) -> int:
+        """Append the generated readings to an in-process temperature history.
+
+        Args:
+            history: TemperatureHistory to fill
+            start: Timestamp of the first reading
+            days: Length of the series in days
+            interval_hours: Hours between consecutive readings of a station
+
+        Returns:
+            Number of readings stored
+        """
+        stored = 0
+        for chunk in self.readings(start, days, interval_hours):
+            stations, first = np.unique(chunk["station"], return_index=True)
+            bounds = np.append(first, chunk["station"].size)
+            for station, begin, end in zip(stations.tolist(), bounds[:-1], bounds[1:]):
+                stored += history.extend(
+                    self.cities[station],
+                    chunk["timestamp"][begin:end],
+                    chunk["temperature_celsius"][begin:end],
+                    chunk["humidity_percent"][begin:end],
+                )
+        return stored
+
+    def write_files(self, directory: str, start: datetime, days: int,
+                    interval_hours: float = 24.0, file_format: str = "npz") -> List[str]:
+        """Write the station table and the readings to files.
+
+        ``npz`` writes one compressed column archive per chunk; ``ndjson``
+        writes one JSON document per line, in the shape accepted by
+        ``TemperatureTools.bulk_update_temperatures``.
+
+        Args:
+            directory: Output directory, created if missing
+            start: Timestamp of the first reading
+            days: Length of the series in days
+            interval_hours: Hours between consecutive readings of a station
+            file_format: ``npz`` or ``ndjson``
+
+        Returns:
+            Paths of the written files, the station table first
+
+        Raises:
+            ValueError: If the file format is not supported
+        """
+        if file_format not in ("npz", "ndjson"):
+            raise ValueError(f"Unsupported file format: {file_format}")
+        os.makedirs(directory, exist_ok=True)
+
+        stations_path = os.path.join(directory, "stations.npz")
+        np.savez_compressed(
+            stations_path, cities=self.cities.astype(str), latitudes=self.latitudes,
+            longitudes=self.longitudes, lows=self.lows, highs=self.highs,
+        )
+        paths = [stations_path]
+
+        chunks = self.readings(start, days, interval_hours)
+        if file_format == "npz":
+            for index, chunk in enumerate(chunks):
+                path = os.path.join(directory, f"readings-{index:05d}.npz")
+                np.savez_compressed(path, **chunk)
+                paths.append(path)
+        else:
+            path = os.path.join(directory, "readings.ndjson")
+            with open(path, "w", encoding="utf-8") as handle:
+                for chunk in chunks:
+                    for doc in self.documents(chunk):
+                        doc["timestamp"] = doc["timestamp"].isoformat()
+                        handle.write(json.dumps(doc, ensure_ascii=False) + "\n")
+            paths.append(path)
+
+        self.logger.info("Wrote synthetic readings for %s stations to %s", self.n_cities, directory)
+        return paths
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write seeded synthetic climate readings")
+    parser.add_argument("directory", help="Output directory")
+    parser.add_argument("--cities", type=int, default=len(BASE_TEMPERATURES),
+                        help="Number of stations")
+    parser.add_argument("--days", type=int, default=365, help="Length of the series in days")
+    parser.add_argument("--interval-hours", type=float, default=24.0,
+                        help="Hours between readings")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--start", type=datetime.fromisoformat, default=datetime(2023, 1, 1),
+                        help="Timestamp of the first reading (ISO format)")
+    parser.add_argument("--format", choices=["npz", "ndjson"], default="npz",
+                        help="Output file format")
+    args = parser.parse_args()
+
+    generator = SyntheticClimateGenerator(args.cities, seed=args.seed)
+    for written in generator.write_files(args.directory, args.start, args.days,
+                                         args.interval_hours, args.format):
+        print(written)
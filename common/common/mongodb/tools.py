@@ -1,36 +1,183 @@
 """Tools for CrewAI agent to interact with MongoDB temperature data."""
 
+import asyncio
 import random
+import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError, field_validator
 
+from common.common.mongodb.async_climate_data import AsyncClimateDataService
+from common.common.mongodb.city_resolver import CityResolver
 from common.common.mongodb.climate_data import ClimateDataService
+from common.common.mongodb.clock import to_utc, utc_now
+from common.common.mongodb.derived import climate_types, format_derived_metrics
+from common.common.mongodb.history import TemperatureHistory
+from common.common.mongodb.rollups import TREND_WINDOWS
+from common.common.mongodb.snapshot import CitySnapshot, SnapshotRefresher
+from common.common.mongodb.stats import SNAPSHOT_PROJECTION, ClimateStatistics
 from common.common.logging_config import get_logger
 
 
+CITY_COORDINATES = {
+    "San Francisco": (37.7749, -122.4194),
+    "New York": (40.7128, -74.0060),
+    "London": (51.5074, -0.1278),
+    "Tokyo": (35.6762, 139.6503),
+    "Paris": (48.8566, 2.3522),
+    "Sydney": (-33.8688, 151.2093),
+    "Rio de Janeiro": (-22.9068, -43.1729),
+    "Moscow": (55.7558, 37.6173),
+    "Cairo": (30.0444, 31.2357),
+    "Mumbai": (19.0760, 72.8777),
+    "São Paulo": (-23.5505, -46.6333),
+    "Mexico City": (19.4326, -99.1332),
+    "Toronto": (43.6532, -79.3832),
+    "Berlin": (52.5200, 13.4050),
+    "Madrid": (40.4168, -3.7038)
+}
+
+BASE_TEMPERATURES = {
+    "San Francisco": (12, 18),
+    "New York": (5, 25),
+    "London": (8, 20),
+    "Tokyo": (10, 28),
+    "Paris": (7, 22),
+    "Sydney": (15, 30),
+    "Rio de Janeiro": (20, 35),
+    "Moscow": (-5, 20),
+    "Cairo": (15, 35),
+    "Mumbai": (20, 38),
+    "São Paulo": (15, 28),
+    "Mexico City": (12, 25),
+    "Toronto": (0, 22),
+    "Berlin": (5, 20),
+    "Madrid": (8, 28)
+}
+
+DEFAULT_TEMPERATURE_RANGE = (10, 25)
+
+CITY_INDEX_REFRESH_INTERVAL = 60.0
+
+DERIVED_BATCH_SIZE = 500
+
+
 class TemperatureData(BaseModel):
     """Temperature data model for cities."""
-    
+
+    model_config = ConfigDict(allow_inf_nan=False)
+
     city: str = Field(description="Name of the city")
     temperature_celsius: float = Field(description="Temperature in Celsius")
-    humidity_percent: float = Field(description="Humidity percentage")
+    humidity_percent: float = Field(ge=0, le=100, description="Humidity percentage")
     weather_condition: str = Field(description="Weather condition (sunny, cloudy, rainy, etc.)")
-    timestamp: datetime = Field(description="Timestamp of the measurement")
+    timestamp: datetime = Field(default_factory=utc_now,
+                                description="Timestamp of the measurement")
+
+    @field_validator("timestamp")
+    @classmethod
+    def normalize_timestamp(cls, value: datetime) -> datetime:
+        """Convert timezone-aware timestamps to naive UTC, as stored by MongoDB."""
+        return to_utc(value)
+
+
+TEMPERATURE_BATCH = TypeAdapter(List[TemperatureData])
+
+
+def validate_temperature_batch(rows: Sequence[Any]) -> Tuple[List[Dict], List[Dict]]:
+    """Validate a batch of readings in a single pass of the compiled adapter.
+
+    Valid readings are returned as the validated models' field dictionaries,
+    so they can be handed to the bulk write without another copy. Only when
+    the batch holds invalid rows are the remaining rows validated again.
+
+    Args:
+        rows: Raw readings, one mapping per row
+
+    Returns:
+        Tuple of valid readings and per-row errors, each error holding the row
+        ``index``, its ``city`` if known and the list of field ``errors``
+    """
+    rows = list(rows)
+    try:
+        return [vars(model) for model in TEMPERATURE_BATCH.validate_python(rows)], []
+    except ValidationError as exc:
+        failures: Dict[int, List[Dict]] = {}
+        for error in exc.errors(include_url=False):
+            index, *field = error["loc"]
+            failures.setdefault(index, []).append({
+                "field": ".".join(str(part) for part in field) or None,
+                "message": error["msg"],
+            })
+
+    errors = [
+        {
+            "index": index,
+            "city": rows[index].get("city") if isinstance(rows[index], dict) else None,
+            "errors": messages,
+        }
+        for index, messages in sorted(failures.items())
+    ]
+    remaining = [row for index, row in enumerate(rows) if index not in failures]
+    valid = [vars(model) for model in TEMPERATURE_BATCH.validate_python(remaining)]
+    return valid, errors
 
 
 class TemperatureTools:
     """Tools for managing temperature data in MongoDB."""
 
-    def __init__(self):
-        """Initialize temperature tools and sample data."""
+    def __init__(self, snapshot_refresh_interval: Optional[float] = None,
+                 history: Optional[TemperatureHistory] = None):
+        """Initialize temperature tools and sample data.
+
+        Args:
+            snapshot_refresh_interval: If set, serve reads from an in-memory city
+                snapshot refreshed in the background every this many seconds
+            history: Optional in-process history receiving every reading written
+                through the tools and serving ``get_temperature_history``
+        """
         self.climate_service = ClimateDataService()
         self.logger = get_logger("temperature_tools")
+        self.history = history
         self._initialize_sample_data()
+        self._city_resolver = CityResolver()
+        self._city_index_loaded: Optional[float] = None
+
+        self.async_climate_service: Optional[AsyncClimateDataService] = None
+        self.snapshot: Optional[CitySnapshot] = None
+        self.snapshot_refresher: Optional[SnapshotRefresher] = None
+        if snapshot_refresh_interval is not None:
+            self._start_snapshot(snapshot_refresh_interval)
+
+    def _start_snapshot(self, interval: float) -> None:
+        """Load the in-memory city snapshot and start its background refresher.
+
+        Args:
+            interval: Seconds between refreshes
+        """
+        self.snapshot = CitySnapshot()
+        self.snapshot_refresher = SnapshotRefresher(self.snapshot, self.climate_service, interval)
+        loaded = self.snapshot_refresher.refresh()
+        self.snapshot_refresher.start()
+        self.logger.info("Loaded %s cities into the in-memory snapshot", loaded)
+
+    def _get_city_data(self, city: str):
+        """Get the latest reading for a city from the snapshot or the database.
+
+        Args:
+            city: Name of the city
+
+        Returns:
+            City document or snapshot record, or None if not found
+        """
+        if self.snapshot is not None:
+            return self.snapshot.get(city)
+        return self.climate_service.get_city_climate(city)
 
     def _initialize_sample_data(self) -> None:
-        """Initialize sample temperature data for predefined cities."""
+        """Create the indexes and sample temperature data for predefined cities."""
+        self.climate_service.ensure_indexes()
         sample_cities = [
             "San Francisco", "New York", "London", "Tokyo", "Paris", 
             "Sydney", "Rio de Janeiro", "Moscow", "Cairo", "Mumbai",
@@ -41,6 +188,8 @@ class TemperatureTools:
             existing_data = self.climate_service.get_city_climate(city)
             if not existing_data:
                 self._generate_sample_data_for_city(city)
+            elif "location" not in existing_data and city in CITY_COORDINATES:
+                self.climate_service.set_city_location(city, *CITY_COORDINATES[city])
 
     def _generate_sample_data_for_city(self, city: str) -> None:
         """Generate sample temperature data for a specific city.
@@ -48,25 +197,7 @@ class TemperatureTools:
         Args:
             city: Name of the city
         """
-        base_temps = {
-            "San Francisco": (12, 18),
-            "New York": (5, 25),
-            "London": (8, 20),
-            "Tokyo": (10, 28),
-            "Paris": (7, 22),
-            "Sydney": (15, 30),
-            "Rio de Janeiro": (20, 35),
-            "Moscow": (-5, 20),
-            "Cairo": (15, 35),
-            "Mumbai": (20, 38),
-            "São Paulo": (15, 28),
-            "Mexico City": (12, 25),
-            "Toronto": (0, 22),
-            "Berlin": (5, 20),
-            "Madrid": (8, 28)
-        }
-        
-        min_temp, max_temp = base_temps.get(city, (10, 25))
+        min_temp, max_temp = BASE_TEMPERATURES.get(city, DEFAULT_TEMPERATURE_RANGE)
         current_temp = random.uniform(min_temp, max_temp)
         humidity = random.uniform(40, 80)
         conditions = ["sunny", "cloudy", "partly cloudy", "rainy", "foggy"]
@@ -77,10 +208,14 @@ class TemperatureTools:
             "temperature_celsius": round(current_temp, 1),
             "humidity_percent": round(humidity, 1),
             "weather_condition": weather,
-            "timestamp": datetime.now(),
+            "timestamp": utc_now(),
             "climate_type": self._get_climate_type(city, current_temp),
             "seasonal_info": self._get_seasonal_info(city)
         }
+        if city in CITY_COORDINATES:
+            temperature_data["location"] = self.climate_service.make_location(
+                *CITY_COORDINATES[city]
+            )
         
         self.climate_service.insert_city_climate(temperature_data)
 
@@ -121,6 +256,49 @@ class TemperatureTools:
         }
         return seasons.get(city, {"current": "Summer", "description": "Temperate climate"})
 
+    @property
+    def city_resolver(self) -> CityResolver:
+        """Fuzzy city index, loaded from the city directory on first use."""
+        if self._city_index_loaded is None:
+            self.refresh_city_index()
+        return self._city_resolver
+
+    def refresh_city_index(self) -> None:
+        """Rebuild the fuzzy city index from the city directory."""
+        self._city_resolver.refresh(self.climate_service.get_all_cities())
+        self._city_index_loaded = time.monotonic()
+
+    def resolve_city(self, city: str) -> str:
+        """Resolve a user-supplied city name to its canonical spelling.
+
+        A name that does not resolve reloads the city index, at most once per
+        ``CITY_INDEX_REFRESH_INTERVAL`` seconds, to pick up cities written elsewhere.
+        The async methods only consult the index and never reload it.
+
+        Args:
+            city: City name as written by the user, possibly partial or misspelled
+
+        Returns:
+            Canonical city name, or the input unchanged if no city matches
+        """
+        match = self.city_resolver.canonical(city)
+        if match is None and (time.monotonic() - self._city_index_loaded
+                              >= CITY_INDEX_REFRESH_INTERVAL):
+            self.refresh_city_index()
+            match = self.city_resolver.canonical(city)
+        return match or city
+
+    def find_cities(self, text: str) -> List[str]:
+        """Find the known cities mentioned in free text.
+
+        Args:
+            text: User input
+
+        Returns:
+            Canonical city names, best match first
+        """
+        return self.city_resolver.find_in_text(text)
+
     def get_current_temperature(self, city: str) -> Dict:
         """Get current temperature data for a city.
 
@@ -130,14 +308,27 @@ class TemperatureTools:
         Returns:
             Dictionary with temperature information
         """
-        data = self.climate_service.get_city_climate(city)
+        city = self.resolve_city(city)
+        return self._format_current_temperature(city, self._get_city_data(city))
+
+    def _format_current_temperature(self, city: str, data) -> Dict:
+        """Format a city reading as a current temperature response.
+
+        Args:
+            city: Requested city name
+            data: City document or snapshot record, or None if not found
+
+        Returns:
+            Dictionary with temperature information
+        """
         if data:
             return {
                 "city": data["city"],
                 "temperature": f"{data['temperature_celsius']}°C",
                 "humidity": f"{data['humidity_percent']}%",
                 "weather": data["weather_condition"],
-                "timestamp": data["timestamp"].strftime("%Y-%m-%d %H:%M:%S")
+                "timestamp": data["timestamp"].strftime("%Y-%m-%d %H:%M:%S"),
+                **format_derived_metrics([data])[0]
             }
         else:
             return {"error": f"No temperature data found for {city}"}
@@ -152,9 +343,23 @@ class TemperatureTools:
         Returns:
             Dictionary with temperature comparison data
         """
-        data1 = self.climate_service.get_city_climate(city1)
-        data2 = self.climate_service.get_city_climate(city2)
-        
+        city1, city2 = self.resolve_city(city1), self.resolve_city(city2)
+        return self._format_comparison(
+            city1, city2, self._get_city_data(city1), self._get_city_data(city2)
+        )
+
+    def _format_comparison(self, city1: str, city2: str, data1, data2) -> Dict:
+        """Format two city readings as a temperature comparison.
+
+        Args:
+            city1: Name of the first city
+            city2: Name of the second city
+            data1: Reading for the first city, or None if not found
+            data2: Reading for the second city, or None if not found
+
+        Returns:
+            Dictionary with temperature comparison data
+        """
         if data1 and data2:
             temp_diff = data1["temperature_celsius"] - data2["temperature_celsius"]
             return {
@@ -174,27 +379,184 @@ class TemperatureTools:
         else:
             return {"error": "Could not retrieve temperature data for one or both cities"}
 
+    def compare_cities(self, cities: List[str]) -> Dict:
+        """Compare temperatures across any number of cities.
+
+        All cities are fetched in a single query and ranked with vectorized
+        computation, so comparing N cities costs one round trip instead of
+        N * (N - 1) / 2 pairwise comparisons.
+
+        Args:
+            cities: Names of the cities to compare
+
+        Returns:
+            Dictionary with the ranking, pairwise difference matrix and warmest/coldest city
+        """
+        requested = list(dict.fromkeys(map(self.resolve_city, cities)))
+        if self.snapshot is not None:
+            documents = [record for record in map(self.snapshot.get, requested) if record]
+        else:
+            documents = self.climate_service.get_cities_climate(requested, SNAPSHOT_PROJECTION)
+        return self._format_city_comparison(requested, documents)
+
+    def _format_city_comparison(self, requested: List[str], documents: List) -> Dict:
+        """Rank city readings and format the multi-city comparison.
+
+        Args:
+            requested: Requested city names without duplicates, in request order
+            documents: Readings found for the requested cities
+
+        Returns:
+            Dictionary with the ranking, pairwise difference matrix and warmest/coldest city
+        """
+        found = {}
+        for doc in documents:
+            found.setdefault(doc["city"], doc)
+        stats = ClimateStatistics.from_documents(
+            found[city] for city in requested if city in found
+        )
+
+        if stats.count < 2:
+            return {"error": "Could not retrieve temperature data for at least two cities"}
+
+        ranking = stats.ranking()
+        differences = stats.difference_matrix().round(1)
+        spread = ranking[0]["temperature_celsius"] - ranking[-1]["temperature_celsius"]
+        return {
+            "ranking": [
+                {
+                    "rank": row["rank"],
+                    "city": row["city"],
+                    "temperature": f"{row['temperature_celsius']}°C",
+                    "weather": row["weather_condition"]
+                }
+                for row in ranking
+            ],
+            "warmest_city": ranking[0]["city"],
+            "coldest_city": ranking[-1]["city"],
+            "temperature_spread": f"{spread:.1f}°C",
+            "difference_matrix": {
+                "cities": stats.cities.tolist(),
+                "celsius": differences.tolist()
+            },
+            "missing_cities": [city for city in requested if city not in found]
+        }
+
     def get_all_cities_temperatures(self) -> List[Dict]:
         """Get temperature data for all cities.
 
         Returns:
             List of dictionaries with temperature data for each city
         """
-        cities = self.climate_service.get_all_cities()
-        temperatures = []
-        
-        for city in cities:
-            data = self.climate_service.get_city_climate(city)
-            if data:
-                temperatures.append({
-                    "city": city,
-                    "temperature": f"{data['temperature_celsius']}°C",
-                    "weather": data["weather_condition"]
-                })
-        
-        return sorted(temperatures, key=lambda x: x["city"])
+        if self.snapshot is not None:
+            return sorted(
+                self._format_city_batch(list(self.snapshot.records())), key=lambda x: x["city"]
+            )
+
+        return list(self.iter_cities_temperatures())
+
+    def _stream_query(self, city_filter: Optional[Dict]) -> Dict:
+        """Build the streaming query for cities holding temperature data.
+
+        Args:
+            city_filter: Optional additional filter on the city documents
+
+        Returns:
+            MongoDB query filter
+        """
+        query: Dict = {"temperature_celsius": {"$type": "number"}}
+        if city_filter:
+            query = {"$and": [query, city_filter]}
+        return query
 
-    def update_city_temperature(self, city: str, temperature: float, humidity: float, weather: str) -> Dict:
+    def _format_city_rows(self, documents: Iterable[Dict],
+                          limit: Optional[int] = None) -> Iterator[Dict]:
+        """Format city documents sorted by city as temperature rows, skipping duplicates.
+
+        Rows are formatted ``DERIVED_BATCH_SIZE`` at a time so the derived
+        metrics are computed over arrays rather than per row.
+
+        Args:
+            documents: Projected city documents in city order
+            limit: Optional maximum number of rows, counted after duplicates are skipped
+
+        Yields:
+            Dictionaries with city, temperature, weather and derived metrics
+        """
+        last_city = None
+        batch = []
+        remaining = limit
+        for data in documents:
+            if remaining is not None and remaining <= 0:
+                break
+            if data["city"] != last_city:
+                last_city = data["city"]
+                batch.append(data)
+                if remaining is not None:
+                    remaining -= 1
+                if len(batch) == DERIVED_BATCH_SIZE:
+                    yield from self._format_city_batch(batch)
+                    batch = []
+        if batch:
+            yield from self._format_city_batch(batch)
+
+    def _format_city_batch(self, documents: List) -> List[Dict]:
+        """Format city readings as temperature rows with vectorized derived metrics.
+
+        Args:
+            documents: City documents or snapshot records
+
+        Returns:
+            Dictionaries with city, temperature, weather and derived metrics
+        """
+        return [
+            {**self._format_city_row(data), **derived}
+            for data, derived in zip(documents, format_derived_metrics(documents))
+        ]
+
+    def _format_city_row(self, data) -> Dict:
+        """Format a city reading as a temperature row.
+
+        Args:
+            data: City document or snapshot record
+
+        Returns:
+            Dictionary with city, temperature and weather
+        """
+        return {
+            "city": data["city"],
+            "temperature": f"{data['temperature_celsius']}°C",
+            "weather": data["weather_condition"]
+        }
+
+    def iter_cities_temperatures(self, city_filter: Optional[Dict] = None,
+                                 limit: Optional[int] = None,
+                                 batch_size: int = 1000) -> Iterator[Dict]:
+        """Stream temperature rows for all cities in city order.
+
+        Rows are read from a cursor one batch at a time, so memory stays
+        constant regardless of the number of cities and consumers can stop early.
+
+        Args:
+            city_filter: Optional MongoDB filter, e.g. ``{"weather_condition": "sunny"}``
+            limit: Optional maximum number of rows; it is applied to distinct
+                cities, so it does not limit the cursor
+            batch_size: Number of documents fetched per round trip
+
+        Yields:
+            Dictionaries with city, temperature, weather and derived metrics
+        """
+        cursor = self.climate_service.iter_city_climate(
+            self._stream_query(city_filter), SNAPSHOT_PROJECTION, None, batch_size
+        )
+        try:
+            yield from self._format_city_rows(cursor, limit)
+        finally:
+            cursor.close()
+
+    def update_city_temperature(self, city: str, temperature: float, humidity: float, weather: str,
+                                latitude: Optional[float] = None,
+                                longitude: Optional[float] = None) -> Dict:
         """Update temperature data for a city.
 
         Args:
@@ -202,60 +564,469 @@ class TemperatureTools:
             temperature: Temperature in Celsius
             humidity: Humidity percentage
             weather: Weather condition
+            latitude: Optional latitude of the city in degrees
+            longitude: Optional longitude of the city in degrees
 
         Returns:
-            Dictionary with update result
+            Dictionary with update result; ``changed`` is False when the reading
+            matched the stored one and only its timestamp was refreshed
         """
         temperature_data = {
             "city": city,
             "temperature_celsius": temperature,
             "humidity_percent": humidity,
             "weather_condition": weather,
-            "timestamp": datetime.now(),
+            "timestamp": utc_now(),
             "climate_type": self._get_climate_type(city, temperature),
             "seasonal_info": self._get_seasonal_info(city)
         }
+        if latitude is not None and longitude is not None:
+            temperature_data["location"] = self.climate_service.make_location(latitude, longitude)
         
-        success = self.climate_service.update_city_climate(city, temperature_data)
-        if success:
-            return {"success": True, "message": f"Updated temperature for {city}"}
-        else:
-            return {"success": False, "message": f"Failed to update temperature for {city}"}
+        changed = self.climate_service.update_city_climate(city, temperature_data)
+        if self.snapshot is not None:
+            self.snapshot.apply([temperature_data])
+        if self.history is not None:
+            self._record_history([temperature_data])
+        self.city_resolver.add(city)
+        if changed:
+            return {"success": True, "changed": True, "message": f"Updated temperature for {city}"}
+        return {"success": True, "changed": False,
+                "message": f"Temperature for {city} was already up to date"}
+
+    def bulk_update_temperatures(self, readings: Sequence[Dict]) -> Dict:
+        """Validate and write many temperature readings at once.
+
+        Rows failing validation are reported and skipped; the valid rows are
+        written with a single bulk upsert.
+
+        Args:
+            readings: Readings with city, temperature_celsius, humidity_percent,
+                weather_condition and an optional timestamp
+
+        Returns:
+            Dictionary with the number of valid readings, cities written and per-row errors
+        """
+        valid, errors = validate_temperature_batch(readings)
+        types = climate_types([data["temperature_celsius"] for data in valid]).tolist()
+        for data, climate_type in zip(valid, types):
+            data["climate_type"] = climate_type
+            data["seasonal_info"] = self._get_seasonal_info(data["city"])
+
+        written = self.climate_service.bulk_upsert_city_climate(valid) if valid else 0
+        if written and self.snapshot is not None:
+            self.snapshot.apply(sorted(valid, key=lambda data: data["timestamp"]))
+        if written and self.history is not None:
+            self._record_history(valid)
+        for data in valid:
+            self.city_resolver.add(data["city"])
+
+        if errors:
+            self.logger.warning("Rejected %s of %s temperature readings",
+                                len(errors), len(readings))
+        return {
+            "success": not errors,
+            "validated": len(valid),
+            "written": written,
+            "errors": errors,
+            "message": f"Updated {written} cities from {len(valid)} valid readings",
+        }
+
+    def nearest_cities(self, latitude: float, longitude: float, k: int = 5) -> List[Dict]:
+        """Get the k cities closest to a location.
+
+        Args:
+            latitude: Latitude in degrees
+            longitude: Longitude in degrees
+            k: Number of cities to return
+
+        Returns:
+            List of dictionaries with city, distance and temperature, closest first
+        """
+        return self._format_nearest_cities(
+            self.climate_service.nearest_cities(latitude, longitude, limit=k)
+        )
+
+    def _format_nearest_cities(self, cities: List[Dict]) -> List[Dict]:
+        """Format nearest-city search results.
+
+        Args:
+            cities: City documents with a ``distance_meters`` field, closest first
+
+        Returns:
+            List of dictionaries with city, distance and temperature
+        """
+        return [
+            {
+                "city": data["city"],
+                "distance": f"{data['distance_meters'] / 1000:.1f} km",
+                "temperature": (
+                    f"{data['temperature_celsius']}°C" if "temperature_celsius" in data else None
+                ),
+                "weather": data.get("weather_condition")
+            }
+            for data in cities
+        ]
+
+    def get_nearest_city_temperature(self, latitude: float, longitude: float,
+                                     max_distance_km: Optional[float] = None) -> Dict:
+        """Get current temperature from the nearest city with temperature data.
+
+        Args:
+            latitude: Latitude in degrees
+            longitude: Longitude in degrees
+            max_distance_km: Optional search radius in kilometers
+
+        Returns:
+            Dictionary with temperature information and the distance to the city
+        """
+        cities = self.climate_service.nearest_cities(
+            latitude, longitude, limit=1, max_distance_km=max_distance_km,
+            query={"temperature_celsius": {"$type": "number"}}
+        )
+        return self._format_nearest_city_temperature(latitude, longitude, cities)
+
+    def _format_nearest_city_temperature(self, latitude: float, longitude: float,
+                                         cities: List[Dict]) -> Dict:
+        """Format the nearest city with temperature data.
+
+        Args:
+            latitude: Requested latitude in degrees
+            longitude: Requested longitude in degrees
+            cities: Nearest-city search results, at most one element
+
+        Returns:
+            Dictionary with temperature information and the distance to the city
+        """
+        if not cities:
+            return {"error": f"No temperature data found near ({latitude}, {longitude})"}
+
+        data = cities[0]
+        return {
+            "city": data["city"],
+            "distance": f"{data['distance_meters'] / 1000:.1f} km",
+            "temperature": f"{data['temperature_celsius']}°C",
+            "humidity": f"{data['humidity_percent']}%",
+            "weather": data["weather_condition"],
+            "timestamp": data["timestamp"].strftime("%Y-%m-%d %H:%M:%S")
+        }
+
+    def get_temperature_trend(self, city: str, window: str = "24h") -> Dict:
+        """Get the temperature trend for a city over a trailing window.
+
+        Args:
+            city: Name of the city
+            window: Trailing window, one of ``24h``, ``7d`` or ``30d``
+
+        Returns:
+            Dictionary with reading count, average, spread and extremes over the window
+        """
+        if window not in TREND_WINDOWS:
+            return {"error": f"Unsupported window {window}, expected one of {list(TREND_WINDOWS)}"}
+
+        city = self.resolve_city(city)
+        trend = self.climate_service.get_temperature_trend(city, window)
+        return self._format_trend(city, window, trend)
+
+    def _format_trend(self, city: str, window: str, trend: Optional[Dict]) -> Dict:
+        """Format rolling aggregates as a temperature trend.
+
+        Args:
+            city: Name of the city
+            window: Trailing window name
+            trend: Window aggregates, or None if there is no data
+
+        Returns:
+            Dictionary with reading count, average, spread and extremes over the window
+        """
+        if not trend:
+            return {"error": f"No temperature history found for {city} in the last {window}"}
+
+        return {
+            "city": city,
+            "window": window,
+            "readings": trend["count"],
+            "average_temperature": f"{trend['mean']:.1f}°C",
+            "temperature_std": f"{trend['std']:.1f}°C",
+            "min_temperature": f"{trend['min']:.1f}°C",
+            "max_temperature": f"{trend['max']:.1f}°C"
+        }
+
+    def _record_history(self, readings: List[Dict]) -> None:
+        """Append written readings to the in-process history, one batch per city.
+
+        Args:
+            readings: Readings with city, temperature, humidity and timestamp
+        """
+        by_city: Dict[str, List[Dict]] = {}
+        for data in readings:
+            by_city.setdefault(data["city"], []).append(data)
+        for city, rows in by_city.items():
+            self.history.extend(
+                city,
+                [data["timestamp"] for data in rows],
+                [data["temperature_celsius"] for data in rows],
+                [data["humidity_percent"] for data in rows],
+            )
+
+    def get_temperature_history(self, city: str, start: datetime,
+                                end: Optional[datetime] = None) -> Dict:
+        """Get temperature aggregates for a city over a time range from the in-process history.
+
+        Args:
+            city: Name of the city
+            start: Start of the range
+            end: End of the range, defaults to now
+
+        Returns:
+            Dictionary with reading count, average, spread and extremes over the range
+        """
+        if self.history is None:
+            return {"error": "Temperature history is not enabled"}
+
+        city = self.resolve_city(city)
+        start = to_utc(start)
+        end = to_utc(end) if end else utc_now()
+        stats = self.history.aggregate(city, start, end)
+        if not stats:
+            return {"error": f"No temperature history found for {city} "
+                             f"between {start:%Y-%m-%d %H:%M} and {end:%Y-%m-%d %H:%M}"}
+
+        return {
+            "city": city,
+            "start": start.strftime("%Y-%m-%d %H:%M:%S"),
+            "end": end.strftime("%Y-%m-%d %H:%M:%S"),
+            "readings": stats["count"],
+            "average_temperature": f"{stats['mean']:.1f}°C",
+            "temperature_std": f"{stats['std']:.1f}°C",
+            "min_temperature": f"{stats['min']:.1f}°C",
+            "max_temperature": f"{stats['max']:.1f}°C"
+        }
+
+    def _load_statistics(self) -> ClimateStatistics:
+        """Load a projected temperature snapshot into the statistics engine.
+
+        Returns:
+            ClimateStatistics over all cities with temperature data
+        """
+        if self.snapshot is not None:
+            return self.snapshot.to_statistics()
+        return ClimateStatistics.from_documents(self.climate_service.get_temperature_snapshot())
 
     def get_weather_summary(self) -> Dict:
         """Get weather summary for all cities.
 
+        The summary is read from a materialized document kept current on every
+        write, so the cost does not depend on the number of cities. Its totals
+        count stored readings, not distinct cities.
+
         Returns:
             Dictionary with weather summary statistics
         """
-        cities = self.climate_service.get_all_cities()
-        total_cities = len(cities)
-        temperatures = []
-        weather_conditions = {}
-        
-        for city in cities:
-            data = self.climate_service.get_city_climate(city)
-            if data:
-                temperatures.append(data["temperature_celsius"])
-                weather = data["weather_condition"]
-                weather_conditions[weather] = weather_conditions.get(weather, 0) + 1
-        
-        if temperatures:
-            avg_temp = sum(temperatures) / len(temperatures)
-            hottest_city = max(cities, key=lambda c: self.climate_service.get_city_climate(c)["temperature_celsius"] if self.climate_service.get_city_climate(c) else 0)
-            coldest_city = min(cities, key=lambda c: self.climate_service.get_city_climate(c)["temperature_celsius"] if self.climate_service.get_city_climate(c) else 0)
-            
+        return self._format_summary(self.climate_service.get_weather_summary())
+
+    def _format_summary(self, summary: Dict) -> Dict:
+        """Format the materialized summary document.
+
+        Args:
+            summary: Summary document
+
+        Returns:
+            Dictionary with weather summary statistics
+        """
+        if summary.get("count"):
             return {
-                "total_cities": total_cities,
-                "average_temperature": f"{avg_temp:.1f}°C",
-                "hottest_city": hottest_city,
-                "coldest_city": coldest_city,
-                "weather_distribution": weather_conditions
+                "total_readings": summary["count"],
+                "average_temperature": f"{summary['sum'] / summary['count']:.1f}°C",
+                "hottest_city": summary["hottest"][0]["city"],
+                "coldest_city": summary["coldest"][0]["city"],
+                "weather_distribution": {
+                    condition: count
+                    for condition, count in summary.get("conditions", {}).items() if count > 0
+                }
             }
         else:
             return {"error": "No temperature data available"}
 
+    def get_weather_statistics(self, top_k: int = 3, bins: int = 10) -> Dict:
+        """Get detailed temperature statistics for all cities.
+
+        Args:
+            top_k: Number of hottest and coldest cities to include
+            bins: Number of temperature histogram bins
+
+        Returns:
+            Dictionary with distribution statistics, top-k cities and per-condition groups
+        """
+        return self._format_statistics(self._load_statistics().summary(top_k=top_k, bins=bins))
+
+    def _format_statistics(self, summary: Dict) -> Dict:
+        """Format a statistics engine summary.
+
+        Args:
+            summary: Output of ClimateStatistics.summary
+
+        Returns:
+            Dictionary with distribution statistics, top-k cities and per-condition groups
+        """
+        if not summary:
+            return {"error": "No temperature data available"}
+
+        return {
+            "total_cities": summary["count"],
+            "average_temperature": f"{summary['mean']:.1f}°C",
+            "temperature_std": f"{summary['std']:.1f}°C",
+            "temperature_range": f"{summary['min']:.1f}°C to {summary['max']:.1f}°C",
+            "percentiles": {
+                name: f"{value:.1f}°C" for name, value in summary["percentiles"].items()
+            },
+            "histogram": summary["histogram"],
+            "hottest_cities": summary["hottest"],
+            "coldest_cities": summary["coldest"],
+            "by_condition": summary["by_condition"]
+        }
+
+    def _get_async_service(self) -> AsyncClimateDataService:
+        """Get the async data service, creating it on first use.
+
+        Returns:
+            AsyncClimateDataService instance
+        """
+        if self.async_climate_service is None:
+            self.async_climate_service = AsyncClimateDataService()
+        return self.async_climate_service
+
+    async def _aget_city_data(self, city: str):
+        """Get the latest reading for a city without blocking the event loop.
+
+        Args:
+            city: Name of the city
+
+        Returns:
+            City document or snapshot record, or None if not found
+        """
+        if self.snapshot is not None:
+            return self.snapshot.get(city)
+        self.climate_service.refresh_lookup_cache()
+        lookup_cache = self.climate_service.lookup_cache
+        if not lookup_cache.might_exist(city):
+            return None
+        data = await self._get_async_service().get_city_climate(city)
+        if data is None:
+            lookup_cache.record_miss(city)
+        return data
+
+    async def aget_current_temperature(self, city: str) -> Dict:
+        """Async counterpart of get_current_temperature."""
+        city = self.city_resolver.canonical(city) or city
+        return self._format_current_temperature(city, await self._aget_city_data(city))
+
+    async def aget_temperature_comparison(self, city1: str, city2: str) -> Dict:
+        """Async counterpart of get_temperature_comparison; both cities are fetched concurrently."""
+        city1 = self.city_resolver.canonical(city1) or city1
+        city2 = self.city_resolver.canonical(city2) or city2
+        data1, data2 = await asyncio.gather(
+            self._aget_city_data(city1), self._aget_city_data(city2)
+        )
+        return self._format_comparison(city1, city2, data1, data2)
+
+    async def acompare_cities(self, cities: List[str]) -> Dict:
+        """Async counterpart of compare_cities."""
+        if self.snapshot is not None:
+            return self.compare_cities(cities)
+        requested = list(dict.fromkeys(
+            self.city_resolver.canonical(city) or city for city in cities
+        ))
+        documents = await self._get_async_service().get_cities_climate(
+            requested, SNAPSHOT_PROJECTION
+        )
+        return self._format_city_comparison(requested, documents)
+
+    async def aget_all_cities_temperatures(self) -> List[Dict]:
+        """Async counterpart of get_all_cities_temperatures."""
+        if self.snapshot is not None:
+            return self.get_all_cities_temperatures()
+        return [row async for row in self.aiter_cities_temperatures()]
+
+    async def aiter_cities_temperatures(self, city_filter: Optional[Dict] = None,
+                                        limit: Optional[int] = None,
+                                        batch_size: int = 1000) -> AsyncIterator[Dict]:
+        """Async counterpart of iter_cities_temperatures."""
+        last_city = None
+        batch = []
+        remaining = limit
+        documents = self._get_async_service().iter_city_climate(
+            self._stream_query(city_filter), SNAPSHOT_PROJECTION, None, batch_size
+        )
+        try:
+            async for data in documents:
+                if remaining is not None and remaining <= 0:
+                    break
+                if data["city"] != last_city:
+                    last_city = data["city"]
+                    batch.append(data)
+                    if remaining is not None:
+                        remaining -= 1
+                    if len(batch) == DERIVED_BATCH_SIZE:
+                        for row in self._format_city_batch(batch):
+                            yield row
+                        batch = []
+        finally:
+            await documents.aclose()
+        for row in self._format_city_batch(batch):
+            yield row
+
+    async def anearest_cities(self, latitude: float, longitude: float, k: int = 5) -> List[Dict]:
+        """Async counterpart of nearest_cities."""
+        cities = await self._get_async_service().nearest_cities(latitude, longitude, limit=k)
+        return self._format_nearest_cities(cities)
+
+    async def aget_nearest_city_temperature(self, latitude: float, longitude: float,
+                                            max_distance_km: Optional[float] = None) -> Dict:
+        """Async counterpart of get_nearest_city_temperature."""
+        cities = await self._get_async_service().nearest_cities(
+            latitude, longitude, limit=1, max_distance_km=max_distance_km,
+            query={"temperature_celsius": {"$type": "number"}}
+        )
+        return self._format_nearest_city_temperature(latitude, longitude, cities)
+
+    async def aget_temperature_trend(self, city: str, window: str = "24h") -> Dict:
+        """Async counterpart of get_temperature_trend."""
+        if window not in TREND_WINDOWS:
+            return {"error": f"Unsupported window {window}, expected one of {list(TREND_WINDOWS)}"}
+        city = self.city_resolver.canonical(city) or city
+        trend = await self._get_async_service().get_temperature_trend(city, window)
+        return self._format_trend(city, window, trend)
+
+    async def aget_weather_summary(self) -> Dict:
+        """Async counterpart of get_weather_summary.
+
+        A missing or outdated summary is rebuilt through the synchronous
+        service on a worker thread, as ``get_weather_summary`` would.
+        """
+        summary = await self._get_async_service().get_weather_summary()
+        if self.climate_service.summary.is_stale(summary):
+            summary = await asyncio.to_thread(self.climate_service.get_weather_summary)
+        return self._format_summary(summary)
+
+    async def aget_weather_statistics(self, top_k: int = 3, bins: int = 10) -> Dict:
+        """Async counterpart of get_weather_statistics."""
+        if self.snapshot is not None:
+            return self.get_weather_statistics(top_k, bins)
+        documents = [doc async for doc in self._get_async_service().get_temperature_snapshot()]
+        stats = ClimateStatistics.from_documents(documents)
+        return self._format_statistics(stats.summary(top_k=top_k, bins=bins))
+
+    async def aclose(self) -> None:
+        """Close the async data service, if it was used, and the synchronous resources."""
+        if self.async_climate_service is not None:
+            await self.async_climate_service.close()
+            self.async_climate_service = None
+        self.close()
+
     def close(self) -> None:
         """Close the temperature tools and database connection."""
+        if self.snapshot_refresher is not None:
+            self.snapshot_refresher.stop()
         self.climate_service.close()
         self.logger.info("Temperature tools closed") 
\ No newline at end of file
@@ -0,0 +1,261 @@
+"""Non-interactive replay of recorded queries through the chat handler path."""
+
+import asyncio
+import json
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from common.common.chat_server import ChatServer
+from common.common.logging_config import get_logger
+
+QUERY_FIELDS = ("query", "message", "text")
+
+
+def _parse_timestamp(value) -> Optional[float]:
+    """Convert an epoch number or ISO timestamp to epoch seconds."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+
+
+def load_queries(path: str) -> List[Dict]:
+    """Read a file of recorded queries.
+
+    Plain text files hold one query per line; blank lines and lines starting
+    with ``#`` are skipped. ``.ndjson``/``.jsonl`` files hold one object per
+    line with the text under ``query``, ``message`` or ``text`` and optional
+    ``session``, ``agent`` and ``timestamp`` (epoch seconds or ISO format)
+    fields.
+
+    Args:
+        path: Path of the query file
+
+    Returns:
+        Queries as dictionaries with ``index``, ``query``, ``session``,
+        ``agent`` and ``timestamp`` keys
+
+    Raises:
+        ValueError: If an NDJSON line holds no query text
+    """
+    is_json = path.endswith((".ndjson", ".jsonl"))
+    queries = []
+    with open(path, encoding="utf-8") as handle:
+        for line_number, line in enumerate(handle, 1):
+            line = line.strip()
+            if not line or (not is_json and line.startswith("#")):
+                continue
+            record = json.loads(line) if is_json else {"query": line}
+            text = next((record[field] for field in QUERY_FIELDS if record.get(field)), None)
+            if text is None:
+                raise ValueError(f"No query text on line {line_number} of {path}")
+            queries.append({
+                "index": len(queries),
+                "query": str(text),
+                "session": record.get("session"),
+                "agent": record.get("agent"),
+                "timestamp": _parse_timestamp(record.get("timestamp")),
+            })
+    return queries
+
+
+def summarize_results(results: List[Dict], elapsed: float) -> Dict:
+    """Aggregate per-turn results into latency percentiles and throughput.
+
+    Args:
+        results: Per-turn results produced by ``ReplayRunner``
+        elapsed: Wall-clock seconds of the whole replay
+
+    Returns:
+        Dictionary with turn and error counts, throughput and latency statistics
+    """
+    latencies = np.array([result["latency"] for result in results], dtype=np.float64)
+    first_tokens = np.array([result["time_to_first_token"] for result in results
+                             if result["time_to_first_token"] is not None], dtype=np.float64)
+    summary = {
+        "turns": len(results),
+        "errors": sum(1 for result in results if result["error"]),
+        "elapsed": round(elapsed, 3),
+        "throughput": round(len(results) / elapsed, 3) if elapsed > 0 else None,
+    }
+    if latencies.size:
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        summary.update({
+            "latency_mean": round(float(latencies.mean()), 4),
+            "latency_p50": round(float(p50), 4),
+            "latency_p95": round(float(p95), 4),
+            "latency_p99": round(float(p99), 4),
+            "latency_max": round(float(latencies.max()), 4),
+        })
+    if first_tokens.size:
+        summary["time_to_first_token_p50"] = round(float(np.percentile(first_tokens, 50)), 4)
+    return summary
+
+
+class ReplayRunner:
+    """Drives recorded queries through ``ChatServer.handle_message``.
+
+    Queries sharing a ``session`` value form one conversation and are sent
+    in file order; queries without one are independent conversations. Up to
+    ``concurrency`` turns are answered at once. With a positive ``speed`` and
+    timestamps in the file, every query waits for its recorded offset from
+    the first one divided by ``speed`` before it takes a slot, so a waiting
+    conversation does not hold back the others; otherwise queries are sent
+    as fast as the handlers answer.
+    """
+
+    def __init__(self, server: ChatServer, concurrency: int = 1, speed: float = 0.0):
+        """Initialize the runner.
+
+        Args:
+            server: Chat server whose handlers answer the queries; it does not
+                need to be listening
+            concurrency: Maximum number of turns answered at once
+            speed: Multiple of the recorded pace, 0 to ignore timestamps
+        """
+        self.server = server
+        self.concurrency = max(concurrency, 1)
+        self.speed = speed
+        self.logger = get_logger("chat_replay")
+
+    def run(self, queries: List[Dict], output: Optional[str] = None) -> Dict:
+        """Replay queries and return the summary.
+
+        Args:
+            queries: Queries as returned by ``load_queries``
+            output: Optional NDJSON path receiving one result per turn followed
+                by a summary line
+
+        Returns:
+            Summary as returned by ``summarize_results``
+        """
+        return asyncio.run(self.arun(queries, output))
+
+    async def arun(self, queries: List[Dict], output: Optional[str] = None) -> Dict:
+        """Replay queries from a coroutine and return the summary.
+
+        Args:
+            queries: Queries as returned by ``load_queries``
+            output: Optional NDJSON path receiving one result per turn followed
+                by a summary line
+
+        Returns:
+            Summary as returned by ``summarize_results``
+        """
+        conversations: Dict[str, List[Dict]] = {}
+        for query in queries:
+            key = query["session"] if query["session"] is not None else f"#{query['index']}"
+            conversations.setdefault(str(key), []).append(query)
+
+        recorded = [query["timestamp"] for query in queries if query["timestamp"] is not None]
+        origin = min(recorded) if recorded else None
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results: List[Dict] = []
+        started = time.perf_counter()
+
+        async def replay_conversation(turns: List[Dict]) -> None:
+            results.extend(await self._replay_conversation(turns, origin, started, semaphore))
+
+        await asyncio.gather(*(replay_conversation(turns) for turns in conversations.values()))
+        elapsed = time.perf_counter() - started
+
+        results.sort(key=lambda result: result["index"])
+        summary = summarize_results(results, elapsed)
+        if output:
+            with open(output, "w", encoding="utf-8") as handle:
+                for result in results:
+                    handle.write(json.dumps(result, ensure_ascii=False) + "\n")
+                handle.write(json.dumps({"summary": summary}) + "\n")
+        self.logger.info("Replayed %s turns with %s errors in %ss",
+                         summary["turns"], summary["errors"], summary["elapsed"])
+        return summary
+
+    async def _replay_conversation(self, turns: List[Dict], origin: Optional[float],
+                                   started: float, semaphore: asyncio.Semaphore) -> List[Dict]:
+        """Send the turns of one conversation in order through a fresh session.
+
+        The recorded pace is awaited before a turn takes its slot of
+        ``semaphore``, which is released again once the turn is answered.
+        """
+        agent = turns[0]["agent"]
+        handler_name = agent if agent in self.server.handlers else self.server.default_handler
+        session = None
+        results = []
+        try:
+            for turn in turns:
+                if self.speed > 0 and origin is not None and turn["timestamp"] is not None:
+                    due = started + (turn["timestamp"] - origin) / self.speed
+                    await asyncio.sleep(max(due - time.perf_counter(), 0.0))
+
+                async with semaphore:
+                    if session is None:
+                        session = self.server.registry.create(handler_name)
+                        if session is None:
+                            return [self._result(skipped, None, "", 0.0, None,
+                                                 "Session registry is full")
+                                    for skipped in turns]
+                    if turn["agent"] in self.server.handlers:
+                        session.handler_name = turn["agent"]
+
+                    first_chunk_at = None
+
+                    def on_chunk(chunk: str) -> None:
+                        nonlocal first_chunk_at
+                        if first_chunk_at is None:
+                            first_chunk_at = time.perf_counter()
+
+                    sent = time.perf_counter()
+                    response = await self.server.handle_message(session, turn["query"], on_chunk)
+                    finished = time.perf_counter()
+                ttft = first_chunk_at - sent if first_chunk_at is not None else None
+                error = session.last_error
+                results.append(self._result(turn, session.session_id, response,
+                                            finished - sent, ttft, error))
+        finally:
+            if session is not None:
+                self.server.registry.close(session.session_id)
+        return results
+
+    @staticmethod
+    def _result(turn: Dict, session_id: Optional[str], response: str, latency: float,
+                ttft: Optional[float], error: Optional[str]) -> Dict:
+        """Build the result record of one turn."""
+        return {
+            "index": turn["index"],
+            "session": turn["session"],
+            "session_id": session_id,
+            "query": turn["query"],
+            "response": response,
+            "latency": round(latency, 6),
+            "time_to_first_token": round(ttft, 6) if ttft is not None else None,
+            "error": error,
+        }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from common.common.chatbot import ChatbotInterface
+
+    parser = argparse.ArgumentParser(
+        description="Replay recorded queries against the built-in chatbot responder"
+    )
+    parser.add_argument("queries", help="Text or NDJSON file of queries")
+    parser.add_argument("--output", help="NDJSON file receiving per-turn results")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="Turns answered at once")
+    parser.add_argument("--speed", type=float, default=0.0,
+                        help="Multiple of the recorded pace, 0 to ignore timestamps")
+    args = parser.parse_args()
+
+    chatbot = ChatbotInterface(response_delay=0.0, keep_history=False)
+    replay_server = ChatServer(
+        {"chatbot": lambda session, message: chatbot._generate_response(message)},
+        chatbot=chatbot,
+    )
+    print(json.dumps(ReplayRunner(replay_server, args.concurrency, args.speed)
+                     .run(load_queries(args.queries), args.output), indent=2))
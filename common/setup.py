@@ -10,9 +10,12 @@ setup(
     python_requires=">=3.8",
     install_requires=[
         "datetime",
-        "pymongo",
+        "pymongo>=4.9",
+        "numpy",
+        "pydantic>=2",
     ],
     extras_require={
+        "zstd": ["zstandard"],
         "dev": [
             "pytest",
             "pytest-cov",
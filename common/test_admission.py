@@ -0,0 +1,92 @@
+"""Test script for admission control and back-pressure."""
+
+import asyncio
+
+from common.admission import AdmissionController, AdmissionRejected
+from common.chat_server import BUSY_MESSAGE, ChatServer
+
+
+async def hold(controller, session_id, seconds, log):
+    """Hold a slot for a while, recording admission or the rejection reason."""
+    try:
+        async with controller.admit(session_id):
+            log.append(session_id)
+            await asyncio.sleep(seconds)
+    except AdmissionRejected as e:
+        log.append(e.reason)
+
+
+def test_admission_limits():
+    """Test the in-flight limit, FIFO queueing and fast rejection when full."""
+    async def run():
+        controller = AdmissionController(max_in_flight=2, max_queue=2, queue_timeout=1.0)
+        log = []
+        await asyncio.gather(*(hold(controller, f"s{i}", 0.05, log) for i in range(5)))
+        return controller, log
+
+    controller, log = asyncio.run(run())
+    assert log[:3] == ["s0", "s1", "queue_full"]
+    assert log[3:] == ["s2", "s3"]
+    assert controller.stats() == {"in_flight": 0, "queued": 0, "admitted": 4,
+                                  "rejected": 1, "timed_out": 0}
+
+
+def test_admission_session_limit_and_deadline():
+    """Test per-session rejection and queue deadlines."""
+    async def run():
+        controller = AdmissionController(max_in_flight=1, queue_timeout=0.05)
+        log = []
+        await asyncio.gather(hold(controller, "a", 0.2, log), hold(controller, "a", 0.0, log),
+                             hold(controller, "b", 0.0, log))
+        return controller, log
+
+    controller, log = asyncio.run(run())
+    assert log == ["a", "session_busy", "timeout"]
+    assert controller.timed_out == 1 and controller.in_flight == 0
+
+
+def test_admission_cancelled_waiter():
+    """Test that a cancelled waiter does not leak its slot."""
+    async def run():
+        controller = AdmissionController(max_in_flight=1)
+        log = []
+        holder = asyncio.ensure_future(hold(controller, "a", 0.05, log))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(hold(controller, "b", 0.0, log))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await holder
+        await hold(controller, "c", 0.0, log)
+        return controller, log
+
+    controller, log = asyncio.run(run())
+    assert log == ["a", "c"]
+    assert controller.in_flight == 0 and controller.queued == 0
+
+
+def test_chat_server_rejects_when_busy():
+    """Test that the server answers with a busy message under overload."""
+    async def slow(session, message):
+        await asyncio.sleep(0.1)
+        return "done"
+
+    async def run():
+        server = ChatServer({"slow": slow}, max_workers=1)
+        server.admission.max_queue = 0
+        sessions = [server.registry.create("slow") for _ in range(3)]
+        replies = await asyncio.gather(*(server.handle_message(session, "hi")
+                                         for session in sessions))
+        await server.close()
+        return replies, sessions
+
+    replies, sessions = asyncio.run(run())
+    assert replies == ["done", BUSY_MESSAGE, BUSY_MESSAGE]
+    assert sessions[1].last_error == "queue_full" and sessions[1].turn_count == 0
+
+
+if __name__ == "__main__":
+    test_admission_limits()
+    test_admission_session_limit_and_deadline()
+    test_admission_cancelled_waiter()
+    test_chat_server_rejects_when_busy()
+    print("✅ Admission control tests completed successfully!")
@@ -0,0 +1,108 @@
+"""Test script for the asyncio multi-session chat server."""
+
+import asyncio
+import time
+
+from common.chat_server import ChatServer, SessionRegistry, agent_handler
+from common.conversation import history_context
+
+
+async def echo(session, message):
+    """Answer after a short non-blocking wait."""
+    await asyncio.sleep(0.05)
+    session.state["count"] = session.state.get("count", 0) + 1
+    return f"echo {message} #{session.state['count']}"
+
+
+def shout(session, message):
+    """Answer after a short blocking wait."""
+    time.sleep(0.05)
+    return message.upper()
+
+
+def stream(session, message):
+    """Stream the words of the message one at a time."""
+    for word in message.split():
+        time.sleep(0.01)
+        yield f"{word} "
+
+
+class RecallAgent:
+    """Agent answering with the conversation it was given."""
+
+    def respond(self, user_input, history=None):
+        """Answer with the rendered history and the new message on one line."""
+        return f"{history_context(history)}User: {user_input}".replace("\n", " | ")
+
+
+async def converse(port, lines):
+    """Send lines over one connection and collect the replies."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    replies = [(await reader.readline()).decode().strip()]
+    for line in lines:
+        writer.write(f"{line}\n".encode())
+        await writer.drain()
+        replies.append((await reader.readline()).decode().strip())
+    writer.close()
+    return replies
+
+
+def test_chat_server_concurrent_sessions():
+    """Test that many sessions are answered concurrently with their own state."""
+    async def run():
+        server = ChatServer({"echo": echo, "shout": shout, "stream": stream},
+                            port=0, max_workers=50)
+        await server.start()
+        started = time.perf_counter()
+        results = await asyncio.gather(*(
+            converse(server.port, ["hi", "again", "/agent shout", "loud",
+                                   "/agent stream", "one two three", "/quit"])
+            for _ in range(100)
+        ))
+        elapsed = time.perf_counter() - started
+        await server.close()
+        return results, elapsed
+
+    results, elapsed = asyncio.run(run())
+    for replies in results:
+        assert replies[0].startswith("Session ")
+        assert replies[1:] == ["echo hi #1", "echo again #2", "Switched to the shout agent.",
+                               "LOUD", "Switched to the stream agent.", "one two three",
+                               "Goodbye!"]
+    assert elapsed < 3.0
+
+
+def test_agent_handler_passes_history():
+    """Test that the second turn of a session sees the first one."""
+    async def run():
+        server = ChatServer({"recall": agent_handler(RecallAgent())}, port=0)
+        await server.start()
+        replies = await converse(server.port, ["Paris", "and tomorrow?", "/quit"])
+        await server.close()
+        return replies
+
+    replies = asyncio.run(run())
+    assert replies[1] == "User: Paris"
+    assert replies[2] == ("Conversation so far: | User: Paris | Assistant: User: Paris |  | "
+                          "User: and tomorrow?")
+
+
+def test_session_registry_limits():
+    """Test that a full registry only admits new sessions after idle ones expire."""
+    registry = SessionRegistry(max_sessions=2, idle_timeout=0.0)
+    first = registry.create("echo")
+    second = registry.create("echo")
+    first.attached = second.attached = True
+    assert registry.create("echo") is None
+
+    second.attached = False
+    assert registry.create("echo") is not None
+    assert registry.get(second.session_id) is None
+    assert registry.get(first.session_id) is first
+
+
+if __name__ == "__main__":
+    test_chat_server_concurrent_sessions()
+    test_agent_handler_passes_history()
+    test_session_registry_limits()
+    print("✅ Chat server tests completed successfully!")
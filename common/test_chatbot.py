@@ -1,5 +1,10 @@
 """Test script for the chatbot interface."""
 
+import asyncio
+import io
+import threading
+import time
+
 from common.chatbot import ChatbotInterface
 
 
@@ -14,6 +19,93 @@ def test_chatbot_basic():
     chatbot.receive_response("The time is now")
 
 
+
+def test_chatbot_pacing_opt_out():
+    """Test that messages are paced by default and not delayed once pacing is off."""
+    assert ChatbotInterface().response_delay == 1.0
+    chatbot = ChatbotInterface(response_delay=0.0)
+    started = time.perf_counter()
+    for _ in range(20):
+        chatbot.send_message("Hello")
+    assert time.perf_counter() - started < 0.1
+
+
+def test_chatbot_stop_interrupts_pacing():
+    """Test that stopping the interface cuts a synchronous delay short."""
+    chatbot = ChatbotInterface(response_delay=5.0)
+    threading.Timer(0.05, chatbot.stop).start()
+    started = time.perf_counter()
+    chatbot.send_message("Hello")
+    assert time.perf_counter() - started < 1.0
+
+
+def test_chatbot_async_pacing():
+    """Test that async pacing interleaves sessions and can be cancelled."""
+    async def run():
+        chatbots = [ChatbotInterface(response_delay=0.1) for _ in range(10)]
+        started = time.perf_counter()
+        await asyncio.gather(*(chatbot.asend_message("Hello") for chatbot in chatbots))
+        assert time.perf_counter() - started < 0.5
+
+        task = asyncio.ensure_future(ChatbotInterface(response_delay=5.0).asend_message("Hi"))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        assert task.cancelled()
+
+    asyncio.run(run())
+
+
+
+def slow_tokens(tokens, delay):
+    """Yield tokens with a blocking delay before each one."""
+    for token in tokens:
+        time.sleep(delay)
+        yield token
+
+
+def test_chatbot_stream_response():
+    """Test incremental terminal rendering and the recorded stream metrics."""
+    chatbot = ChatbotInterface()
+    output = io.StringIO()
+    tokens = slow_tokens(["Sunny ", "and ", "", "warm"], 0.02)
+    response = chatbot.stream_response(tokens, output=output)
+
+    assert response == "Sunny and warm"
+    assert output.getvalue().endswith("Bot: Sunny and warm\n")
+    metrics = chatbot.last_response_metrics
+    assert metrics["chunks"] == 3 and metrics["characters"] == len(response)
+    assert 0.015 < metrics["time_to_first_token"] < metrics["duration"]
+
+
+def test_chatbot_astream_response():
+    """Test async delivery of sync and async chunk iterators."""
+    async def tokens():
+        for token in ["Rain ", "later"]:
+            await asyncio.sleep(0.01)
+            yield token
+
+    async def run():
+        chatbot = ChatbotInterface()
+        received = []
+        first = await chatbot.astream_response(tokens(), received.append)
+        second = await chatbot.astream_response(slow_tokens(["a", "b"], 0.01), received.append)
+        return first, second, received, chatbot
+
+    first, second, received, chatbot = asyncio.run(run())
+    assert (first, second) == ("Rain later", "ab")
+    assert received == ["Rain ", "later", "a", "b"]
+    assert len(chatbot.response_metrics) == 2
+
+
 if __name__ == "__main__":
     test_chatbot_basic()
+    test_chatbot_pacing_opt_out()
+    test_chatbot_stop_interrupts_pacing()
+    test_chatbot_async_pacing()
+    test_chatbot_stream_response()
+    test_chatbot_astream_response()
     print("Basic test completed successfully!") 
\ No newline at end of file
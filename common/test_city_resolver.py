@@ -0,0 +1,70 @@
+"""Test script for the fuzzy city-name resolver."""
+
+from common.mongodb.city_resolver import CityResolver, normalize_city_name
+
+CITIES = ["San Francisco", "New York", "London", "Tokyo", "Paris",
+          "Rio de Janeiro", "São Paulo", "Mexico City", "Berlin"]
+
+
+def test_resolve_variants():
+    """Test exact, accent-free, partial and misspelled names."""
+    resolver = CityResolver(CITIES)
+
+    assert normalize_city_name("São-Paulo!") == "sao paulo"
+    assert resolver.resolve("new york") == ("New York", 1.0)
+    assert resolver.canonical("Sao Paulo") == "São Paulo"
+    assert resolver.canonical("Rio") == "Rio de Janeiro"
+    assert resolver.canonical("tokio") == "Tokyo"
+    assert resolver.canonical("Londn") == "London"
+    assert resolver.resolve("Springfield") is None
+
+
+def test_find_in_text():
+    """Test city extraction from free text."""
+    resolver = CityResolver(CITIES)
+
+    assert resolver.find_in_text("What's the climate of sao paulo?") == ["São Paulo"]
+    assert set(resolver.find_in_text("compare London, Berlin and mexico city")) == {
+        "London", "Berlin", "Mexico City"
+    }
+    assert resolver.find_in_text("what is the temperature in tokio or Rio") == [
+        "Rio de Janeiro", "Tokyo"
+    ]
+    assert resolver.find_in_text("tell me about the weather") == []
+
+
+def test_find_in_text_partial_names():
+    """Test that a shared first word does not resolve to another city."""
+    resolver = CityResolver(CITIES)
+
+    assert resolver.find_in_text("climate in San Diego") == []
+    assert resolver.find_in_text("climate in New Delhi") == []
+    assert resolver.find_in_text("What is new with the weather?") == []
+    assert resolver.find_in_text("weather in Rio, then Paris") == ["Paris", "Rio de Janeiro"]
+    resolver.add("New Delhi")
+    assert resolver.find_in_text("climate in New Delhi") == ["New Delhi"]
+
+
+def test_refresh_add_remove():
+    """Test that index changes are visible to lookups."""
+    resolver = CityResolver(["Paris"])
+
+    assert resolver.canonical("Oslo") is None
+    assert resolver.add("Oslo")
+    assert not resolver.add("oslo")
+    assert resolver.canonical("oslo") == "Oslo"
+    assert resolver.remove("Oslo")
+    assert resolver.canonical("Oslo") is None
+
+    resolver.refresh(["Madrid"])
+    assert len(resolver) == 1
+    assert resolver.canonical("Paris") is None
+    assert resolver.canonical("madrd") == "Madrid"
+
+
+if __name__ == "__main__":
+    test_resolve_variants()
+    test_find_in_text()
+    test_find_in_text_partial_names()
+    test_refresh_add_remove()
+    print("City resolver tests completed successfully!")
@@ -0,0 +1,66 @@
+"""Test script for the bounded conversation history."""
+
+from common.chatbot import ChatbotInterface
+from common.conversation import ConversationHistory, bounded_messages, estimate_tokens
+
+
+def test_history_turn_and_token_budget():
+    """Test that the history keeps only the newest messages within both budgets."""
+    history = ConversationHistory(max_turns=4, max_tokens=100, max_message_tokens=50)
+    for i in range(10):
+        history.add("user", f"question {i}")
+        history.add("assistant", f"answer {i}")
+
+    assert len(history) == 4
+    assert [turn.text for turn in history.turns][0] == "question 8"
+    assert history.evicted == 16
+
+    history.add("user", "x" * 1000)
+    assert history.turns[-1].tokens <= 50
+    assert history.tokens <= 100
+    assert history.summary is None
+
+
+def test_history_rolling_summary():
+    """Test that evicted turns are folded into a bounded summary."""
+    def summarize(summary, turns):
+        return (summary or "") + "".join(turn.text[0] for turn in turns)
+
+    history = ConversationHistory(max_turns=2, summarizer=summarize, max_summary_tokens=1)
+    for text in ["alpha", "beta", "gamma", "delta", "epsilon"]:
+        history.add("user", text)
+
+    messages = history.messages()
+    assert messages[0]["role"] == "system" and messages[0]["content"].endswith("abg")
+    assert [message["content"] for message in messages[1:]] == ["delta", "epsilon"]
+    assert estimate_tokens(history.summary) <= 1
+
+    history.add("user", "zeta")
+    history.add("user", "eta")
+    assert history.summary == "abg…" and len(history) == 2
+
+
+def test_bounded_messages_reducer():
+    """Test that the state reducer appends and keeps only the latest messages."""
+    reduce = bounded_messages(3)
+    state = []
+    for i in range(5):
+        state = reduce(state, [i])
+    assert state == [2, 3, 4]
+
+
+def test_chatbot_records_history():
+    """Test that the chatbot keeps user messages and responses."""
+    chatbot = ChatbotInterface()
+    chatbot.record_user_message("Hello")
+    chatbot.receive_response("Hi there!")
+    assert [turn.role for turn in chatbot.history.turns] == ["user", "assistant"]
+    assert ChatbotInterface(keep_history=False).history is None
+
+
+if __name__ == "__main__":
+    test_history_turn_and_token_budget()
+    test_history_rolling_summary()
+    test_bounded_messages_reducer()
+    test_chatbot_records_history()
+    print("✅ Conversation history tests completed successfully!")
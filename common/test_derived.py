@@ -0,0 +1,59 @@
+"""Test script for the vectorized derived weather metrics."""
+
+import numpy as np
+
+from common.mongodb.derived import (
+    apparent_temperature,
+    celsius_to_fahrenheit,
+    celsius_to_kelvin,
+    climate_types,
+    dew_point,
+    format_derived_metrics,
+    heat_index,
+)
+
+
+def test_conversions_and_climate_types():
+    """Test unit conversions and the climate type buckets."""
+    celsius = np.array([-40.0, 0.0, 15.0, 100.0])
+
+    assert celsius_to_fahrenheit(celsius).tolist() == [-40.0, 32.0, 59.0, 212.0]
+    assert np.allclose(celsius_to_kelvin(celsius), [233.15, 273.15, 288.15, 373.15])
+    assert climate_types([-0.5, 0.0, 14.9, 15.0, 25.0]).tolist() == [
+        "Cold", "Cool", "Cool", "Mild", "Warm"
+    ]
+
+
+def test_humidity_metrics():
+    """Test dew point, heat index and apparent temperature against reference values."""
+    assert abs(dew_point([20.0], [50.0])[0] - 9.3) < 0.1
+    assert abs(dew_point([25.0], [100.0])[0] - 25.0) < 1e-9
+
+    # NWS table: 90°F at 70% humidity feels like 106°F
+    assert abs(celsius_to_fahrenheit(heat_index([32.2222], [70.0]))[0] - 105.9) < 0.5
+    # Below the regression threshold the heat index stays close to the air temperature
+    assert abs(heat_index([20.0], [50.0])[0] - 20.0) < 1.0
+
+    assert abs(apparent_temperature([25.0], [50.0])[0] - 26.2) < 0.1
+
+
+def test_format_derived_metrics():
+    """Test formatted metrics for readings with and without humidity."""
+    rows = format_derived_metrics([
+        {"temperature_celsius": 20.0, "humidity_percent": 50.0},
+        {"temperature_celsius": 10.0, "humidity_percent": None},
+    ])
+
+    assert rows[0]["temperature_fahrenheit"] == "68.0°F"
+    assert rows[0]["temperature_kelvin"] == "293.2K"
+    assert rows[0]["dew_point"] == "9.3°C"
+    assert rows[1]["dew_point"] is None
+    assert rows[1]["feels_like"] is None
+    assert format_derived_metrics([]) == []
+
+
+if __name__ == "__main__":
+    test_conversions_and_climate_types()
+    test_humidity_metrics()
+    test_format_derived_metrics()
+    print("Derived metrics tests completed successfully!")
@@ -0,0 +1,82 @@
+"""Test script for the compressed in-process temperature history."""
+
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from common.mongodb.history import TemperatureHistory
+from common.mongodb.synthetic import SyntheticClimateGenerator
+
+START = datetime(2023, 1, 1)
+
+
+def test_history_round_trip():
+    """Test that quantized readings round-trip within the quantization step."""
+    history = TemperatureHistory(chunk_size=100)
+    rng = np.random.default_rng(0)
+    timestamps = np.datetime64(START, "s") + np.arange(1000) * np.timedelta64(60, "s")
+    temperatures = rng.normal(15.0, 8.0, 1000)
+    humidities = rng.uniform(20.0, 90.0, 1000)
+
+    assert history.extend("Paris", timestamps, temperatures, humidities) == 1000
+    readings = history.range("Paris")
+
+    assert history.count("Paris") == 1000
+    assert np.array_equal(readings["timestamp"], timestamps)
+    assert np.abs(readings["temperature_celsius"] - temperatures).max() <= 0.005 + 1e-6
+    assert np.abs(readings["humidity_percent"] - humidities).max() <= 0.05 + 1e-6
+
+
+def test_history_aggregate_matches_brute_force():
+    """Test range aggregates against the decoded readings."""
+    history = TemperatureHistory(chunk_size=512)
+    SyntheticClimateGenerator(5, seed=2).fill_history(history, START, 60, interval_hours=0.25)
+
+    start, end = START + timedelta(days=7, hours=3), START + timedelta(days=40)
+    stats = history.aggregate("Tokyo", start, end)
+    values = history.range("Tokyo", start, end)["temperature_celsius"]
+
+    assert stats["count"] == values.size
+    assert abs(stats["mean"] - values.mean()) < 1e-6
+    assert abs(stats["std"] - values.std()) < 1e-6
+    assert stats["min"] == values.min() and stats["max"] == values.max()
+    assert history.aggregate("Gotham") is None
+
+
+def test_history_irregular_and_out_of_order():
+    """Test irregular spacing and that readings older than the latest are dropped."""
+    history = TemperatureHistory(chunk_size=4)
+    times = [START + timedelta(seconds=s) for s in (0, 5, 65, 70000, 70001, 200000)]
+    history.extend("Oslo", times, [1.0, 2.0, 3.0, 4.0, 5.0, 6.0])
+
+    assert not history.append("Oslo", START + timedelta(seconds=10), 9.0)
+    assert history.append("Oslo", START + timedelta(seconds=300000), 7.0)
+    readings = history.range("Oslo", START + timedelta(seconds=5), START + timedelta(seconds=70000))
+
+    assert readings["temperature_celsius"].tolist() == [2.0, 3.0, 4.0]
+    assert history.count("Oslo") == 7
+
+
+def test_history_spill():
+    """Test that sealed chunks spill to memory-mapped files past the budget."""
+    with tempfile.TemporaryDirectory() as directory:
+        history = TemperatureHistory(chunk_size=256, max_memory_bytes=4096, spill_dir=directory)
+        SyntheticClimateGenerator(3, seed=3).fill_history(history, START, 30, interval_hours=1)
+        before = history.range("London")["temperature_celsius"].copy()
+        assert before.size == 30 * 24
+        assert any(fname.endswith(".bin") for fname in os.listdir(directory))
+
+        assert history.nbytes <= 4096 + 3 * 256 * 16
+        assert np.array_equal(history.range("London")["temperature_celsius"], before)
+        assert history.aggregate("London")["count"] == 30 * 24
+        history.close()
+
+
+if __name__ == "__main__":
+    test_history_round_trip()
+    test_history_aggregate_matches_brute_force()
+    test_history_irregular_and_out_of_order()
+    test_history_spill()
+    print("✅ Temperature history tests completed successfully!")
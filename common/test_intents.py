@@ -0,0 +1,61 @@
+"""Test script for the compiled intent dispatcher."""
+
+from common.chatbot import ChatbotInterface
+from common.intents import CLIMATE_INTENTS, WEATHER_INTENTS, Intent, IntentDispatcher
+
+
+def test_dispatcher_priority_and_spans():
+    """Test priority order, required keywords and reported spans."""
+    dispatcher = IntentDispatcher([
+        Intent("forecast", ["forecast", "tomorrow"]),
+        Intent("alert", ["storm", "flood"], priority=5),
+        Intent("rain", ["rain"], ["tomorrow"], priority=1),
+    ])
+
+    match = dispatcher.classify("Will it RAIN tomorrow?")
+    assert match.intent == "rain"
+    assert match.spans == [(8, 12, "rain"), (13, 21, "tomorrow")]
+    assert dispatcher.intent("storm forecast for tomorrow") == "alert"
+    assert dispatcher.intent("rain today") is None
+    assert dispatcher.intent("nothing here", "fallback") == "fallback"
+
+
+def test_dispatcher_word_boundaries():
+    """Test whole-word and substring keywords."""
+    dispatcher = IntentDispatcher([
+        Intent("word", ["all"]),
+        Intent("substring", ["therm"], whole_word=False),
+    ])
+    assert dispatcher.intent("small talk") is None
+    assert dispatcher.intent("show all cities") == "word"
+    assert dispatcher.intent("thermometer reading") == "substring"
+
+
+def test_shared_intents():
+    """Test the chatbot, climate and weather routing tables."""
+    chatbot = ChatbotInterface(keep_history=False)
+    assert chatbot._generate_response("hello, how are you").startswith("Hello")
+    assert chatbot._generate_response("How are you?").startswith("I'm doing well")
+    assert chatbot._generate_response("sometimes").startswith("I received")
+
+    assert CLIMATE_INTENTS.intent("What's the weather like in Oslo?") == "climate"
+    assert WEATHER_INTENTS.intent("temperature of the city of Paris") == "temperature"
+    assert WEATHER_INTENTS.intent("temperature in Paris") is None
+    assert WEATHER_INTENTS.intent("compare Paris and Rome") == "compare"
+    assert WEATHER_INTENTS.intent("give me a summary") == "summary"
+
+
+def test_compare_intent_inflections():
+    """Test that inflected forms of "compare" still route to the comparison."""
+    for message in ("How is Paris compared to Rome?", "comparing Oslo and Lima",
+                    "which compares better, Tokyo or Cairo", "comparisons of Paris and Rome"):
+        assert WEATHER_INTENTS.intent(message) == "compare", message
+    assert WEATHER_INTENTS.intent("comparable weather") is None
+
+
+if __name__ == "__main__":
+    test_dispatcher_priority_and_spans()
+    test_dispatcher_word_boundaries()
+    test_shared_intents()
+    test_compare_intent_inflections()
+    print("✅ Intent dispatcher tests completed successfully!")
@@ -0,0 +1,352 @@
+"""Test script for the logging configuration."""
+
+import fcntl
+import gzip
+import json
+import logging
+import os
+import queue
+import time
+
+from common.logging_config import (
+    BoundedQueueHandler,
+    CompressingRotatingFileHandler,
+    JsonFormatter,
+    LoggingConfig,
+    LogRateLimit,
+    RateLimitFilter,
+)
+
+
+class ListHandler(logging.Handler):
+    """Handler collecting rendered messages."""
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def test_async_logging_writes_through_listener(tmp_path):
+    """Test that asynchronous mode writes records from the listener thread."""
+    log_file = tmp_path / "async.log"
+    config = LoggingConfig(log_file=str(log_file), async_logging=True)
+    try:
+        assert logging.getLogger().handlers == [config.queue_handler]
+        logging.getLogger("async_test").info("Retrieved %d cities", 3)
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logging.getLogger("async_test").exception("Lookup failed")
+    finally:
+        config.stop()
+
+    content = log_file.read_text()
+    assert "async_test - INFO - Retrieved 3 cities" in content
+    assert content.count("async_test - INFO") == 1
+    assert "ValueError: boom" in content
+
+
+def test_queue_handler_drop_policy():
+    """Test that a full queue drops records and reports them later."""
+    log_queue = queue.Queue(2)
+    handler = BoundedQueueHandler(log_queue, "drop")
+    logger = logging.getLogger("drop_test")
+    record = logger.makeRecord("drop_test", logging.INFO, __file__, 1, "message %d", (1,), None)
+
+    for _ in range(4):
+        handler.handle(record)
+    assert handler.dropped == 2
+    assert [log_queue.get_nowait().getMessage() for _ in range(2)] == ["message 1"] * 2
+
+    handler.handle(record)
+    assert log_queue.get_nowait().getMessage() == "Dropped 2 log records: logging queue full"
+    assert log_queue.get_nowait().getMessage() == "message 1"
+    assert log_queue.empty()
+    assert handler.dropped == 2
+
+def test_queue_handler_rejects_unknown_policy():
+    """Test that only known queue policies are accepted."""
+    try:
+        BoundedQueueHandler(queue.Queue(1), "spill")
+    except ValueError as error:
+        assert "spill" in str(error)
+    else:
+        raise AssertionError("Expected ValueError")
+
+
+def test_json_formatter_fields():
+    """Test rendered message, event fields and exception of JSON lines."""
+    logger = logging.getLogger("json_test")
+    record = logger.makeRecord("json_test", logging.WARNING, __file__, 1,
+                               "No climate data found for %s", ("Paris",), None,
+                               extra={"city": "Paris", "stats": {"count": 2}})
+    event = json.loads(JsonFormatter().format(record))
+    assert event["level"] == "WARNING"
+    assert event["logger"] == "json_test"
+    assert event["message"] == "No climate data found for Paris"
+    assert event["city"] == "Paris"
+    assert event["stats"] == {"count": 2}
+    assert event["timestamp"].endswith("+00:00")
+    assert "exception" not in event and "args" not in event
+
+
+def test_async_json_logging(tmp_path):
+    """Test that JSON lines written from the listener keep the traceback separate."""
+    log_file = tmp_path / "json.log"
+    config = LoggingConfig(log_file=str(log_file), async_logging=True, json_format=True)
+    try:
+        try:
+            raise KeyError("Tokyo")
+        except KeyError:
+            logging.getLogger("json_test").exception("Lookup of %s failed", "Tokyo",
+                                                     extra={"city": "Tokyo"})
+        logging.getLogger("json_test").debug("Disabled %s", object())
+    finally:
+        config.stop()
+
+    lines = log_file.read_text().splitlines()
+    assert len(lines) == 1
+    event = json.loads(lines[0])
+    assert event["message"] == "Lookup of Tokyo failed"
+    assert event["city"] == "Tokyo"
+    assert "KeyError: 'Tokyo'" in event["exception"]
+
+
+def test_rate_limit_filter_buckets_and_summaries():
+    """Test per-key token buckets and the suppressed message summaries."""
+    now = [0.0]
+    logger = logging.getLogger("rate_limit_test")
+    logger.propagate = False
+    handler = ListHandler()
+    logger.addHandler(handler)
+    rate_limit_filter = RateLimitFilter(LogRateLimit(rate=1.0, burst=2), summary_interval=10.0,
+                                        clock=lambda: now[0])
+    logger.addFilter(rate_limit_filter)
+    try:
+        for city in ["Paris", "London", "Tokyo", "Berlin"]:
+            logger.warning("No climate data found for %s", city)
+        logger.warning("Deleted climate data for %s", "Paris")
+        now[0] = 1.0
+        logger.warning("No climate data found for %s", "Rome")
+        logger.warning("No climate data found for %s", "Oslo")
+        assert handler.messages == [
+            "No climate data found for Paris",
+            "No climate data found for London",
+            "Deleted climate data for Paris",
+            "No climate data found for Rome",
+        ]
+        assert rate_limit_filter.suppressed == 3
+
+        now[0] = 10.0
+        logger.warning("Deleted climate data for %s", "Rome")
+        assert handler.messages[-2:] == [
+            "Suppressed 3 messages like 'No climate data found for %s'",
+            "Deleted climate data for Rome",
+        ]
+        rate_limit_filter.flush()
+        assert len(handler.messages) == 6
+    finally:
+        logger.removeFilter(rate_limit_filter)
+        logger.removeHandler(handler)
+        logger.propagate = True
+
+
+def test_rate_limit_filter_bounds_keys():
+    """Test that message keys are evicted and their pending summaries written."""
+    now = [0.0]
+    logger = logging.getLogger("rate_limit_keys_test")
+    logger.propagate = False
+    handler = ListHandler()
+    logger.addHandler(handler)
+    rate_limit_filter = RateLimitFilter(LogRateLimit(rate=0.1, burst=1), summary_interval=10.0,
+                                        clock=lambda: now[0], max_keys=2)
+    logger.addFilter(rate_limit_filter)
+    try:
+        logger.warning("Paris failed")
+        logger.warning("Paris failed")
+        logger.warning("London failed")
+        logger.warning("Tokyo failed")
+        assert list(rate_limit_filter._keys) == ["London failed", "Tokyo failed"]
+        assert handler.messages[-2:] == [
+            "Suppressed 1 messages like 'Paris failed'",
+            "Tokyo failed",
+        ]
+
+        now[0] = 5.0
+        logger.warning("London failed")
+        now[0] = 10.0
+        logger.warning("Rome failed")
+        assert list(rate_limit_filter._keys) == ["London failed", "Rome failed"]
+        assert handler.messages[-2:] == [
+            "Suppressed 1 messages like 'London failed'",
+            "Rome failed",
+        ]
+
+        now[0] = 25.0
+        logger.warning("Berlin failed")
+        assert list(rate_limit_filter._keys) == ["Berlin failed"]
+    finally:
+        logger.removeFilter(rate_limit_filter)
+        logger.removeHandler(handler)
+        logger.propagate = True
+
+
+def test_rate_limit_filter_sampling():
+    """Test 1-in-N sampling and the per-logger configuration."""
+    handler = ListHandler()
+    config = LoggingConfig(rate_limits={"sampling_test": LogRateLimit(sample_every=3)})
+    logging.getLogger().addHandler(handler)
+    try:
+        for index in range(7):
+            logging.getLogger("sampling_test").info("Retrieved climate data for %s", index)
+            logging.getLogger("unlimited_test").info("Inserted climate data for %s", index)
+        config.stop()
+    finally:
+        LoggingConfig()
+        logging.getLogger().removeHandler(handler)
+
+    sampled = [message for message in handler.messages if message.startswith("Retrieved")]
+    assert sampled == [f"Retrieved climate data for {index}" for index in (0, 3, 6)]
+    assert sum("Inserted" in message for message in handler.messages) == 7
+    assert handler.messages[-1] == "Suppressed 4 messages like 'Retrieved climate data for %s'"
+    assert not logging.getLogger("sampling_test").filters
+
+
+def test_rotating_handler_compresses_and_keeps_backups(tmp_path):
+    """Test size-based rotation, gzip compression and the retention count."""
+    log_file = tmp_path / "agno.log"
+    handler = CompressingRotatingFileHandler(str(log_file), max_bytes=100, backup_count=2)
+    logger = logging.getLogger("rotation_test")
+    for index in range(4):
+        record = logger.makeRecord("rotation_test", logging.INFO, __file__, 1,
+                                   "%d %s", (index, "x" * 80), None)
+        handler.handle(record)
+    handler.close()
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "agno.log", "agno.log.1.gz", "agno.log.2.gz"]
+    assert log_file.read_text().startswith("3 ")
+    with gzip.open(tmp_path / "agno.log.1.gz", "rt") as rotated:
+        assert rotated.read().startswith("2 ")
+    with gzip.open(tmp_path / "agno.log.2.gz", "rt") as rotated:
+        assert rotated.read().startswith("1 ")
+
+
+def test_framework_logging_rotates_by_time(tmp_path):
+    """Test time-based rotation of the framework log file."""
+    logger = LoggingConfig.setup_framework_logging("langgraph", log_dir=str(tmp_path),
+                                                   rotate_interval=0.0, compression=None)
+    try:
+        logger.info("first run")
+        logger.info("second run")
+    finally:
+        LoggingConfig()
+
+    assert (tmp_path / "langgraph.log").read_text().endswith("second run\n")
+    assert (tmp_path / "langgraph.log.1").read_text().endswith("first run\n")
+
+
+def test_rotating_handler_keeps_leftover_backup(tmp_path):
+    """Test that an uncompressed backup left by an earlier run is not overwritten."""
+    log_file = tmp_path / "agno.log"
+    (tmp_path / "agno.log.1").write_text("leftover\n")
+    handler = CompressingRotatingFileHandler(str(log_file), max_bytes=100, backup_count=2)
+    logger = logging.getLogger("leftover_test")
+    for index in range(2):
+        record = logger.makeRecord("leftover_test", logging.INFO, __file__, 1,
+                                   "%d %s", (index, "x" * 80), None)
+        handler.handle(record)
+    handler.close()
+
+    names = sorted(path.name for path in tmp_path.iterdir())
+    assert names[:2] == ["agno.log", "agno.log.1.gz"]
+    assert len(names) == 3
+    assert (tmp_path / names[2]).read_text() == "leftover\n"
+
+
+def test_rotating_handler_counts_leftovers_as_backups(tmp_path):
+    """Test that leftover backups are deleted, oldest first, beyond the retention count."""
+    log_file = tmp_path / "agno.log"
+    for name, age in [("agno.log.20250101-000000", 200), ("agno.log.20250102-000000", 100)]:
+        (tmp_path / name).write_text(name + "\n")
+        os.utime(tmp_path / name, (time.time() - age, time.time() - age))
+    handler = CompressingRotatingFileHandler(str(log_file), max_bytes=100, backup_count=2)
+    logger = logging.getLogger("leftover_test")
+    for index in range(2):
+        record = logger.makeRecord("leftover_test", logging.INFO, __file__, 1,
+                                   "%d %s", (index, "x" * 80), None)
+        handler.handle(record)
+    handler.close()
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "agno.log", "agno.log.1.gz", "agno.log.20250102-000000"]
+
+
+def test_rotating_handler_rotates_old_file_by_mtime(tmp_path):
+    """Test that a file kept from an earlier run is rotated by its age."""
+    log_file = tmp_path / "agno.log"
+    log_file.write_text("earlier run\n")
+    os.utime(log_file, (time.time() - 7200, time.time() - 7200))
+    handler = CompressingRotatingFileHandler(str(log_file), rotate_interval=3600.0,
+                                             compression=None)
+    logger = logging.getLogger("mtime_test")
+    handler.handle(logger.makeRecord("mtime_test", logging.INFO, __file__, 1,
+                                     "this run", (), None))
+    handler.close()
+
+    assert log_file.read_text() == "this run\n"
+    assert (tmp_path / "agno.log.1").read_text() == "earlier run\n"
+
+
+def test_framework_logging_uses_own_file_when_shared_one_is_locked(tmp_path):
+    """Test that a second process does not write the locked framework log file."""
+    descriptor = os.open(str(tmp_path / "crewai.log.lock"), os.O_RDWR | os.O_CREAT)
+    fcntl.flock(descriptor, fcntl.LOCK_EX)
+    try:
+        logger = LoggingConfig.setup_framework_logging("crewai", log_dir=str(tmp_path))
+        logger.info("concurrent run")
+    finally:
+        LoggingConfig()
+        os.close(descriptor)
+
+    assert not (tmp_path / "crewai.log").exists()
+    own_file = tmp_path / f"crewai_{os.getpid()}.log"
+    assert own_file.read_text().endswith("concurrent run\n")
+
+
+def test_rotating_handler_rejects_unknown_compression(tmp_path):
+    """Test that only known compressions are accepted."""
+    try:
+        CompressingRotatingFileHandler(str(tmp_path / "x.log"), max_bytes=10, compression="lz4")
+    except ValueError as error:
+        assert "lz4" in str(error)
+    else:
+        raise AssertionError("Expected ValueError")
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+
+    with tempfile.TemporaryDirectory() as directory:
+        test_async_logging_writes_through_listener(Path(directory))
+        test_async_json_logging(Path(directory))
+    for test in (test_rotating_handler_compresses_and_keeps_backups,
+                 test_framework_logging_rotates_by_time,
+                 test_rotating_handler_keeps_leftover_backup,
+                 test_rotating_handler_counts_leftovers_as_backups,
+                 test_rotating_handler_rotates_old_file_by_mtime,
+                 test_framework_logging_uses_own_file_when_shared_one_is_locked,
+                 test_rotating_handler_rejects_unknown_compression):
+        with tempfile.TemporaryDirectory() as directory:
+            test(Path(directory))
+    test_queue_handler_drop_policy()
+    test_queue_handler_rejects_unknown_policy()
+    test_json_formatter_fields()
+    test_rate_limit_filter_buckets_and_summaries()
+    test_rate_limit_filter_bounds_keys()
+    test_rate_limit_filter_sampling()
+    print("✅ Logging configuration tests completed successfully!")
@@ -0,0 +1,98 @@
+"""Test script for the Bloom filter and the unknown-city lookup cache."""
+
+import time
+
+from common.mongodb.lookup_cache import BloomFilter, CityLookupCache
+
+
+def test_bloom_filter():
+    """Test membership of bulk-built and added keys and the false positive rate."""
+    keys = [f"City {i}" for i in range(5000)]
+    bloom = BloomFilter.from_keys(keys)
+
+    assert all(key in bloom for key in keys)
+    false_positives = sum(f"Town {i}" in bloom for i in range(5000))
+    assert false_positives < 5000 * 0.02
+
+    assert "Atlantis" not in bloom
+    bloom.add("Atlantis")
+    assert "Atlantis" in bloom
+
+
+def test_lookup_cache_invalidation():
+    """Test that unknown cities are ruled out until they are inserted."""
+    cache = CityLookupCache(ttl=60.0)
+    assert cache.stale
+    assert cache.might_exist("Paris")
+
+    started_at = time.monotonic()
+    cache.record_insert("Oslo")
+    cache.rebuild(["Paris", "London"], started_at)
+    assert not cache.stale
+    assert cache.might_exist("Paris")
+    assert cache.might_exist("Oslo")
+    assert not cache.might_exist("Gotham")
+
+    cache.record_insert("Gotham")
+    assert cache.might_exist("Gotham")
+
+
+def test_lookup_cache_misses_expire():
+    """Test that recorded misses are trusted only for the TTL."""
+    cache = CityLookupCache(ttl=0.05, max_misses=2)
+    cache.record_miss("Gotham")
+    assert not cache.might_exist("Gotham")
+    time.sleep(0.06)
+    assert cache.might_exist("Gotham")
+
+    for city in ("A", "B", "C"):
+        cache.record_miss(city)
+    assert cache.might_exist("A")
+    assert not cache.might_exist("C")
+
+
+def test_lookup_cache_distrusts_old_filter():
+    """Test that an old filter no longer rules out cities stored elsewhere."""
+    cache = CityLookupCache(max_filter_age=0.05)
+    cache.rebuild(["Paris"])
+    assert not cache.might_exist("Gotham")
+    time.sleep(0.06)
+    assert cache.might_exist("Gotham")
+
+    cache.record_miss("Gotham")
+    assert not cache.might_exist("Gotham")
+
+
+def test_lookup_cache_background_refresh():
+    """Test that a stale filter is rebuilt once, off the calling thread."""
+    cache = CityLookupCache(rebuild_interval=60.0)
+    calls = []
+
+    def load_cities():
+        calls.append(1)
+        return iter(["Paris", "London"])
+
+    thread = cache.refresh_in_background(load_cities)
+    thread.join()
+    assert calls == [1]
+    assert not cache.stale
+    assert not cache.might_exist("Gotham")
+    assert cache.refresh_in_background(load_cities) is None
+
+    def fail():
+        raise RuntimeError("database unavailable")
+
+    failing = CityLookupCache(rebuild_interval=60.0)
+    failing.refresh_in_background(fail).join()
+    assert failing.stale
+    assert failing.might_exist("Gotham")
+    assert failing.refresh_in_background(load_cities) is None
+
+
+if __name__ == "__main__":
+    test_bloom_filter()
+    test_lookup_cache_invalidation()
+    test_lookup_cache_misses_expire()
+    test_lookup_cache_distrusts_old_filter()
+    test_lookup_cache_background_refresh()
+    print("Lookup cache tests completed successfully!")
@@ -0,0 +1,93 @@
+"""Test script for the batch replay mode."""
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from common.chat_server import ChatServer
+from common.replay import ReplayRunner, load_queries
+
+
+async def echo(session, message):
+    """Answer after a short non-blocking wait, failing on request."""
+    await asyncio.sleep(0.05)
+    if message == "fail":
+        raise RuntimeError("boom")
+    return f"{session.turn_count}:{message}"
+
+
+def write(directory, name, lines):
+    """Write a query file and return its path."""
+    path = os.path.join(directory, name)
+    with open(path, "w", encoding="utf-8") as handle:
+        handle.write("\n".join(lines) + "\n")
+    return path
+
+
+def test_load_queries():
+    """Test parsing plain text and NDJSON query files."""
+    with tempfile.TemporaryDirectory() as directory:
+        text = load_queries(write(directory, "queries.txt", ["hello", "# note", "", "bye"]))
+        records = load_queries(write(directory, "queries.ndjson", [
+            json.dumps({"query": "hi", "session": "a", "timestamp": "2025-07-21T10:00:00"}),
+            json.dumps({"message": "there", "session": "a", "timestamp": 1753092001}),
+        ]))
+
+    assert [query["query"] for query in text] == ["hello", "bye"]
+    assert [query["index"] for query in text] == [0, 1]
+    assert records[0]["session"] == "a" and records[1]["query"] == "there"
+    assert isinstance(records[0]["timestamp"], float)
+
+
+def test_replay_concurrency_and_results():
+    """Test ordered conversations, concurrency, errors and the results file."""
+    queries = [{"index": i, "query": f"q{i}", "session": None, "agent": None, "timestamp": None}
+               for i in range(20)]
+    queries += [{"index": 20 + i, "query": text, "session": "s", "agent": None, "timestamp": None}
+                for i, text in enumerate(["first", "fail", "third"])]
+
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, "results.ndjson")
+        started = time.perf_counter()
+        summary = ReplayRunner(ChatServer({"echo": echo}), concurrency=10).run(queries, output)
+        elapsed = time.perf_counter() - started
+        with open(output, encoding="utf-8") as handle:
+            lines = [json.loads(line) for line in handle]
+
+    assert summary["turns"] == 23 and summary["errors"] == 1
+    assert elapsed < 0.5
+    assert lines[-1]["summary"] == summary
+    conversation = lines[20:23]
+    assert conversation[0]["response"] == "0:first" and conversation[2]["response"] == "2:third"
+    assert conversation[1]["error"] == "boom"
+    assert all(line["latency"] >= 0.05 for line in lines[:20])
+
+
+def test_replay_pace_does_not_hold_slots():
+    """Test that a conversation waiting for its next turn lets others run."""
+    sent = {}
+
+    async def record(session, message):
+        sent[message] = time.perf_counter()
+        return message
+
+    queries = [
+        {"index": 0, "query": "a1", "session": "a", "agent": None, "timestamp": 0.0},
+        {"index": 1, "query": "b1", "session": "b", "agent": None, "timestamp": 0.1},
+        {"index": 2, "query": "a2", "session": "a", "agent": None, "timestamp": 0.3},
+    ]
+    started = time.perf_counter()
+    summary = ReplayRunner(ChatServer({"record": record}), concurrency=1, speed=1.0).run(queries)
+
+    assert summary["turns"] == 3 and summary["errors"] == 0
+    assert sent["b1"] - started < 0.25
+    assert sent["a2"] - started >= 0.3
+
+
+if __name__ == "__main__":
+    test_load_queries()
+    test_replay_concurrency_and_results()
+    test_replay_pace_does_not_hold_slots()
+    print("✅ Replay tests completed successfully!")
@@ -0,0 +1,95 @@
+"""Test script for the in-memory city snapshot."""
+
+import threading
+from datetime import datetime
+
+from common.mongodb.snapshot import CitySnapshot
+
+
+def test_snapshot_apply_and_get():
+    """Test inserting, updating and reading snapshot rows."""
+    snapshot = CitySnapshot(capacity=1)
+    snapshot.apply([
+        {"city": "Tokyo", "temperature_celsius": 22.5, "humidity_percent": 60.0,
+         "weather_condition": "sunny", "timestamp": datetime(2024, 1, 1, 12)},
+        {"city": "Oslo", "temperature_celsius": -4.0, "weather_condition": "snowy"},
+        {"city": "Paris", "research": "no readings"},
+    ])
+    snapshot.apply([{"city": "Tokyo", "temperature_celsius": 25.0, "weather_condition": "cloudy",
+                     "timestamp": datetime(2024, 1, 2, 12)}])
+
+    assert len(snapshot) == 2
+    assert snapshot.get("Tokyo")["temperature_celsius"] == 25.0
+    assert snapshot.get("Tokyo").weather_condition == "cloudy"
+    assert snapshot.get("Oslo").humidity_percent is None
+    assert snapshot.get("Paris") is None
+    assert snapshot.latest_timestamp == datetime(2024, 1, 2, 12)
+
+
+def test_snapshot_remove():
+    """Test removing a row keeps the index consistent."""
+    snapshot = CitySnapshot()
+    snapshot.apply([{"city": name, "temperature_celsius": float(i), "weather_condition": "sunny"}
+                    for i, name in enumerate(["A", "B", "C"])])
+
+    assert snapshot.remove("A")
+    assert not snapshot.remove("A")
+    assert sorted(snapshot.cities()) == ["B", "C"]
+    assert snapshot.get("C").temperature_celsius == 2.0
+    assert snapshot.to_statistics().count == 2
+
+
+def test_snapshot_skips_older_writes():
+    """Test that a document written before the stored row does not replace it."""
+    snapshot = CitySnapshot()
+    snapshot.apply([{"city": "Lima", "temperature_celsius": 18.0, "weather_condition": "foggy",
+                     "timestamp": datetime(2024, 1, 1), "updated_at": datetime(2024, 3, 1, 12)}])
+    snapshot.apply([{"city": "Lima", "temperature_celsius": 30.0, "weather_condition": "sunny",
+                     "timestamp": datetime(2024, 2, 1), "updated_at": datetime(2024, 3, 1, 11)}])
+    assert snapshot.get("Lima").temperature_celsius == 18.0
+
+    snapshot.apply([{"city": "Lima", "temperature_celsius": 15.0, "weather_condition": "foggy",
+                     "timestamp": datetime(2023, 12, 1), "updated_at": datetime(2024, 3, 1, 13)}])
+    assert snapshot.get("Lima").temperature_celsius == 15.0
+    assert snapshot.watermark == datetime(2024, 3, 1, 13)
+
+
+def test_snapshot_retain():
+    """Test that cities missing from a full read are removed unless written during it."""
+    snapshot = CitySnapshot()
+    snapshot.apply([
+        {"city": "A", "temperature_celsius": 1.0, "updated_at": datetime(2024, 1, 1)},
+        {"city": "B", "temperature_celsius": 2.0, "updated_at": datetime(2024, 1, 1)},
+        {"city": "C", "temperature_celsius": 3.0, "updated_at": datetime(2024, 1, 3)},
+        {"city": "D", "temperature_celsius": 4.0},
+    ])
+
+    assert snapshot.retain({"A"}, written_before=datetime(2024, 1, 2)) == 2
+    assert sorted(snapshot.cities()) == ["A", "C"]
+
+
+def test_snapshot_apply_reads_outside_the_lock():
+    """Test that readers are not blocked while the document source is read."""
+    snapshot = CitySnapshot()
+    snapshot.apply([{"city": "Oslo", "temperature_celsius": 2.0}])
+    reads = []
+
+    def documents():
+        for index in range(5):
+            reader = threading.Thread(target=lambda: reads.append(snapshot.get("Oslo")))
+            reader.start()
+            reader.join(timeout=1.0)
+            yield {"city": f"City {index}", "temperature_celsius": float(index)}
+
+    assert snapshot.apply(documents(), batch_size=2) == 5
+    assert len(reads) == 5 and all(record.temperature_celsius == 2.0 for record in reads)
+    assert len(snapshot) == 6
+
+
+if __name__ == "__main__":
+    test_snapshot_apply_and_get()
+    test_snapshot_remove()
+    test_snapshot_skips_older_writes()
+    test_snapshot_retain()
+    test_snapshot_apply_reads_outside_the_lock()
+    print("Snapshot tests completed successfully!")
@@ -0,0 +1,67 @@
+"""Test script for the vectorized climate statistics."""
+
+from common.mongodb.stats import ClimateStatistics
+
+SAMPLE_DOCUMENTS = [
+    {"city": "Cairo", "temperature_celsius": 34.0, "humidity_percent": 40.0,
+     "weather_condition": "sunny"},
+    {"city": "Moscow", "temperature_celsius": -3.0, "humidity_percent": 70.0,
+     "weather_condition": "cloudy"},
+    {"city": "London", "temperature_celsius": 12.0, "humidity_percent": 80.0,
+     "weather_condition": "rainy"},
+    {"city": "Madrid", "temperature_celsius": 26.0, "weather_condition": "sunny"},
+    {"city": "Paris", "research": "climate report without readings"},
+]
+
+
+def test_statistics_basic():
+    """Test aggregate statistics over a small snapshot."""
+    stats = ClimateStatistics.from_documents(SAMPLE_DOCUMENTS)
+
+    assert stats.count == 4
+    assert abs(stats.mean() - 17.25) < 1e-9
+    assert stats.hottest(2) == [
+        {"city": "Cairo", "temperature_celsius": 34.0},
+        {"city": "Madrid", "temperature_celsius": 26.0},
+    ]
+    assert stats.coldest(1)[0]["city"] == "Moscow"
+    assert stats.condition_distribution() == {"sunny": 2, "cloudy": 1, "rainy": 1}
+    assert abs(stats.mean_humidity() - 190.0 / 3) < 1e-9
+
+
+def test_statistics_by_condition():
+    """Test per-condition grouping ignores unknown humidity."""
+    groups = ClimateStatistics.from_documents(SAMPLE_DOCUMENTS).by_condition()
+
+    assert groups["sunny"]["count"] == 2
+    assert groups["sunny"]["mean_temperature"] == 30.0
+    assert groups["sunny"]["mean_humidity"] == 40.0
+
+
+def test_statistics_ranking_and_differences():
+    """Test ranking order and the pairwise difference matrix."""
+    stats = ClimateStatistics.from_documents(SAMPLE_DOCUMENTS[:3])
+
+    assert [row["city"] for row in stats.ranking()] == ["Cairo", "London", "Moscow"]
+    matrix = stats.difference_matrix()
+    assert matrix.shape == (3, 3)
+    assert matrix[0, 1] == 37.0
+    assert matrix[1, 0] == -37.0
+    assert (matrix.diagonal() == 0).all()
+
+
+def test_statistics_empty():
+    """Test that an empty snapshot yields an empty summary."""
+    stats = ClimateStatistics.from_documents([])
+
+    assert stats.count == 0
+    assert stats.summary() == {}
+    assert stats.hottest(3) == []
+
+
+if __name__ == "__main__":
+    test_statistics_basic()
+    test_statistics_by_condition()
+    test_statistics_ranking_and_differences()
+    test_statistics_empty()
+    print("Statistics tests completed successfully!")
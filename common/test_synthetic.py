@@ -0,0 +1,59 @@
+"""Test script for the seeded synthetic climate generator."""
+
+from datetime import datetime
+
+import numpy as np
+
+from common.mongodb.synthetic import SyntheticClimateGenerator
+
+START = datetime(2023, 1, 1)
+
+
+def test_synthetic_reproducible():
+    """Test that the same seed yields the same readings."""
+    first = list(SyntheticClimateGenerator(40, seed=5).readings(START, 30))
+    second = list(SyntheticClimateGenerator(40, seed=5).readings(START, 30))
+    other = list(SyntheticClimateGenerator(40, seed=6).readings(START, 30))
+
+    assert len(first) == len(second)
+    for a, b in zip(first, second):
+        for column in a:
+            assert np.array_equal(a[column], b[column])
+    assert not np.array_equal(first[0]["temperature_celsius"], other[0]["temperature_celsius"])
+
+
+def test_synthetic_seasons_and_shape():
+    """Test chunk shape and the hemispheric seasonal curve."""
+    generator = SyntheticClimateGenerator(20, seed=1, time_block=400)
+    chunk = next(generator.readings(START, 365))
+
+    assert generator.n_cities == 20
+    assert chunk["station"].size == 20 * 365
+    assert generator.cities[0] == "San Francisco"
+    assert generator.cities[-1] == "Station 0000004"
+
+    temperatures = chunk["temperature_celsius"].reshape(20, 365)
+    moscow = list(generator.cities).index("Moscow")
+    sydney = list(generator.cities).index("Sydney")
+    assert temperatures[moscow, 180:220].mean() > temperatures[moscow, :30].mean()
+    assert temperatures[sydney, :30].mean() > temperatures[sydney, 180:220].mean()
+    assert ((chunk["humidity_percent"] >= 5) & (chunk["humidity_percent"] <= 100)).all()
+
+
+def test_synthetic_documents():
+    """Test conversion of a chunk into bulk write documents."""
+    generator = SyntheticClimateGenerator(3, seed=2)
+    documents = generator.documents(next(generator.readings(START, 2, 12)), include_location=True)
+
+    assert len(documents) == 12
+    assert documents[0]["city"] == "San Francisco"
+    assert documents[1]["timestamp"] == datetime(2023, 1, 1, 12)
+    assert documents[0]["location"]["coordinates"] == [-122.4194, 37.7749]
+    assert isinstance(documents[0]["temperature_celsius"], float)
+
+
+if __name__ == "__main__":
+    test_synthetic_reproducible()
+    test_synthetic_seasons_and_shape()
+    test_synthetic_documents()
+    print("Synthetic data tests completed successfully!")
@@ -0,0 +1,101 @@
+"""Test script for batch validation of temperature readings."""
+
+from datetime import datetime, timedelta, timezone
+
+from common.mongodb.clock import utc_now
+from common.mongodb.rollups import bucket_start
+from common.mongodb.tools import validate_temperature_batch
+
+
+def test_validate_batch_all_valid():
+    """Test that a clean batch is coerced in one pass without errors."""
+    timestamp = datetime(2024, 7, 1, 12, 0)
+    valid, errors = validate_temperature_batch([
+        {"city": "Oslo", "temperature_celsius": "3.5", "humidity_percent": 70,
+         "weather_condition": "cloudy", "timestamp": timestamp},
+        {"city": "Lima", "temperature_celsius": 19, "humidity_percent": 80.5,
+         "weather_condition": "foggy"},
+    ])
+
+    assert errors == []
+    assert valid[0] == {"city": "Oslo", "temperature_celsius": 3.5, "humidity_percent": 70.0,
+                        "weather_condition": "cloudy", "timestamp": timestamp}
+    assert isinstance(valid[1]["timestamp"], datetime)
+
+
+def test_validate_batch_reports_rows():
+    """Test that invalid rows are reported by index and the rest are kept."""
+    valid, errors = validate_temperature_batch([
+        {"city": "Oslo", "temperature_celsius": 3.5, "humidity_percent": 70,
+         "weather_condition": "cloudy"},
+        {"city": "Nowhere", "temperature_celsius": "hot", "humidity_percent": 70},
+        "not a reading",
+    ])
+
+    assert [data["city"] for data in valid] == ["Oslo"]
+    assert [error["index"] for error in errors] == [1, 2]
+    assert errors[0]["city"] == "Nowhere"
+    assert {e["field"] for e in errors[0]["errors"]} == {"temperature_celsius",
+                                                         "weather_condition"}
+    assert errors[1]["city"] is None
+
+
+def test_validate_batch_rejects_non_finite_and_out_of_range():
+    """Test that NaN, infinite temperatures and impossible humidity are rejected."""
+    rows = [
+        {"city": "Oslo", "temperature_celsius": float("nan"), "humidity_percent": 70,
+         "weather_condition": "cloudy"},
+        {"city": "Lima", "temperature_celsius": float("inf"), "humidity_percent": 80,
+         "weather_condition": "foggy"},
+        {"city": "Rome", "temperature_celsius": "-inf", "humidity_percent": 50,
+         "weather_condition": "sunny"},
+        {"city": "Cairo", "temperature_celsius": 30, "humidity_percent": 120,
+         "weather_condition": "sunny"},
+        {"city": "Quito", "temperature_celsius": 14, "humidity_percent": float("nan"),
+         "weather_condition": "rainy"},
+        {"city": "Bern", "temperature_celsius": 12, "humidity_percent": 0,
+         "weather_condition": "sunny"},
+    ]
+    valid, errors = validate_temperature_batch(rows)
+
+    assert [data["city"] for data in valid] == ["Bern"]
+    assert [error["city"] for error in errors] == ["Oslo", "Lima", "Rome", "Cairo", "Quito"]
+
+
+def test_validate_batch_normalizes_aware_timestamps():
+    """Test that timezone-aware timestamps become naive UTC and roll up cleanly."""
+    tokyo = timezone(timedelta(hours=9))
+    valid, errors = validate_temperature_batch([
+        {"city": "Tokyo", "temperature_celsius": 21, "humidity_percent": 60,
+         "weather_condition": "sunny", "timestamp": datetime(2024, 7, 2, 8, 30, tzinfo=tokyo)},
+        {"city": "Oslo", "temperature_celsius": 9, "humidity_percent": 60,
+         "weather_condition": "rainy", "timestamp": "2024-07-01T23:15:00Z"},
+    ])
+
+    assert errors == []
+    assert valid[0]["timestamp"] == datetime(2024, 7, 1, 23, 30)
+    assert valid[1]["timestamp"] == datetime(2024, 7, 1, 23, 15)
+    assert bucket_start(valid[0]["timestamp"], "hour") == datetime(2024, 7, 1, 23)
+    assert bucket_start(datetime(2024, 7, 2, 8, 30, tzinfo=tokyo), "day") == datetime(2024, 7, 1)
+
+
+def test_default_timestamp_is_utc():
+    """Test that readings without a timestamp are stamped in UTC, like every write path."""
+    before = utc_now()
+    valid, _ = validate_temperature_batch([
+        {"city": "Lima", "temperature_celsius": 18, "humidity_percent": 80,
+         "weather_condition": "foggy"},
+    ])
+    stamped = valid[0]["timestamp"]
+    assert stamped.tzinfo is None
+    assert before <= stamped <= utc_now()
+    assert abs(stamped - datetime.now(timezone.utc).replace(tzinfo=None)) < timedelta(seconds=5)
+
+
+if __name__ == "__main__":
+    test_validate_batch_all_valid()
+    test_validate_batch_reports_rows()
+    test_validate_batch_rejects_non_finite_and_out_of_range()
+    test_validate_batch_normalizes_aware_timestamps()
+    test_default_timestamp_is_utc()
+    print("Validation tests completed successfully!")
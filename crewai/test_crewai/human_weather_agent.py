@@ -1,11 +1,12 @@
 """Human-like weather agent with MongoDB temperature tools."""
 
 import logging
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional
 
 from crewai import Agent, Task, Crew, Process
 
 from common.common import ChatbotInterface, ClimateDataService
+from common.common.conversation import ConversationHistory, history_context
 from common.common.mongodb.tools import TemperatureTools
 from .config import Config
 
@@ -16,7 +17,7 @@ class HumanWeatherAgent:
     def __init__(self):
         """Initialize the human weather agent."""
         self.config = Config()
-        self.chatbot = ChatbotInterface(response_delay=0.3, log_level="INFO")
+        self.chatbot = ChatbotInterface(log_level="INFO")
         self.logger = self._setup_logger()
         self.temperature_tools = TemperatureTools()
 
@@ -49,10 +50,10 @@ class HumanWeatherAgent:
             llm=self.config.get_llm_config()
         )
 
-    def create_weather_conversation_task(self, user_query: str) -> Task:
+    def create_weather_conversation_task(self, user_query: str, context: str = "") -> Task:
         """Create a task for weather conversation."""
         return Task(
-            description=f"""The user asked: "{user_query}"
+            description=f"""{context}The user asked: "{user_query}"
             
             Please help them with their weather-related question. Use the available tools to get 
             accurate information and respond in a friendly, conversational manner. 
@@ -69,13 +70,13 @@ class HumanWeatherAgent:
             expected_output="A friendly, conversational response with accurate weather information"
         )
 
-    def process_weather_query(self, user_query: str) -> str:
+    def process_weather_query(self, user_query: str, context: str = "") -> str:
         """Process a weather query and return a response."""
-        self.logger.info(f"Processing weather query: {user_query}")
+        self.logger.info("Processing weather query: %s", user_query)
         
         crew = Crew(
             agents=[self.create_weather_expert_agent()],
-            tasks=[self.create_weather_conversation_task(user_query)],
+            tasks=[self.create_weather_conversation_task(user_query, context)],
             process=Process.sequential,
             verbose=True
         )
@@ -83,9 +84,52 @@ class HumanWeatherAgent:
         result = crew.kickoff()
         response = result[0] if result else "I'm sorry, I couldn't process your weather query right now."
         
-        self.logger.info(f"Generated response: {response}")
+        self.logger.info("Generated response: %s", response)
         return response
 
+    def stream_weather_query(self, user_query: str, context: str = "") -> Iterator[str]:
+        """Process a weather query and deliver the response as a single chunk.
+
+        A crew only produces its answer once the task has finished, so there
+        are no partial results to stream.
+        """
+        yield str(self.process_weather_query(user_query, context))
+
+    def respond(self, user_input: str, history: Optional[ConversationHistory] = None) -> str:
+        """Answer a single weather query.
+
+        Args:
+            user_input: User's input message
+            history: Earlier turns of the conversation, included in the prompt
+
+        Returns:
+            Response text
+        """
+        if not user_input.strip():
+            return "I didn't catch that. Could you please ask me about weather or temperatures for any city?"
+        self.chatbot.send_message("Let me check that for you...")
+        response = self.process_weather_query(user_input, history_context(history))
+        return response if isinstance(response, str) else str(getattr(response, "content", response))
+
+    def respond_stream(self, user_input: str,
+                       history: Optional[ConversationHistory] = None) -> Iterator[str]:
+        """Answer a single weather query, streaming the response as it is generated.
+
+        The history is rendered before returning, so the caller may record the
+        new message in it while the response streams.
+
+        Args:
+            user_input: User's input message
+            history: Earlier turns of the conversation, included in the prompt
+
+        Returns:
+            Iterator of response text chunks
+        """
+        if not user_input.strip():
+            return iter(["I didn't catch that. Could you please ask me about weather or temperatures for any city?"])
+        self.chatbot.send_message("Let me check that for you...")
+        return self.stream_weather_query(user_input, history_context(history))
+
     def start_interactive_mode(self) -> None:
         """Start the weather agent in interactive mode."""
         self.logger.info("Starting Human Weather Agent in interactive mode")
@@ -99,18 +143,15 @@ class HumanWeatherAgent:
                     self.chatbot.receive_response("Thanks for chatting with me! Have a great day and stay weather-aware! 👋")
                     break
                 
-                if user_input.strip():
-                    self.chatbot.send_message("Let me check that for you...")
-                    response = self.process_weather_query(user_input)
-                    self.chatbot.receive_response(response)
-                else:
-                    self.chatbot.receive_response("I didn't catch that. Could you please ask me about weather or temperatures for any city?")
+                chunks = self.respond_stream(user_input, self.chatbot.history)
+                self.chatbot.record_user_message(user_input)
+                self.chatbot.stream_response(chunks)
                     
             except KeyboardInterrupt:
                 self.chatbot.receive_response("Thanks for chatting! Take care! 👋")
                 break
             except Exception as e:
-                self.logger.error(f"Error in interactive mode: {str(e)}")
+                self.logger.error("Error in interactive mode: %s", e)
                 self.chatbot.receive_response("Oops! I encountered a little weather hiccup. Could you try asking again?")
 
     def close(self) -> None:
@@ -1,7 +1,7 @@
 """Human-like weather agent with MongoDB temperature tools using LangChain."""
 
 import logging
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional
 
 from langchain_openai import ChatOpenAI
 from langchain.schema import HumanMessage, SystemMessage
@@ -13,10 +13,14 @@ import json
 from pydantic import BaseModel
 
 from common.common import ChatbotInterface, ClimateDataService
+from common.common.conversation import ConversationHistory, history_context
+from common.common.intents import WEATHER_INTENTS
 from common.common.logging_config import get_logger
 from common.common.mongodb.tools import TemperatureTools
 from .config import Config
 
+MAX_PROMPT_CITIES = 50
+
 logger = get_logger("langchain_weather_agent")
 
 
@@ -26,7 +30,7 @@ class HumanWeatherAgent:
     def __init__(self):
         """Initialize the human weather agent."""
         self.config = Config()
-        self.chatbot = ChatbotInterface(response_delay=0.3, log_level="INFO")
+        self.chatbot = ChatbotInterface(log_level="INFO")
         self.logger = self._setup_logger()
         self.temperature_tools = TemperatureTools()
         self.llm = self._setup_llm()
@@ -57,13 +61,13 @@ class HumanWeatherAgent:
     def create_weather_expert_prompt(self) -> PromptTemplate:
         """Create a prompt template for weather expert responses."""
         return PromptTemplate(
-            input_variables=["user_query", "weather_data"],
+            input_variables=["user_query", "weather_data", "context"],
             template="""You are a friendly and knowledgeable weather expert who loves helping people 
             understand weather conditions around the world. You communicate in a 
             warm, conversational manner and always try to make weather information interesting and 
             accessible.
 
-            The user asked: "{user_query}"
+            {context}The user asked: "{user_query}"
 
             Available weather data: {weather_data}
 
@@ -75,36 +79,41 @@ class HumanWeatherAgent:
 
     def get_weather_data(self, user_query: str) -> str:
         """Get weather data based on user query."""
-        query_lower = user_query.lower()
+        intent = WEATHER_INTENTS.intent(user_query)
         
-        if "temperature" in query_lower and "city" in query_lower:
+        if intent == "temperature":
             # Extract city name and get temperature
-            words = user_query.split()
-            for i, word in enumerate(words):
-                if word.lower() in ["temperature", "temp", "weather"]:
-                    if i + 1 < len(words):
-                        city = words[i + 1]
-                        try:
-                            temp_data = self.temperature_tools.get_current_temperature(city)
-                            return f"Current temperature for {city}: {temp_data}"
-                        except:
-                            return f"Temperature data for {city} not available"
+            cities = self.temperature_tools.find_cities(user_query)
+            if not cities:
+                words = user_query.split()
+                cities = [words[i + 1] for i, word in enumerate(words[:-1])
+                          if word.lower() in ["temperature", "temp", "weather"]]
+            if cities:
+                city = cities[0]
+                try:
+                    temp_data = self.temperature_tools.get_current_temperature(city)
+                    return f"Current temperature for {city}: {temp_data}"
+                except:
+                    return f"Temperature data for {city} not available"
         
-        elif "compare" in query_lower or "between" in query_lower:
+        elif intent == "compare":
             # Try to extract two cities for comparison
-            words = user_query.split()
-            cities = []
-            for word in words:
-                if word[0].isupper() and len(word) > 2:  # Simple city detection
-                    cities.append(word)
+            cities = self.temperature_tools.find_cities(user_query)
+            if len(cities) < 2:
+                words = user_query.split()
+                cities = []
+                for word in words:
+                    word = word.strip(",.?!")
+                    if word[:1].isupper() and len(word) > 2:  # Simple city detection
+                        cities.append(word)
             if len(cities) >= 2:
                 try:
-                    comparison = self.temperature_tools.get_temperature_comparison(f"{cities[0]},{cities[1]}")
+                    comparison = self.temperature_tools.compare_cities(cities)
                     return f"Temperature comparison: {comparison}"
                 except:
-                    return f"Comparison data for {cities[0]} and {cities[1]} not available"
+                    return f"Comparison data for {', '.join(cities)} not available"
         
-        elif "summary" in query_lower or "all" in query_lower:
+        elif intent == "summary":
             try:
                 summary = self.temperature_tools.get_weather_summary()
                 return f"Weather summary: {summary}"
@@ -113,25 +122,75 @@ class HumanWeatherAgent:
         
         else:
             try:
-                all_temps = self.temperature_tools.get_all_cities_temperatures()
+                all_temps = list(
+                    self.temperature_tools.iter_cities_temperatures(limit=MAX_PROMPT_CITIES)
+                )
                 return f"All cities temperatures: {all_temps}"
             except:
                 return "Temperature data not available"
 
-    def process_weather_query(self, user_query: str) -> str:
+    def process_weather_query(self, user_query: str, context: str = "") -> str:
         """Process a weather query and return a response."""
-        self.logger.info(f"Processing weather query: {user_query}")
+        self.logger.info("Processing weather query: %s", user_query)
         
         # Get weather data
         weather_data = self.get_weather_data(user_query)
         
         # Create and run the LLM chain
         weather_chain = LLMChain(llm=self.llm, prompt=self.create_weather_expert_prompt())
-        response = weather_chain.run(user_query=user_query, weather_data=weather_data)
+        response = weather_chain.run(user_query=user_query, weather_data=weather_data,
+                                     context=context)
         
-        self.logger.info(f"Generated response: {response}")
+        self.logger.info("Generated response: %s", response)
         return response
 
+    def stream_weather_query(self, user_query: str, context: str = "") -> Iterator[str]:
+        """Process a weather query and stream the response as the model generates it."""
+        self.logger.info("Streaming weather query: %s", user_query)
+        
+        weather_data = self.get_weather_data(user_query)
+        prompt = self.create_weather_expert_prompt().format(
+            user_query=user_query, weather_data=weather_data, context=context
+        )
+        for chunk in self.llm.stream(prompt):
+            if chunk.content:
+                yield chunk.content
+
+    def respond(self, user_input: str, history: Optional[ConversationHistory] = None) -> str:
+        """Answer a single weather query.
+
+        Args:
+            user_input: User's input message
+            history: Earlier turns of the conversation, included in the prompt
+
+        Returns:
+            Response text
+        """
+        if not user_input.strip():
+            return "I didn't catch that. Could you please ask me about weather or temperatures for any city?"
+        self.chatbot.send_message("Let me check that for you...")
+        response = self.process_weather_query(user_input, history_context(history))
+        return response if isinstance(response, str) else str(getattr(response, "content", response))
+
+    def respond_stream(self, user_input: str,
+                       history: Optional[ConversationHistory] = None) -> Iterator[str]:
+        """Answer a single weather query, streaming the response as it is generated.
+
+        The history is rendered before returning, so the caller may record the
+        new message in it while the response streams.
+
+        Args:
+            user_input: User's input message
+            history: Earlier turns of the conversation, included in the prompt
+
+        Returns:
+            Iterator of response text chunks
+        """
+        if not user_input.strip():
+            return iter(["I didn't catch that. Could you please ask me about weather or temperatures for any city?"])
+        self.chatbot.send_message("Let me check that for you...")
+        return self.stream_weather_query(user_input, history_context(history))
+
     def start_interactive_mode(self) -> None:
         """Start the weather agent in interactive mode."""
         self.logger.info("Starting Human Weather Agent in interactive mode")
@@ -145,18 +204,15 @@ class HumanWeatherAgent:
                     self.chatbot.receive_response("Thanks for chatting with me! Have a great day and stay weather-aware! 👋")
                     break
                 
-                if user_input.strip():
-                    self.chatbot.send_message("Let me check that for you...")
-                    response = self.process_weather_query(user_input)
-                    self.chatbot.receive_response(response)
-                else:
-                    self.chatbot.receive_response("I didn't catch that. Could you please ask me about weather or temperatures for any city?")
+                chunks = self.respond_stream(user_input, self.chatbot.history)
+                self.chatbot.record_user_message(user_input)
+                self.chatbot.stream_response(chunks)
                     
             except KeyboardInterrupt:
                 self.chatbot.receive_response("Thanks for chatting! Take care! 👋")
                 break
             except Exception as e:
-                self.logger.error(f"Error in interactive mode: {str(e)}")
+                self.logger.error("Error in interactive mode: %s", e)
                 self.chatbot.receive_response("Oops! I encountered a little weather hiccup. Could you try asking again?")
 
     def close(self) -> None:
@@ -10,17 +10,22 @@ from langchain_core.messages import HumanMessage, SystemMessage
 from langgraph.graph import StateGraph, END
 from langgraph.prebuilt import ToolNode
 
-from common.common import ChatbotInterface, ClimateDataService
+from common.common import ChatbotInterface, CityResolver, ClimateDataService
+from common.common.intents import CLIMATE_INTENTS
+from common.common.conversation import ConversationHistory, bounded_messages, history_context
 from .config import Config
 
+MAX_STATE_MESSAGES = 10
+
 
 class ClimateState(TypedDict):
     """State for the climate analysis workflow."""
     city_name: str
+    context: str
     research_data: Optional[str]
     analysis_data: Optional[str]
     advice_data: Optional[str]
-    messages: List[HumanMessage]
+    messages: Annotated[List[HumanMessage], bounded_messages(MAX_STATE_MESSAGES)]
 
 
 class ClimateAgent:
@@ -29,10 +34,11 @@ class ClimateAgent:
     def __init__(self):
         """Initialize the climate agent with configuration and services."""
         self.config = Config()
-        self.chatbot = ChatbotInterface(response_delay=0.5, log_level="INFO")
+        self.chatbot = ChatbotInterface(log_level="INFO")
         self.logger = self._setup_logger()
         
         self.climate_service = ClimateDataService()
+        self.city_resolver = CityResolver(self.climate_service.get_all_cities())
         self.llm = self._setup_llm()
         self.graph = self._setup_graph()
 
@@ -69,7 +75,7 @@ class ClimateAgent:
 
     def climate_researcher(self, state: ClimateState) -> ClimateState:
         """Climate researcher node that gathers comprehensive climate data."""
-        self.logger.info(f"Researching climate data for {state['city_name']}")
+        self.logger.info("Researching climate data for %s", state['city_name'])
         
         research_prompt = f"""You are an expert climate researcher with years of experience 
         analyzing weather patterns, temperature data, and climate trends for cities 
@@ -94,12 +100,12 @@ class ClimateAgent:
         return {
             **state,
             "research_data": response.content,
-            "messages": state["messages"] + [response]
+            "messages": [response]
         }
 
     def climate_analyst(self, state: ClimateState) -> ClimateState:
         """Climate analyst node that analyzes the research data."""
-        self.logger.info(f"Analyzing climate data for {state['city_name']}")
+        self.logger.info("Analyzing climate data for %s", state['city_name'])
         
         analysis_prompt = f"""You are a skilled climate analyst who specializes in 
         interpreting climate data and providing actionable insights. You can 
@@ -124,19 +130,19 @@ class ClimateAgent:
         return {
             **state,
             "analysis_data": response.content,
-            "messages": state["messages"] + [response]
+            "messages": [response]
         }
 
     def climate_advisor(self, state: ClimateState) -> ClimateState:
         """Climate advisor node that provides user-friendly advice."""
-        self.logger.info(f"Generating advice for {state['city_name']}")
+        self.logger.info("Generating advice for %s", state['city_name'])
         
         advice_prompt = f"""You are a friendly climate advisor who helps people 
         understand climate information in simple terms. You can explain complex 
         climate data in an accessible way and provide practical advice for 
         different activities based on climate conditions.
 
-        Based on the climate research and analysis for {state['city_name']}, 
+        {state['context']}Based on the climate research and analysis for {state['city_name']}, 
         provide user-friendly advice and recommendations:
         - Best times to visit or engage in outdoor activities
         - What to pack or prepare for different seasons
@@ -155,7 +161,7 @@ class ClimateAgent:
         return {
             **state,
             "advice_data": response.content,
-            "messages": state["messages"] + [response]
+            "messages": [response]
         }
 
     def _setup_graph(self) -> StateGraph:
@@ -174,19 +180,21 @@ class ClimateAgent:
         
         return workflow.compile()
 
-    def get_climate_info(self, city_name: str) -> Dict:
+    def get_climate_info(self, city_name: str, context: str = "") -> Dict:
         """Get comprehensive climate information for a city.
 
         Args:
             city_name: Name of the city to get climate information for.
+            context: Rendered earlier turns of the conversation, given to the advisor
 
         Returns:
             Dictionary containing climate information and recommendations.
         """
-        self.logger.info(f"Starting climate analysis for {city_name}")
+        self.logger.info("Starting climate analysis for %s", city_name)
         
         initial_state = ClimateState(
             city_name=city_name,
+            context=context,
             research_data=None,
             analysis_data=None,
             advice_data=None,
@@ -204,10 +212,33 @@ class ClimateAgent:
         }
         
         self.climate_service.insert_city_climate(climate_data)
-        self.logger.info(f"Completed climate analysis for {city_name}")
+        self.city_resolver.add(city_name)
+        self.logger.info("Completed climate analysis for %s", city_name)
         
         return climate_data
 
+    def respond(self, user_input: str, history: Optional[ConversationHistory] = None) -> str:
+        """Answer a single climate query.
+
+        Follow-up questions without a city name continue with the city the
+        user last asked about.
+
+        Args:
+            user_input: User's input message
+            history: Earlier turns of the conversation, included in the prompt
+
+        Returns:
+            Response text
+        """
+        if CLIMATE_INTENTS.intent(user_input) == "climate":
+            city_name = self._extract_city_name(user_input, history)
+            if city_name:
+                self.chatbot.send_message(f"Researching climate information for {city_name}...")
+                climate_info = self.get_climate_info(city_name, history_context(history))
+                return f"Here's what I found about {city_name}'s climate:\n{climate_info['advice']}"
+            return "Please specify a city name for climate information."
+        return "I can help you with climate information for any city. Just ask about a specific city's climate!"
+
     def start_interactive_mode(self) -> None:
         """Start the climate agent in interactive mode."""
         self.logger.info("Starting Climate Agent in interactive mode")
@@ -221,33 +252,38 @@ class ClimateAgent:
                     self.chatbot.receive_response("Goodbye! Climate Agent stopping.")
                     break
                 
-                if "climate" in user_input.lower() or "weather" in user_input.lower():
-                    city_name = self._extract_city_name(user_input)
-                    if city_name:
-                        self.chatbot.send_message(f"Researching climate information for {city_name}...")
-                        climate_info = self.get_climate_info(city_name)
-                        self.chatbot.receive_response(f"Here's what I found about {city_name}'s climate:\n{climate_info['advice']}")
-                    else:
-                        self.chatbot.receive_response("Please specify a city name for climate information.")
-                else:
-                    self.chatbot.receive_response("I can help you with climate information for any city. Just ask about a specific city's climate!")
+                response = self.respond(user_input, self.chatbot.history)
+                self.chatbot.record_user_message(user_input)
+                self.chatbot.receive_response(response)
                     
             except KeyboardInterrupt:
                 self.chatbot.receive_response("Climate Agent interrupted. Goodbye!")
                 break
             except Exception as e:
-                self.logger.error(f"Error in interactive mode: {str(e)}")
+                self.logger.error("Error in interactive mode: %s", e)
                 self.chatbot.receive_response(f"Sorry, I encountered an error: {str(e)}")
 
-    def _extract_city_name(self, user_input: str) -> Optional[str]:
+    def _extract_city_name(self, user_input: str,
+                           history: Optional[ConversationHistory] = None) -> Optional[str]:
         """Extract city name from user input.
 
         Args:
             user_input: User's input text.
+            history: Earlier turns searched for a known city when the input names none
 
         Returns:
             Extracted city name or None if not found.
         """
+        cities = self.city_resolver.find_in_text(user_input)
+        if cities:
+            return cities[0]
+
+        for turn in reversed(history.turns if history is not None else []):
+            if turn.role == "user":
+                cities = self.city_resolver.find_in_text(turn.text)
+                if cities:
+                    return cities[0]
+
         words = user_input.split()
         for i, word in enumerate(words):
             if word.lower() in ["climate", "weather", "of", "in", "for"]:
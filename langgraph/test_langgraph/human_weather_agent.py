@@ -1,23 +1,29 @@
 """Human-like weather agent with MongoDB temperature tools using LangGraph."""
 
 import logging
-from typing import Dict, List, Optional, TypedDict
+from typing import Annotated, Dict, Iterator, List, Optional, TypedDict
 
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
 from langgraph.graph import StateGraph, END
 
 from common.common import ChatbotInterface, ClimateDataService
+from common.common.intents import WEATHER_INTENTS
+from common.common.conversation import ConversationHistory, bounded_messages, history_context
 from common.common.mongodb.tools import TemperatureTools
 from .config import Config
 
+MAX_PROMPT_CITIES = 50
+MAX_STATE_MESSAGES = 10
+
 
 class WeatherState(TypedDict):
     """State for the weather query workflow."""
     user_query: str
+    context: str
     weather_data: Optional[str]
     response: Optional[str]
-    messages: List[HumanMessage]
+    messages: Annotated[List[HumanMessage], bounded_messages(MAX_STATE_MESSAGES)]
 
 
 class HumanWeatherAgent:
@@ -26,7 +32,7 @@ class HumanWeatherAgent:
     def __init__(self):
         """Initialize the human weather agent."""
         self.config = Config()
-        self.chatbot = ChatbotInterface(response_delay=0.3, log_level="INFO")
+        self.chatbot = ChatbotInterface(log_level="INFO")
         self.logger = self._setup_logger()
         self.temperature_tools = TemperatureTools()
         self.llm = self._setup_llm()
@@ -57,40 +63,44 @@ class HumanWeatherAgent:
 
     def get_weather_data(self, state: WeatherState) -> WeatherState:
         """Get weather data based on user query."""
-        self.logger.info(f"Getting weather data for query: {state['user_query']}")
+        self.logger.info("Getting weather data for query: %s", state['user_query'])
         
-        query_lower = state['user_query'].lower()
+        intent = WEATHER_INTENTS.intent(state['user_query'])
         weather_data = ""
         
-        if "temperature" in query_lower and "city" in query_lower:
+        if intent == "temperature":
             # Extract city name and get temperature
-            words = state['user_query'].split()
-            for i, word in enumerate(words):
-                if word.lower() in ["temperature", "temp", "weather"]:
-                    if i + 1 < len(words):
-                        city = words[i + 1]
-                        try:
-                            temp_data = self.temperature_tools.get_current_temperature(city)
-                            weather_data = f"Current temperature for {city}: {temp_data}"
-                        except:
-                            weather_data = f"Temperature data for {city} not available"
-                        break
-        
-        elif "compare" in query_lower or "between" in query_lower:
+            cities = self.temperature_tools.find_cities(state['user_query'])
+            if not cities:
+                words = state['user_query'].split()
+                cities = [words[i + 1] for i, word in enumerate(words[:-1])
+                          if word.lower() in ["temperature", "temp", "weather"]]
+            if cities:
+                city = cities[0]
+                try:
+                    temp_data = self.temperature_tools.get_current_temperature(city)
+                    weather_data = f"Current temperature for {city}: {temp_data}"
+                except:
+                    weather_data = f"Temperature data for {city} not available"
+        
+        elif intent == "compare":
             # Try to extract two cities for comparison
-            words = state['user_query'].split()
-            cities = []
-            for word in words:
-                if word[0].isupper() and len(word) > 2:  # Simple city detection
-                    cities.append(word)
+            cities = self.temperature_tools.find_cities(state['user_query'])
+            if len(cities) < 2:
+                words = state['user_query'].split()
+                cities = []
+                for word in words:
+                    word = word.strip(",.?!")
+                    if word[:1].isupper() and len(word) > 2:  # Simple city detection
+                        cities.append(word)
             if len(cities) >= 2:
                 try:
-                    comparison = self.temperature_tools.get_temperature_comparison(f"{cities[0]},{cities[1]}")
+                    comparison = self.temperature_tools.compare_cities(cities)
                     weather_data = f"Temperature comparison: {comparison}"
                 except:
-                    weather_data = f"Comparison data for {cities[0]} and {cities[1]} not available"
+                    weather_data = f"Comparison data for {', '.join(cities)} not available"
         
-        elif "summary" in query_lower or "all" in query_lower:
+        elif intent == "summary":
             try:
                 summary = self.temperature_tools.get_weather_summary()
                 weather_data = f"Weather summary: {summary}"
@@ -99,7 +109,9 @@ class HumanWeatherAgent:
         
         else:
             try:
-                all_temps = self.temperature_tools.get_all_cities_temperatures()
+                all_temps = list(
+                    self.temperature_tools.iter_cities_temperatures(limit=MAX_PROMPT_CITIES)
+                )
                 weather_data = f"All cities temperatures: {all_temps}"
             except:
                 weather_data = "Temperature data not available"
@@ -113,12 +125,23 @@ class HumanWeatherAgent:
         """Generate a friendly response based on weather data."""
         self.logger.info("Generating weather response")
         
-        response_prompt = f"""You are a friendly and knowledgeable weather expert who loves helping people 
+        messages = [HumanMessage(content=self._build_response_prompt(state))]
+        response = self.llm.invoke(messages)
+        
+        return {
+            **state,
+            "response": response.content,
+            "messages": [response]
+        }
+
+    def _build_response_prompt(self, state: WeatherState) -> str:
+        """Build the response prompt from the user query and the fetched weather data."""
+        return f"""You are a friendly and knowledgeable weather expert who loves helping people 
         understand weather conditions around the world. You communicate in a 
         warm, conversational manner and always try to make weather information interesting and 
         accessible.
 
-        The user asked: "{state['user_query']}"
+        {state['context']}The user asked: "{state['user_query']}"
 
         Available weather data: {state['weather_data']}
 
@@ -126,15 +149,6 @@ class HumanWeatherAgent:
         conversational manner. Make the weather information interesting and easy to understand.
         
         Always be helpful, friendly, and conversational in your response."""
-        
-        messages = [HumanMessage(content=response_prompt)]
-        response = self.llm.invoke(messages)
-        
-        return {
-            **state,
-            "response": response.content,
-            "messages": state["messages"] + [response]
-        }
 
     def _setup_graph(self) -> StateGraph:
         """Set up the LangGraph workflow."""
@@ -153,13 +167,14 @@ class HumanWeatherAgent:
         
         return workflow.compile()
 
-    def process_weather_query(self, user_query: str) -> str:
+    def process_weather_query(self, user_query: str, context: str = "") -> str:
         """Process a weather query and return a response."""
-        self.logger.info(f"Processing weather query: {user_query}")
+        self.logger.info("Processing weather query: %s", user_query)
         
         # Initialize state
         initial_state = WeatherState(
             user_query=user_query,
+            context=context,
             weather_data=None,
             response=None,
             messages=[]
@@ -168,9 +183,59 @@ class HumanWeatherAgent:
         # Run the graph
         result = self.graph.invoke(initial_state)
         
-        self.logger.info(f"Generated response: {result['response']}")
+        self.logger.info("Generated response: %s", result['response'])
         return result['response']
 
+    def stream_weather_query(self, user_query: str, context: str = "") -> Iterator[str]:
+        """Process a weather query and stream the response as the model generates it."""
+        self.logger.info("Streaming weather query: %s", user_query)
+        
+        state = self.get_weather_data(WeatherState(
+            user_query=user_query,
+            context=context,
+            weather_data=None,
+            response=None,
+            messages=[]
+        ))
+        for chunk in self.llm.stream([HumanMessage(content=self._build_response_prompt(state))]):
+            if chunk.content:
+                yield chunk.content
+
+    def respond(self, user_input: str, history: Optional[ConversationHistory] = None) -> str:
+        """Answer a single weather query.
+
+        Args:
+            user_input: User's input message
+            history: Earlier turns of the conversation, included in the prompt
+
+        Returns:
+            Response text
+        """
+        if not user_input.strip():
+            return "I didn't catch that. Could you please ask me about weather or temperatures for any city?"
+        self.chatbot.send_message("Let me check that for you...")
+        response = self.process_weather_query(user_input, history_context(history))
+        return response if isinstance(response, str) else str(getattr(response, "content", response))
+
+    def respond_stream(self, user_input: str,
+                       history: Optional[ConversationHistory] = None) -> Iterator[str]:
+        """Answer a single weather query, streaming the response as it is generated.
+
+        The history is rendered before returning, so the caller may record the
+        new message in it while the response streams.
+
+        Args:
+            user_input: User's input message
+            history: Earlier turns of the conversation, included in the prompt
+
+        Returns:
+            Iterator of response text chunks
+        """
+        if not user_input.strip():
+            return iter(["I didn't catch that. Could you please ask me about weather or temperatures for any city?"])
+        self.chatbot.send_message("Let me check that for you...")
+        return self.stream_weather_query(user_input, history_context(history))
+
     def start_interactive_mode(self) -> None:
         """Start the weather agent in interactive mode."""
         self.logger.info("Starting Human Weather Agent in interactive mode")
@@ -184,18 +249,15 @@ class HumanWeatherAgent:
                     self.chatbot.receive_response("Thanks for chatting with me! Have a great day and stay weather-aware! 👋")
                     break
                 
-                if user_input.strip():
-                    self.chatbot.send_message("Let me check that for you...")
-                    response = self.process_weather_query(user_input)
-                    self.chatbot.receive_response(response)
-                else:
-                    self.chatbot.receive_response("I didn't catch that. Could you please ask me about weather or temperatures for any city?")
+                chunks = self.respond_stream(user_input, self.chatbot.history)
+                self.chatbot.record_user_message(user_input)
+                self.chatbot.stream_response(chunks)
                     
             except KeyboardInterrupt:
                 self.chatbot.receive_response("Thanks for chatting! Take care! 👋")
                 break
             except Exception as e:
-                self.logger.error(f"Error in interactive mode: {str(e)}")
+                self.logger.error("Error in interactive mode: %s", e)
                 self.chatbot.receive_response("Oops! I encountered a little weather hiccup. Could you try asking again?")
 
     def close(self) -> None:
@@ -1,9 +1,13 @@
 """Main entry point for the LangGraph agents."""
 
+import json
 import logging
 import sys
 from typing import Optional
 
+from common.common.chat_server import ChatServer, agent_handler
+from common.common.replay import ReplayRunner, load_queries
+
 from .climate_agent import ClimateAgent
 from .human_weather_agent import HumanWeatherAgent
 from .config import Config
@@ -32,12 +36,22 @@ def validate_environment() -> bool:
         return False
 
 
-def main(city_name: Optional[str] = None, agent_type: str = "weather") -> None:
+def main(city_name: Optional[str] = None, agent_type: str = "weather",
+         serve: bool = False, host: str = "127.0.0.1", port: int = 8765,
+         replay: Optional[str] = None, replay_output: Optional[str] = None,
+         concurrency: int = 1, speed: float = 0.0) -> None:
     """Main function to run the agents.
 
     Args:
         city_name: Optional city name to analyze climate for.
         agent_type: Type of agent to run ("weather" or "climate").
+        serve: Whether to serve both agents to many sessions over TCP.
+        host: Interface the chat server listens on.
+        port: Port the chat server listens on.
+        replay: Optional text or NDJSON file of queries to replay instead of chatting.
+        replay_output: Optional NDJSON file receiving the per-turn replay results.
+        concurrency: Number of turns answered at once.
+        speed: Multiple of the recorded replay pace, 0 to ignore timestamps.
     """
     setup_logging()
     logger = logging.getLogger("main")
@@ -47,7 +61,25 @@ def main(city_name: Optional[str] = None, agent_type: str = "weather") -> None:
         sys.exit(1)
     
     try:
-        if agent_type == "weather":
+        if serve or replay:
+            weather_agent = HumanWeatherAgent()
+            climate_agent = ClimateAgent()
+            # The server answers many sessions at once; pacing would hold a worker
+            for agent in (weather_agent, climate_agent):
+                agent.chatbot.set_response_delay(0.0)
+            server = ChatServer(
+                {"weather": agent_handler(weather_agent), "climate": agent_handler(climate_agent)},
+                default_handler=agent_type, host=host, port=port
+            )
+            if replay:
+                summary = ReplayRunner(server, concurrency, speed).run(
+                    load_queries(replay), replay_output)
+                print(json.dumps(summary, indent=2))
+            else:
+                server.run()
+            weather_agent.close()
+            climate_agent.close()
+        elif agent_type == "weather":
             weather_agent = HumanWeatherAgent()
             logger.info("Starting human weather agent")
             weather_agent.start_interactive_mode()
@@ -56,7 +88,7 @@ def main(city_name: Optional[str] = None, agent_type: str = "weather") -> None:
             climate_agent = ClimateAgent()
             
             if city_name:
-                logger.info(f"Analyzing climate for {city_name}")
+                logger.info("Analyzing climate for %s", city_name)
                 climate_info = climate_agent.get_climate_info(city_name)
                 print(f"\nClimate Information for {city_name}:")
                 print("=" * 50)
@@ -70,7 +102,7 @@ def main(city_name: Optional[str] = None, agent_type: str = "weather") -> None:
             climate_agent.close()
             
     except Exception as e:
-        logger.error(f"Error running agent: {e}")
+        logger.error("Error running agent: %s", e)
         sys.exit(1)
 
 
@@ -90,6 +122,20 @@ if __name__ == "__main__":
         default="weather",
         help="Type of agent to run (weather or climate)"
     )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Serve both agents to concurrent sessions over TCP"
+    )
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Chat server interface")
+    parser.add_argument("--port", type=int, default=8765, help="Chat server port")
+    parser.add_argument("--replay", type=str, help="Text or NDJSON file of queries to replay")
+    parser.add_argument("--replay-output", type=str, help="NDJSON file for per-turn results")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="Turns answered at once")
+    parser.add_argument("--speed", type=float, default=0.0,
+                        help="Multiple of the recorded replay pace, 0 to ignore timestamps")
     
     args = parser.parse_args()
-    main(args.city, args.agent) 
\ No newline at end of file
+    main(args.city, args.agent, args.serve, args.host, args.port,
+         args.replay, args.replay_output, args.concurrency, args.speed) 
\ No newline at end of file